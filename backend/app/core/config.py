@@ -12,7 +12,62 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
+    PROMPT_CONTEXT_TOKENS: int = 3000  # Q&A 참고 자료 최대 토큰 (넘으면 질문 관련 부분만 남김)
+    PROMPT_QUESTION_TOKENS: int = 1000  # 질문 최대 토큰
+    OPENAI_BASE_URL: str = ""  # OpenAI 호환 서버 주소 (예: 부하 테스트용 가짜 서버 http://127.0.0.1:8100/v1), 비우면 기본값
     OPENAI_MAX_TOKENS: int = 2000
+    SUMMARY_MAX_CONCURRENCY: int = 4  # map-reduce 요약 시 동시 LLM 호출 수
+    PRECOMPUTE_DIGEST: bool = True  # 업로드 후 다이제스트(요약/핵심 용어/목차) 백그라운드 생성
+    LLM_MAX_CONCURRENCY: int = 8  # 문제 생성 LLM 게이트웨이 전체 동시 호출 수
+    LLM_MODEL_CONCURRENCY: str = ""  # 모델별 동시 호출 한도 (예: "gpt-4-turbo-preview=2,gpt-3.5-turbo=8")
+    LLM_ALLOWED_MODELS: str = ""  # 추가로 허용할 모델 (쉼표 구분, 목록에 없는 모델 요청은 OPENAI_MODEL로 호출)
+    LLM_COALESCE: bool = True  # 동시에 들어온 동일 LLM 요청은 한 번만 호출하고 결과 공유
+    LLM_COALESCE_OPT_OUT: str = ""  # 공유하지 않을 기능 목록 (예: "problems,recommend")
+    PROBLEM_FANOUT_CHUNK_SIZE: int = 5  # 이보다 많은 문항 요청은 이 크기의 하위 요청으로 나눠 동시 생성
+    HTTP_MAX_CONNECTIONS: int = 32  # OpenAI 호출 공유 커넥션 풀 최대 연결 수 (LLM_MAX_CONCURRENCY보다 크게)
+    HTTP_MAX_KEEPALIVE: int = 16  # 유지할 keep-alive 연결 수
+    HTTP_KEEPALIVE_EXPIRY_SEC: float = 60  # 유휴 연결 유지 시간
+    HTTP_CONNECT_TIMEOUT_SEC: float = 5  # 연결 타임아웃
+    HTTP_POOL_TIMEOUT_SEC: float = 10  # 풀에서 연결을 기다리는 최대 시간
+    CIRCUIT_ENABLED: bool = True  # LLM 제공자 장애 시 호출을 끊고 데모/캐시 응답으로 대체
+    CIRCUIT_WINDOW_SEC: int = 60  # 오류율/느린 호출 비율 집계 구간
+    CIRCUIT_MIN_CALLS: int = 5  # 구간 내 이 수 이상 호출돼야 판단
+    CIRCUIT_ERROR_RATE: float = 0.5  # 오류율이 이 이상이면 서킷 열림
+    CIRCUIT_SLOW_CALL_SEC: float = 30  # 이보다 오래 걸린 호출은 느린 호출로 집계
+    CIRCUIT_SLOW_RATE: float = 0.5  # 느린 호출 비율이 이 이상이면 서킷 열림
+    CIRCUIT_OPEN_SEC: int = 30  # 열린 뒤 탐색 호출(half-open)까지 대기 시간
+
+    # Problem Bank
+    PROBLEM_BANK_ENABLED: bool = True  # 사전 생성 문제 은행 사용 (DEMO 모드에서는 사용하지 않음)
+    PROBLEM_BANK_TARGET: int = 30  # 버킷(topic/level/style)별 목표 재고
+    PROBLEM_BANK_LOW_WATER: int = 10  # 재고가 이 값 아래로 내려가면 보충
+    PROBLEM_BANK_LOW_WATER_OVERRIDES: str = ""  # 버킷별 low-water (예: "macro:basic:mcq=20,trade:advanced:free=3")
+    PROBLEM_BANK_REFILL_BATCH: int = 5  # 보충 시 LLM 호출당 생성 문항 수
+    PROBLEM_BANK_REFILL_INTERVAL_SEC: int = 300  # 보충 루프 점검 주기
+    PROBLEM_BANK_MAX_CALLS_PER_CYCLE: int = 4  # 보충 주기당 최대 LLM 호출 수 (빈 재고로 배포된 직후 일괄 보충 방지)
+
+    # Semantic Cache (Q&A 채팅)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # 이 코사인 유사도 이상이면 같은 질문으로 간주
+    SEMANTIC_CACHE_TTL_SEC: int = 86400  # 캐시 항목 유효 시간
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2000  # 초과 시 LRU 제거
+
+    # Recommend Cache
+    RECOMMEND_CACHE_FRESH_SEC: int = 86400  # 이 시간 동안은 캐시된 추천을 그대로 사용
+    RECOMMEND_CACHE_STALE_SEC: int = 604800  # 이후 이 시간 동안은 이전 결과를 반환하며 백그라운드 갱신
+
+    # RAG
+    RAG_EMBEDDER: str = "local"  # 임베딩 백엔드 (local: ko-sroberta CPU, openai: text-embedding-3-small)
+    VECTOR_STORE_CACHE_MB: int = 256  # 통합 FAISS 인덱스 메모리 한도 (넘으면 작업 후 메모리에서 내려놓고 다음 사용 시 다시 로드)
+    RAG_SEGMENT_MERGE_COUNT: int = 20  # 업로드별 세그먼트가 이만큼 쌓이면 통합 인덱스 전체 저장
+    RAG_EMBED_BATCH_SIZE: int = 64  # 임베딩 요청당 청크 수
+    RAG_EMBED_CONCURRENCY: int = 4  # 동시 임베딩 요청 수
+    RAG_COMPACT_RATIO: float = 0.2  # 툼스톤 비율이 이 값을 넘으면 통합 인덱스 압축
+
+    # Storage
+    STORAGE_QUOTA_MB: int = 2048  # uploads/, data/, vector_stores/ 전체 디스크 사용량 한도
+    STORAGE_TARGET_RATIO: float = 0.8  # 한도 초과 시 이 비율 이하가 될 때까지 정리
+    STORAGE_GC_INTERVAL_SEC: int = 600  # 정리 작업 실행 주기
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173"
@@ -22,7 +77,12 @@ class Settings(BaseSettings):
     APP_NAME: str = "Noir Luxe Economy"
     
     # Rate Limiting
-    RATE_LIMIT_PER_MINUTE: int = 30
+    RATE_LIMIT_PER_MINUTE: int = 30  # 클라이언트/엔드포인트별 분당 요청 수 (0이면 제한 없음)
+    RATE_LIMIT_BURST: int = 10  # 연속으로 허용하는 최대 요청 수
+    TRUSTED_PROXIES: str = ""  # X-Forwarded-For를 믿을 프록시 주소 (쉼표 구분, 비어 있으면 무시)
+    LLM_BUDGET_RPM: int = 500  # 모든 LLM 호출이 공유하는 분당 요청 예산
+    LLM_BUDGET_TPM: int = 200000  # 모든 LLM 호출이 공유하는 분당 토큰 예산
+    LLM_BUDGET_MAX_WAIT_SEC: float = 30  # 예산 대기 최대 시간 (넘으면 429)
     
     # Demo Mode
     DEMO: bool = True  # 기본값을 True로 설정
@@ -3,17 +3,18 @@ from typing import Optional
 import re
 
 
-def sanitize_input(text: str, max_length: int = 5000) -> str:
+def sanitize_input(text: str, max_length: Optional[int] = 5000) -> str:
     """
     입력 텍스트 검증 및 정제
-    - 최대 길이 제한
+    - 최대 길이 제한 (None이면 자르지 않음, 토큰 예산으로 따로 자르는 경우)
     - 기본적인 인젝션 패턴 검사
     """
     if not text:
         return ""
     
     # 길이 제한
-    text = text[:max_length]
+    if max_length is not None:
+        text = text[:max_length]
     
     # 기본적인 XSS 방지 (추가 필터링 가능)
     # 실제 환경에서는 더 정교한 검증 필요
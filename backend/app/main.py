@@ -1,4 +1,5 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,13 +9,35 @@ load_dotenv()
 
 # DB 연결 초기화
 from app.db.mongo import connect_to_mongo, close_mongo_connection
+from app.services.storage_manager import storage_manager
+from app.services.problem_bank import problem_bank
+from app.services.http_clients import client_registry
+from app.services import embedding_service, prompt_budget
+from app.core.config import settings
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await client_registry.start()
+    background_tasks = [asyncio.create_task(storage_manager.run_periodic())]
+    # 토크나이저 인코딩은 첫 사용 시 내려받으므로 미리 불러옴 (시작을 막지 않도록 스레드에서)
+    background_tasks.append(asyncio.create_task(asyncio.to_thread(prompt_budget.warm_up)))
+    # 로컬 임베딩 모델(의미 캐시/청크 검색)도 미리 로드
+    background_tasks.append(asyncio.create_task(asyncio.to_thread(embedding_service.warm_up)))
+    if settings.PROBLEM_BANK_ENABLED:
+        background_tasks.append(asyncio.create_task(problem_bank.run_periodic()))
     yield
     # Shutdown
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    storage_manager.flush()
+    await client_registry.aclose()
     await close_mongo_connection()
 
 app = FastAPI(
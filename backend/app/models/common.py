@@ -8,12 +8,19 @@ from datetime import datetime
 class QARequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=2000)
     context: Optional[str] = Field(None, max_length=5000)
+    bypass_cache: bool = False  # True면 의미 캐시를 건너뛰고 새로 생성 (결과는 캐시에 갱신)
+
+
+class SummaryRequest(BaseModel):
+    question: Optional[str] = Field(None, max_length=2000)  # 비우면 기본 요약 (업로드 문서는 다이제스트 사용)
+    context: Optional[str] = Field(None, max_length=5000)
 
 
 class QAResponse(BaseModel):
     answer_md: str
     citations: List[str] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    cached: bool = False  # 의미 캐시에서 반환된 답변 여부
 
 
 # ===== 문제 생성 =====
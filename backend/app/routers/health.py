@@ -2,6 +2,11 @@
 from fastapi import APIRouter
 from app.models.common import HealthResponse
 from app.core.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.llm_service import problem_coalescing_stats
+from app.services.http_clients import client_registry
+from app.services.rate_limiter import client_rate_limiter, upstream_budget
+from app.services.usage_meter import usage_meter
 
 router = APIRouter(tags=["health"])
 
@@ -14,3 +19,23 @@ async def health_check():
         app_name=settings.APP_NAME
     )
 
+
+
+@router.get("/health/llm")
+async def llm_stats():
+    """LLM 게이트웨이 동시 실행/대기 시간 통계 및 HTTP 커넥션 풀 사용률"""
+    return {
+        **llm_gateway.stats(),
+        "problem_coalescing": problem_coalescing_stats(),
+        "http_pool": client_registry.stats(),
+    }
+
+
+@router.get("/health/usage")
+async def usage_stats():
+    """기능별 LLM 토큰 사용량/추정 비용, 업스트림 예산 및 클라이언트 요청 제한 현황"""
+    return {
+        "usage": usage_meter.stats(),
+        "upstream_budget": upstream_budget.stats(),
+        "rate_limit": client_rate_limiter.stats(),
+    }
@@ -1,10 +1,17 @@
+import json
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.models.problems import ProblemRequest, ProblemResponse, ProblemItem, GradeRequest, GradeResponse, GradeResult, AnswerItem
 from app.db.mongo import get_database, mongo
-from app.services.llm_service import generate_econ_problems_payload
+from app.core.config import settings
+from app.services.problem_bank import problem_bank
+from app.services.rate_limiter import rate_limit
+from app.services.llm_service import generate_econ_problems_payload, stream_econ_problems, check_problem_rules
+from app.services.demo_service import generate_demo_problems
+from app.services.circuit_breaker import CircuitOpenError
 
 router = APIRouter(tags=["problems"])
 
@@ -15,10 +22,22 @@ def get_database_or_none() -> Optional[AsyncIOMotorDatabase]:
     except RuntimeError:
         return None
 
+async def save_problem_set(db: Optional[AsyncIOMotorDatabase], doc: ProblemResponse):
+    """MongoDB에 저장 시도 (연결된 경우에만)"""
+    if db is not None:
+        try:
+            await db["problems"].insert_one(doc.dict())
+        except Exception as db_error:
+            print(f"[WARNING] MongoDB 저장 실패: {db_error}")
+            print("[INFO] 문제는 생성되었지만 저장되지 않았습니다.")
+    else:
+        print("[INFO] MongoDB 연결 없음 - 문제만 생성하여 반환")
+
 # -------------------------------
 # 1) 문제 생성 (안정화 버전)
 # -------------------------------
-@router.post("/problems", response_model=ProblemResponse, summary="경제 문제 생성")
+@router.post("/problems", response_model=ProblemResponse, summary="경제 문제 생성",
+             dependencies=[Depends(rate_limit("problems"))])
 async def create_problems(
     req: ProblemRequest,
     db: Optional[AsyncIOMotorDatabase] = Depends(get_database_or_none),
@@ -26,10 +45,25 @@ async def create_problems(
     """
     OpenAI를 호출해 문제를 생성하고, 품질 규칙을 검증한 뒤 MongoDB에 저장합니다.
     MongoDB 연결이 실패한 경우에도 문제를 생성하여 반환합니다.
+    LLM 서킷이 열려 있으면(제공자 장애) 기다리지 않고 더미 문제를 반환합니다.
     """
     try:
         print(f"[INFO] 문제 생성 시작: {req.topic}, {req.level}, {req.count}문제, {req.style}")
-        payload = generate_econ_problems_payload(req.topic, req.level, req.count, req.style)
+
+        # 문제 은행 재고가 충분하면 즉시 제공 (이미 검증된 문항)
+        if settings.PROBLEM_BANK_ENABLED and not settings.DEMO:
+            banked = problem_bank.take(req.topic, req.level, req.style, req.count)
+            if banked:
+                print(f"[INFO] 문제 은행에서 {len(banked)}개 문항 제공")
+                doc = ProblemResponse(items=[ProblemItem(**raw) for raw in banked], topic=req.topic, level=req.level)
+                await save_problem_set(db, doc)
+                return doc
+
+        try:
+            payload = await generate_econ_problems_payload(req.topic, req.level, req.count, req.style)
+        except CircuitOpenError as e:
+            print(f"[WARNING] LLM 서킷 열림, 더미 문제로 대체: {e}")
+            payload = generate_demo_problems(req.topic, req.level, req.count, req.style)
         print(f"[INFO] OpenAI 응답 받음: {len(payload.get('items', []))}개 항목")
 
         # 항목 수 일치 보정
@@ -39,22 +73,14 @@ async def create_problems(
         items: List[ProblemItem] = []
         for i, raw in enumerate(items_raw):
             item = ProblemItem(**raw)
-            if req.style == "mcq":
-                if item.options is None or len(item.options) != 4:
-                    raise HTTPException(status_code=422, detail=f"{i+1}번 문항: 객관식은 보기 4개가 필요합니다.")
+            rule_error = check_problem_rules(item, req.style, i)
+            if rule_error:
+                raise HTTPException(status_code=422, detail=rule_error)
             items.append(item)
 
         doc = ProblemResponse(items=items, topic=req.topic, level=req.level)
         
-        # MongoDB에 저장 시도 (연결된 경우에만)
-        if db is not None:
-            try:
-                await db["problems"].insert_one(doc.dict())
-            except Exception as db_error:
-                print(f"[WARNING] MongoDB 저장 실패: {db_error}")
-                print("[INFO] 문제는 생성되었지만 저장되지 않았습니다.")
-        else:
-            print("[INFO] MongoDB 연결 없음 - 문제만 생성하여 반환")
+        await save_problem_set(db, doc)
         
         return doc
 
@@ -71,6 +97,82 @@ async def create_problems(
         else:
             raise HTTPException(status_code=500, detail=f"문제 생성 실패: {msg}")
 
+# -------------------------------
+# 1-1) 문제 생성 스트리밍 (완성된 문항부터 전달)
+# -------------------------------
+def _format_event(event: str, data: dict, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps({"type": event, **data}, ensure_ascii=False) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/problems/stream", summary="경제 문제 생성 (스트리밍)",
+             dependencies=[Depends(rate_limit("problems"))])
+async def create_problems_stream(
+    req: ProblemRequest,
+    format: str = Query("ndjson", pattern="^(sse|ndjson)$", description="ndjson 또는 sse"),
+    db: Optional[AsyncIOMotorDatabase] = Depends(get_database_or_none),
+):
+    """
+    모델 응답을 토큰 단위로 받아 items 배열을 점진적으로 파싱하고,
+    문항이 완성되어 검증을 통과하는 즉시 전달합니다.
+
+    이벤트:
+    - item: {"index", "item"} 검증된 문항
+    - skipped: {"index", "detail"} 검증 실패 문항
+    - done: {"count", "topic", "level", "created_at"} 전체 세트 (MongoDB에 저장)
+    - error: {"detail"}
+    """
+    async def event_stream():
+        items: List[ProblemItem] = []
+        received = 0
+        raw_items = stream_econ_problems(req.topic, req.level, req.count, req.style)
+        try:
+            async for raw in raw_items:
+                index = received
+                received += 1
+                try:
+                    item = ProblemItem(**raw)
+                    rule_error = check_problem_rules(item, req.style, index)
+                except Exception as e:
+                    rule_error = str(e)
+                if rule_error:
+                    yield _format_event("skipped", {"index": index, "detail": rule_error}, format)
+                    continue
+                items.append(item)
+                yield _format_event("item", {"index": len(items) - 1, "item": item.dict()}, format)
+                if len(items) >= req.count:
+                    break
+
+            if not items:
+                yield _format_event("error", {"detail": "AI 응답에서 유효한 문항을 찾지 못했습니다. 다시 시도해 주세요."}, format)
+                return
+
+            doc = ProblemResponse(items=items, topic=req.topic, level=req.level)
+            await save_problem_set(db, doc)
+            yield _format_event("done", {
+                "count": len(items),
+                "topic": doc.topic,
+                "level": doc.level,
+                "created_at": doc.created_at.isoformat(),
+            }, format)
+        except Exception as e:
+            print(f"[ERROR] 문제 스트리밍 실패: {e}")
+            yield _format_event("error", {"detail": f"문제 생성 실패: {str(e)}"}, format)
+        finally:
+            await raw_items.aclose()
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        event_stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/problems/bank/stats", summary="문제 은행 재고 통계")
+async def get_problem_bank_stats():
+    """버킷(topic/level/style)별 재고, 제공/적중, 보충 통계"""
+    return problem_bank.stats()
+
 # -------------------------------
 # 2) 문제 목록 조회 (필터/최신순)
 # -------------------------------
@@ -1,15 +1,36 @@
 """Q&A 라우터"""
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Query, BackgroundTasks, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from app.models.common import QARequest, QAResponse
-from app.services.openai_svc_qa import generate_summary, generate_chat_response
+from app.core.config import settings
+from app.models.common import QARequest, QAResponse, SummaryRequest
+from app.services.openai_svc_qa import (
+    SUMMARY_PROMPT, extract_citations, generate_chat_response, stream_chat_response
+)
+from app.services.rate_limiter import UpstreamBudgetExceeded, rate_limit
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.prompt_budget import SUMMARY_CONTEXT_TOKENS
 from datetime import datetime
+import asyncio
+import anyio
 import os
+import time
 import json
 import io
 import PyPDF2
 from docx import Document
 from app.db.mongo import get_database
+from app.services.upload_manifest import upload_manifest, build_manifest_entry
+from app.services.document_index import document_index
+from app.services.text_store import text_store
+from app.services.fulltext_index import fulltext_index
+from app.services.storage_manager import storage_manager
+from app.services.summarizer import prepare_summary_context, summarize_text
+from app.services.qa_history import save_qa_message
+from app.services.semantic_cache import context_cache_key, semantic_cache
+from app.services.digest_service import (
+    DEFAULT_SUMMARY_QUESTION, build_document_digest, get_document_digest
+)
 
 router = APIRouter(prefix="/qa", tags=["qa"])
 
@@ -84,17 +105,13 @@ def load_document_context(document_filename: str) -> Optional[str]:
     try:
         # storage_id 추출 (.json 제거)
         storage_id = document_filename.replace('.json', '')
+        storage_manager.touch(storage_id)
 
-        # 1. MongoDB에서 먼저 시도 (전체 텍스트 있음)
-        try:
-            db = get_database()
-            collection = db["uploaded_documents"]
-            # MongoDB는 async이므로 동기 방식으로는 접근 불가
-            # 대신 JSON 파일에서 전체 텍스트를 로드하도록 변경 필요
-        except Exception as mongo_error:
-            print(f"MongoDB 로드 시도 실패: {mongo_error}")
-
-        # 2. JSON 파일에서 로드
+        # 1. 압축 텍스트 저장소에서 로드
+        if text_store.exists(storage_id):
+            return text_store.read(storage_id)
+
+        # 2. JSON 파일에서 로드 (full_text가 포함된 이전 형식)
         json_path = os.path.join(JSON_DIR, document_filename if document_filename.endswith('.json') else f"{document_filename}.json")
         if not os.path.exists(json_path):
             print(f"JSON 파일 없음: {json_path}")
@@ -132,78 +149,361 @@ def load_document_context(document_filename: str) -> Optional[str]:
         return None
 
 
+async def select_document_context(document_filename: str, question: str) -> Optional[str]:
+    """
+    문서 청크 인덱스에서 질문 관련 청크만 선택
+    - 인덱스가 없으면 문서를 로드해 즉시 생성 후 검색
+    - 실패 시 None (호출 측에서 전체 문서 로드로 폴백)
+    """
+    storage_id = document_filename.replace('.json', '')
+    storage_manager.touch(storage_id)
+    try:
+        if not document_index.exists(storage_id):
+            full_text = load_document_context(document_filename)
+            if not full_text:
+                return None
+            await document_index.build(storage_id, full_text)
+
+        selected = await document_index.select_context(storage_id, question)
+        print(f"[DEBUG] 청크 검색 컨텍스트 길이: {len(selected) if selected else 0}자")
+        return selected
+    except Exception as e:
+        print(f"청크 검색 오류 (전체 문서로 폴백): {e}")
+        return None
+
+
+async def load_current_digest(document_filename: str) -> Optional[dict]:
+    """현재 문서 내용(content_hash)과 일치하는 다이제스트 조회"""
+    storage_id = document_filename.replace('.json', '')
+    storage_manager.touch(storage_id)
+    meta = text_store.meta(storage_id)
+    if not meta:
+        return None
+    return await get_document_digest(storage_id, meta["content_hash"])
+
+
+async def resolve_chat_context(question: str, context: Optional[str]):
+    """
+    채팅 컨텍스트 준비 (문서 파일명이면 질문 관련 청크 선택, 실패 시 전체 문서)
+    - 청크 검색 결과는 PROMPT_CONTEXT_TOKENS 안에서 선택되고,
+      전체 문서는 메시지 구성 시 토큰 예산에 맞춰 질문 관련 부분만 남음
+    """
+    print(f"[DEBUG] 원본 context: {context[:100] if context else 'None'}...")
+
+    if context and context.endswith('.json'):
+        retrieved_context = await select_document_context(context, question)
+        if retrieved_context:
+            context = retrieved_context
+        else:
+            loaded_context = load_document_context(context)
+            print(f"[DEBUG] 로드된 문서 길이: {len(loaded_context) if loaded_context else 0}자")
+            if loaded_context:
+                context = loaded_context
+
+    print(f"[DEBUG] OpenAI에 전달할 context 길이: {len(context) if context else 0}자")
+    return context
+
+
+def resolve_summary_context(context: Optional[str]) -> Optional[str]:
+    """요약 컨텍스트 준비 (문서 파일명이면 전체 문서 로드)"""
+    print(f"[DEBUG] 원본 context: {context[:100] if context else 'None'}...")
+    if context and context.endswith('.json'):
+        loaded_context = load_document_context(context)
+        print(f"[DEBUG] 로드된 문서 길이: {len(loaded_context) if loaded_context else 0}자")
+        print(f"[DEBUG] 로드된 문서 미리보기: {loaded_context[:200] if loaded_context else 'None'}...")
+        if loaded_context:
+            context = loaded_context
+    print(f"[DEBUG] OpenAI에 전달할 context 길이: {len(context) if context else 0}자")
+    return context
+
+
+async def check_chat_cache(question: str, context: Optional[str], bypass: bool = False):
+    """
+    의미 캐시 조회 (컨텍스트 로드/LLM 호출 전에 수행)
+
+    Returns:
+        (캐시된 답변 또는 None, 저장용 슬롯 (context_key, 질문 임베딩) 또는 None)
+    """
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None, None
+    try:
+        document_hash = None
+        if context and context.endswith('.json'):
+            meta = text_store.meta(context.replace('.json', ''))
+            document_hash = meta["content_hash"] if meta else None
+        key = context_cache_key(context, document_hash)
+
+        if bypass:
+            semantic_cache.record_bypass()
+            return None, (key, await semantic_cache.embed(question))
+
+        hit, vector = await semantic_cache.lookup(question, key)
+        if hit:
+            print(f"[INFO] 의미 캐시 적중 (유사도 {hit['similarity']}): {hit['question'][:50]}")
+        return hit, (key, vector)
+    except Exception as e:
+        print(f"의미 캐시 조회 오류 (캐시 없이 진행): {e}")
+        return None, None
+
+
+def store_chat_cache(cache_slot, question: str, answer_md: str):
+    """생성된 답변을 의미 캐시에 저장"""
+    if cache_slot and answer_md:
+        key, vector = cache_slot
+        semantic_cache.store(question, key, answer_md, vector)
+
+
+# 기록 저장 태스크 참조 유지 (GC로 인한 취소 방지)
+_history_tasks = set()
+
+
+def record_history(kind: str, question: str, answer_md: str, citations: List[str], context_ref: Optional[str], completed: bool = True):
+    """응답 기록을 백그라운드로 저장 (응답 지연/취소와 무관하게 진행)"""
+    task = asyncio.create_task(save_qa_message(kind, question, answer_md, citations, context_ref, completed))
+    _history_tasks.add(task)
+    task.add_done_callback(_history_tasks.discard)
+
+
 # ============================================
 # 기존 엔드포인트 (문서 컨텍스트 지원 추가)
 # ============================================
 
-@router.post("/summary", response_model=QAResponse)
-async def create_summary(request: QARequest):
+@router.post("/summary", response_model=QAResponse, dependencies=[Depends(rate_limit("qa_summary"))])
+async def create_summary(request: SummaryRequest):
     """
     경제 요약 생성 (문서 컨텍스트 지원)
+    - 업로드 문서에 별도 질문 없이 요청하면 업로드 시 미리 생성된 다이제스트를 즉시 반환
     """
     try:
-        # context가 문서 파일명이면 해당 문서 로드
         context = request.context
-        print(f"[DEBUG] 원본 context: {context[:100] if context else 'None'}...")
-
-        if context and context.endswith('.json'):
-            loaded_context = load_document_context(context)
-            print(f"[DEBUG] 로드된 문서 길이: {len(loaded_context) if loaded_context else 0}자")
-            print(f"[DEBUG] 로드된 문서 미리보기: {loaded_context[:200] if loaded_context else 'None'}...")
-            if loaded_context:
-                context = loaded_context
+        question = (request.question or "").strip()
+
+        if not question:
+            if context and context.endswith('.json'):
+                digest = await load_current_digest(context)
+                if digest:
+                    return QAResponse(
+                        answer_md=digest["summary_md"],
+                        citations=digest.get("citations", []),
+                        created_at=datetime.utcnow()
+                    )
+            question = DEFAULT_SUMMARY_QUESTION
 
-        print(f"[DEBUG] OpenAI에 전달할 context 길이: {len(context) if context else 0}자")
+        # context가 문서 파일명이면 해당 문서 로드
+        context = resolve_summary_context(context)
 
-        result = await generate_summary(request.question, context)
+        # 긴 문서는 전체 내용을 반영하도록 map-reduce 요약
+        result = await summarize_text(question, context)
+        record_history("summary", question, result["answer_md"], result["citations"], request.context)
         return QAResponse(
             answer_md=result["answer_md"],
             citations=result["citations"],
             created_at=datetime.utcnow()
         )
+    except UpstreamBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.wait) + 1)})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"요약 생성 실패: {str(e)}")
 
 
-@router.post("/chat", response_model=QAResponse)
+@router.post("/chat", response_model=QAResponse, dependencies=[Depends(rate_limit("qa_chat"))])
 async def chat(request: QARequest):
     """
     Q&A 채팅 (문서 컨텍스트 지원)
     """
     try:
-        # context가 문서 파일명이면 해당 문서 로드
-        context = request.context
-        print(f"[DEBUG] 원본 context: {context[:100] if context else 'None'}...")
+        # 같은 컨텍스트의 유사 질문 답변이 있으면 LLM 호출 없이 반환
+        cached, cache_slot = await check_chat_cache(request.question, request.context, request.bypass_cache)
+        if cached:
+            record_history("chat", request.question, cached["answer_md"], [], request.context)
+            return QAResponse(
+                answer_md=cached["answer_md"],
+                citations=[],
+                created_at=datetime.utcnow(),
+                cached=True
+            )
 
-        if context and context.endswith('.json'):
-            loaded_context = load_document_context(context)
-            print(f"[DEBUG] 로드된 문서 길이: {len(loaded_context) if loaded_context else 0}자")
-            print(f"[DEBUG] 로드된 문서 미리보기: {loaded_context[:200] if loaded_context else 'None'}...")
-            if loaded_context:
-                context = loaded_context
-
-        print(f"[DEBUG] OpenAI에 전달할 context 길이: {len(context) if context else 0}자")
+        # context가 문서 파일명이면 해당 문서 로드
+        context = await resolve_chat_context(request.question, request.context)
 
         answer = await generate_chat_response(request.question, context)
+        store_chat_cache(cache_slot, request.question, answer)
+        record_history("chat", request.question, answer, [], request.context)
         return QAResponse(
             answer_md=answer,
             citations=[],
             created_at=datetime.utcnow()
         )
+    except UpstreamBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.wait) + 1)})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"응답 생성 실패: {str(e)}")
+
+
+# ============================================
+# 스트리밍 엔드포인트 (SSE / NDJSON)
+# ============================================
+
+STREAM_MEDIA_TYPES = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+
+
+def _format_event(event: str, data: dict, fmt: str) -> str:
+    if fmt == "ndjson":
+        return json.dumps({"type": event, **data}, ensure_ascii=False) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _open_stream(deltas):
+    """첫 delta까지 받아 업스트림 오류를 HTTP 상태 코드로 돌려줄 수 있게 함"""
+    try:
+        return await deltas.__anext__()
+    except StopAsyncIteration:
+        return ""
+    except UpstreamBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.wait) + 1)})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"응답 생성 실패: {str(e)}")
 
 
+async def _relay_stream(deltas, first: str, fmt: str, kind: str, question: str,
+                        context_ref: Optional[str], citations: Optional[List[str]] = None,
+                        on_complete=None, cached: bool = False):
+    """
+    delta를 SSE/NDJSON 이벤트로 전달하고 종료 시 기록 저장
+    - on_complete: 끝까지 생성된 경우 최종 답변으로 호출 (캐시 저장 등)
+
+    - 백프레셔: 클라이언트가 이전 청크를 받아간 뒤에야 업스트림에서 다음 delta를 읽음
+    - 연결 종료: Starlette가 응답 태스크를 취소하면 업스트림 스트림을 닫고 부분 응답을 기록
+    """
+    parts: List[str] = []
+    completed = False
+    try:
+        if first:
+            parts.append(first)
+            yield _format_event("delta", {"text": first}, fmt)
+        async for delta in deltas:
+            parts.append(delta)
+            yield _format_event("delta", {"text": delta}, fmt)
+
+        completed = True
+        answer = "".join(parts)
+        if on_complete is not None:
+            on_complete(answer)
+        yield _format_event("done", {
+            "answer_md": answer,
+            "citations": citations if citations is not None else extract_citations(answer),
+            "created_at": datetime.utcnow().isoformat(),
+            "cached": cached,
+        }, fmt)
+    except Exception as e:
+        print(f"스트리밍 응답 오류: {e}")
+        yield _format_event("error", {"detail": f"응답 생성 실패: {str(e)}"}, fmt)
+    finally:
+        with anyio.CancelScope(shield=True):
+            await deltas.aclose()
+        answer = "".join(parts)
+        if answer:
+            if citations is None:
+                citations = extract_citations(answer)
+            record_history(kind, question, answer, citations, context_ref, completed)
+
+
+def _streaming_response(body, fmt: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=STREAM_MEDIA_TYPES[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _single_delta(text: str):
+    yield text
+
+
+@router.post("/chat/stream", dependencies=[Depends(rate_limit("qa_chat"))])
+async def chat_stream(
+    request: QARequest,
+    format: str = Query("sse", pattern="^(sse|ndjson)$", description="sse 또는 ndjson")
+):
+    """
+    Q&A 채팅 스트리밍
+    - 이벤트: delta({"text"}) 반복 → done({"answer_md", "citations", "created_at"}) 또는 error
+    """
+    cached, cache_slot = await check_chat_cache(request.question, request.context, request.bypass_cache)
+    if cached:
+        return _streaming_response(
+            _relay_stream(_single_delta(cached["answer_md"]), "", format, "chat", request.question,
+                          request.context, citations=[], cached=True),
+            format
+        )
+
+    context = await resolve_chat_context(request.question, request.context)
+    deltas = stream_chat_response(request.question, context)
+    first = await _open_stream(deltas)
+    return _streaming_response(
+        _relay_stream(deltas, first, format, "chat", request.question, request.context, citations=[],
+                      on_complete=lambda answer: store_chat_cache(cache_slot, request.question, answer)),
+        format
+    )
+
+
+@router.post("/summary/stream", dependencies=[Depends(rate_limit("qa_summary"))])
+async def summary_stream(
+    request: SummaryRequest,
+    format: str = Query("sse", pattern="^(sse|ndjson)$", description="sse 또는 ndjson")
+):
+    """
+    요약 스트리밍
+    - 업로드 문서 기본 요약은 다이제스트를 한 번에 전달
+    - 긴 문서는 map-reduce 통합 요약까지 마친 뒤 최종 요약만 스트리밍
+    """
+    context = request.context
+    question = (request.question or "").strip()
+
+    if not question:
+        if context and context.endswith('.json'):
+            digest = await load_current_digest(context)
+            if digest:
+                return _streaming_response(
+                    _relay_stream(_single_delta(digest["summary_md"]), "", format, "summary",
+                                  DEFAULT_SUMMARY_QUESTION, context, citations=digest.get("citations", [])),
+                    format
+                )
+        question = DEFAULT_SUMMARY_QUESTION
+
+    try:
+        summary_context = await prepare_summary_context(resolve_summary_context(context))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"요약 생성 실패: {str(e)}")
+
+    deltas = stream_chat_response(question, summary_context, SUMMARY_PROMPT, temperature=1.0,
+                                  context_max_tokens=SUMMARY_CONTEXT_TOKENS, endpoint="qa_summary")
+    first = await _open_stream(deltas)
+    return _streaming_response(
+        _relay_stream(deltas, first, format, "summary", question, context),
+        format
+    )
+
+
 # ============================================
 # 새로 추가: 파일 업로드 엔드포인트
 # ============================================
 
 @router.post("/upload")
 async def upload_files(
+    background_tasks: BackgroundTasks,
     question: str = Form(...),
     files: List[UploadFile] = File(...)
 ):
@@ -212,8 +512,10 @@ async def upload_files(
     - 여러 파일 동시 업로드 가능
     - PDF, DOCX, TXT 파일에서 텍스트 추출
     - 첫 번째 파일명을 저장 ID로 사용
-    - JSON 파일과 MongoDB에 동시 저장
+    - 추출 텍스트는 압축 텍스트 저장소에 한 번만 저장
+    - JSON 파일과 MongoDB에는 메타데이터만 저장
     - 중복 파일 감지 및 기존 데이터 재사용
+    - 업로드 후 백그라운드에서 다이제스트(요약/핵심 용어/목차) 사전 생성
     """
 
     if not files:
@@ -288,15 +590,37 @@ async def upload_files(
             print(f"파일 처리 오류 ({file.filename}): {e}")
             continue
 
-    # JSON에 전체 텍스트 추가
-    uploaded_data["full_text"] = "\n\n".join(all_extracted_texts)
+    full_text = "\n\n".join(all_extracted_texts)
     uploaded_data["total_text_length"] = total_text_length
 
-    # 1. JSON 파일로 저장 (storage_id를 파일명으로 사용)
+    # 1. 전체 텍스트는 압축 텍스트 저장소에 한 번만 저장 (JSON/MongoDB에는 메타데이터만)
+    text_meta = text_store.put(storage_id, full_text)
+    uploaded_data["text_store"] = text_meta
+    storage_manager.touch(storage_id)
+
+    # 2. JSON 파일로 저장 (storage_id를 파일명으로 사용)
     with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(uploaded_data, f, ensure_ascii=False, indent=2)
+        json.dump(uploaded_data, f, ensure_ascii=False)
+
+    # 전문 검색 인덱스 갱신
+    try:
+        await asyncio.to_thread(fulltext_index.add_document, storage_id, full_text)
+    except Exception as e:
+        print(f"전문 검색 색인 오류: {e}")
+
+    # 목록 조회용 매니페스트 갱신 (메타데이터만)
+    try:
+        upload_manifest.upsert(build_manifest_entry(uploaded_data, json_filename))
+    except Exception as e:
+        print(f"매니페스트 갱신 오류: {e}")
+
+    # 청크 분할 + 로컬 임베딩 인덱스 생성 (질문 시 관련 청크만 사용)
+    try:
+        await document_index.build(storage_id, full_text)
+    except Exception as e:
+        print(f"청크 인덱스 생성 오류 (질문 시 재시도): {e}")
 
-    # 2. MongoDB에 저장
+    # 3. MongoDB에 저장
     try:
         db = get_database()  # await 제거 (일반 함수)
         collection = db["uploaded_documents"]
@@ -309,20 +633,24 @@ async def upload_files(
             "files": uploaded_data["files"],
             "total_files": len(uploaded_data["files"]),
             "total_text_length": total_text_length,
-            "full_text": "\n\n".join(all_extracted_texts),  # 전체 텍스트 저장
+            "content_hash": text_meta["content_hash"],  # 전체 텍스트는 data/text에 저장
             "status": "active"
         }
 
         # storage_id로 기존 문서 확인 후 업데이트 또는 삽입
         await collection.update_one(
             {"storage_id": storage_id},
-            {"$set": mongo_document},
+            {"$set": mongo_document, "$unset": {"full_text": ""}},
             upsert=True
         )
         print(f"MongoDB 저장 완료: {storage_id}")
     except Exception as e:
         print(f"MongoDB 저장 오류 (JSON은 정상 저장됨): {e}")
 
+    # 4. 다이제스트 사전 생성 (응답 후 백그라운드 실행)
+    if settings.PRECOMPUTE_DIGEST and full_text.strip():
+        background_tasks.add_task(build_document_digest, storage_id, full_text, text_meta["content_hash"])
+
     # 응답 생성
     response_md = f"""## 📁 파일 업로드 완료
 
@@ -358,33 +686,87 @@ async def upload_files(
 # ============================================
 
 @router.get("/uploads")
-async def get_uploads():
-    """저장된 JSON 파일 목록 조회"""
+async def get_uploads(
+    limit: int = Query(20, ge=1, le=100, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
+    """
+    업로드 문서 목록 조회 (최신순, 커서 페이지네이션)
+    - 문서 본문을 읽지 않고 매니페스트의 메타데이터만 사용
+    """
+    try:
+        uploads, next_cursor = upload_manifest.list_page(limit=limit, cursor=cursor)
+        return {"uploads": uploads, "next_cursor": next_cursor}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================
+# 업로드 문서 전문 검색
+# ============================================
+
+@router.get("/search")
+async def search_uploads(
+    q: str = Query(..., min_length=1, max_length=200, description="검색어"),
+    limit: int = Query(10, ge=1, le=50, description="최대 결과 수"),
+):
+    """
+    업로드 문서 전문 검색 (한국어 n-gram 역색인, BM25 + 구문 일치 가산점)
+    - 문서별 스니펫은 압축 텍스트 저장소에서 해당 범위만 읽어 생성
+    """
     try:
-        json_files = [f for f in os.listdir(JSON_DIR) if f.endswith('.json')]
-        json_files.sort(reverse=True)  # 최신순
-
-        uploads = []
-        for filename in json_files[:20]:  # 최근 20개만
-            file_path = os.path.join(JSON_DIR, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-                # 원본 파일명 목록 추출
-                original_filenames = [
-                    f.get("filename", "")
-                    for f in data.get("files", [])
-                ]
-
-                uploads.append({
-                    "storage_id": data.get("storage_id", filename.replace('.json', '')),  # storage_id 사용
-                    "filename": filename,
-                    "timestamp": data.get("timestamp"),
-                    "question": data.get("question"),
-                    "file_count": len(data.get("files", [])),
-                    "original_filenames": original_filenames  # 원본 파일명 추가
-                })
-
-        return {"uploads": uploads}
+        started = time.perf_counter()
+        hits = await asyncio.to_thread(fulltext_index.search, q, limit)
+
+        results = []
+        for hit in hits:
+            storage_id = hit["storage_id"]
+            position = hit["match_position"]
+            snippet = text_store.read(storage_id, max(0, position - 80), position + 120) or ""
+            entry = upload_manifest.get(storage_id) or {}
+            results.append({
+                "storage_id": storage_id,
+                "filename": entry.get("filename", f"{storage_id}.json"),
+                "original_filenames": entry.get("original_filenames", []),
+                "score": hit["score"],
+                "match_count": hit["match_count"],
+                "snippet": " ".join(snippet.split()),
+            })
+
+        return {
+            "query": q,
+            "results": results,
+            "count": len(results),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"검색 실패: {str(e)}")
+
+
+@router.get("/uploads/{storage_id}/digest")
+async def get_upload_digest(storage_id: str):
+    """업로드 문서의 사전 생성 다이제스트 조회 (요약/핵심 용어/목차)"""
+    digest = await load_current_digest(storage_id)
+    if not digest:
+        raise HTTPException(status_code=404, detail="다이제스트가 아직 생성되지 않았습니다.")
+    return {"storage_id": storage_id, **digest}
+
+
+@router.get("/cache/stats")
+async def get_chat_cache_stats():
+    """Q&A 의미 캐시 적중률 및 항목 통계"""
+    return semantic_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_chat_cache():
+    """Q&A 의미 캐시 비우기"""
+    semantic_cache.clear()
+    return {"message": "의미 캐시를 비웠습니다."}
+
+
+@router.get("/storage")
+async def get_storage_stats():
+    """업로드/파생 데이터 디스크 사용량 및 마지막 정리 결과 조회"""
+    return await asyncio.to_thread(storage_manager.usage)
+
@@ -15,6 +15,7 @@ from app.models.problems import (
 )
 from app.db.mongo import get_database, mongo
 from app.services.llm_service import generate_retry_problems_payload
+from app.services.rate_limiter import rate_limit
 
 # 로거 설정
 logger = logging.getLogger("econ.quiz")
@@ -410,7 +411,8 @@ async def export_quiz_attempt_csv(
         logger.error(f"퀴즈 시도 CSV 내보내기 실패: {e}")
         raise HTTPException(status_code=500, detail=f"퀴즈 시도 CSV 내보내기 실패: {str(e)}")
 
-@router.post("/retry", response_model=RetryResponse, summary="틀린 문제 기반 맞춤형 문제 생성")
+@router.post("/retry", response_model=RetryResponse, summary="틀린 문제 기반 맞춤형 문제 생성",
+             dependencies=[Depends(rate_limit("quiz_retry"))])
 async def create_retry_problems(
     retry_request: RetryRequest,
     db: Optional[AsyncIOMotorDatabase] = Depends(get_database_or_none),
@@ -482,7 +484,7 @@ async def create_retry_problems(
         # LLM으로 재시도 문제 생성
         try:
             logger.info(f"[INFO] LLM 호출 시작: {len(wrong_questions)}개 틀린 문제 분석")
-            payload = generate_retry_problems_payload(
+            payload = await generate_retry_problems_payload(
                 wrong_questions, 
                 retry_request.num_questions, 
                 retry_request.model
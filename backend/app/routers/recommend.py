@@ -1,7 +1,11 @@
 """자료 추천 라우터"""
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
 from app.models.common import RecommendRequest, RecommendResponse, Bookmark
 from app.services.openai_svc import generate_recommendations
+from app.services.recommend_cache import recommend_cache
+from app.services.rate_limiter import UpstreamBudgetExceeded, rate_limit
+from app.services.circuit_breaker import CircuitOpenError
 from app.db.mongo import get_database
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
@@ -9,23 +13,53 @@ from datetime import datetime
 router = APIRouter(tags=["recommend"])
 
 
-@router.post("/recommend", response_model=RecommendResponse)
+@router.post("/recommend", response_model=RecommendResponse, dependencies=[Depends(rate_limit("recommend"))])
 async def get_recommendations(request: RecommendRequest):
     """
     자료 추천 생성
+    - 같은 (주제, 수준, 목적) 결과는 캐시에서 반환 (오래된 결과는 반환 후 백그라운드 갱신)
     """
-    try:
+    async def generate():
         items = await generate_recommendations(
             topic=request.topic,
             level=request.level,
             purpose=request.purpose
         )
-        
+        return [item.model_dump() for item in items]
+
+    try:
+        items = await recommend_cache.get_or_generate(request.topic, request.level, request.purpose, generate)
         return RecommendResponse(items=items)
+    except UpstreamBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(int(e.wait) + 1)})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {str(e)}")
 
 
+@router.get("/recommend/cache/stats")
+async def get_recommend_cache_stats():
+    """추천 캐시 적중/갱신 통계"""
+    return recommend_cache.stats()
+
+
+@router.delete("/recommend/cache")
+async def invalidate_recommend_cache(
+    topic: Optional[str] = Query(None),
+    level: Optional[str] = Query(None),
+    purpose: Optional[str] = Query(None)
+):
+    """
+    추천 캐시 무효화 (topic, level, purpose를 모두 지정하면 해당 항목만, 아니면 전체)
+    """
+    given = [v for v in (topic, level, purpose) if v]
+    if given and len(given) != 3:
+        raise HTTPException(status_code=400, detail="topic, level, purpose는 모두 지정하거나 모두 생략해야 합니다.")
+    deleted = await recommend_cache.invalidate(topic, level, purpose)
+    return {"deleted": deleted, "message": "추천 캐시를 무효화했습니다."}
+
+
 @router.post("/recommend/bookmark")
 async def create_bookmark(bookmark: Bookmark, db: AsyncIOMotorDatabase = Depends(get_database)):
     """
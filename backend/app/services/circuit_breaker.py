@@ -0,0 +1,169 @@
+"""LLM 제공자 장애 대응 서킷 브레이커 (오류율 + 느린 호출 비율)"""
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Optional, Tuple
+
+import openai
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 제공자 장애로 보는 예외 (요청 자체가 잘못된 경우(400/401 등)는 제외)
+PROVIDER_FAILURES = (
+    openai.APIConnectionError,  # APITimeoutError 포함
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 LLM 호출을 보내지 않을 때 (호출 측에서 데모/캐시 응답으로 대체)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM 서비스가 일시적으로 불안정합니다. {retry_after:.0f}초 후 다시 시도해 주세요.")
+        self.retry_after = retry_after
+
+
+class _Outcome:
+    """guard() 블록 안에서 측정한 업스트림 응답 시간 (초)"""
+    latency: Optional[float] = None
+
+
+class CircuitBreaker:
+    """
+    최근 CIRCUIT_WINDOW_SEC 동안의 호출 결과로 상태 전환
+
+    - closed: 호출 허용. 최소 호출 수 이상에서 오류율 또는 느린 호출 비율이 기준을 넘으면 open
+    - open: 호출 즉시 CircuitOpenError. CIRCUIT_OPEN_SEC 후 half_open
+    - half_open: 탐색 호출 1건만 허용. 성공(느리지 않음)하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, name: str = "openai"):
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._window: Deque[Tuple[float, bool, bool]] = deque()  # (시각, 실패 여부, 느린 호출 여부)
+        self._probe_in_flight = False
+        self.trips = 0
+        self.short_circuited = 0
+        self.last_trip_reason = ""
+
+    def _prune(self, now: float):
+        while self._window and now - self._window[0][0] > settings.CIRCUIT_WINDOW_SEC:
+            self._window.popleft()
+
+    def _retry_after(self, now: float) -> float:
+        return max(0.0, self.opened_at + settings.CIRCUIT_OPEN_SEC - now)
+
+    def _trip(self, now: float, reason: str):
+        self.state = OPEN
+        self.opened_at = now
+        self.trips += 1
+        self.last_trip_reason = reason
+        self._window.clear()
+        print(f"[WARNING] LLM 서킷 열림 ({self.name}): {reason}")
+
+    def allows_calls(self) -> bool:
+        """지금 호출을 보낼 수 있는지 (백그라운드 작업이 열린 서킷에서 쉬어 가도록 사용)"""
+        if self.state == OPEN:
+            return self._retry_after(time.monotonic()) <= 0
+        return not (self.state == HALF_OPEN and self._probe_in_flight)
+
+    def reject_if_open(self):
+        """호출 준비(예산 확보 등) 전에 열린 서킷을 미리 걸러냄 (판단 자체는 guard()에서)"""
+        if settings.CIRCUIT_ENABLED and not self.allows_calls():
+            self.short_circuited += 1
+            raise CircuitOpenError(self._retry_after(time.monotonic()) or settings.CIRCUIT_OPEN_SEC)
+
+    def _admit(self) -> bool:
+        """호출 허용 여부 판단 (허용하지 않으면 CircuitOpenError). 탐색 호출이면 True"""
+        if not settings.CIRCUIT_ENABLED:
+            return False
+        now = time.monotonic()
+        if self.state == OPEN:
+            if self._retry_after(now) > 0:
+                self.short_circuited += 1
+                raise CircuitOpenError(self._retry_after(now))
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError(settings.CIRCUIT_OPEN_SEC)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _record(self, probe: bool, failed: bool, latency: Optional[float]):
+        now = time.monotonic()
+        slow = latency is not None and latency > settings.CIRCUIT_SLOW_CALL_SEC
+
+        if probe:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._trip(now, "탐색 호출 실패" if failed else f"탐색 호출 지연 {latency:.1f}초")
+            else:
+                self.state = CLOSED
+                print(f"[INFO] LLM 서킷 복구 ({self.name})")
+            return
+
+        if self.state != CLOSED:
+            return
+        self._window.append((now, failed, slow))
+        self._prune(now)
+        calls = len(self._window)
+        if calls < settings.CIRCUIT_MIN_CALLS:
+            return
+        error_rate = sum(1 for _, f, _ in self._window if f) / calls
+        slow_rate = sum(1 for _, _, s in self._window if s) / calls
+        if error_rate >= settings.CIRCUIT_ERROR_RATE:
+            self._trip(now, f"오류율 {error_rate:.0%} ({calls}건)")
+        elif slow_rate >= settings.CIRCUIT_SLOW_RATE:
+            self._trip(now, f"느린 호출 비율 {slow_rate:.0%} ({calls}건)")
+
+    @contextmanager
+    def guard(self):
+        """
+        LLM 호출 1건 감싸기
+
+        사용 예:
+            with breaker.guard() as outcome:
+                started = time.perf_counter()
+                resp = await client.chat.completions.create(...)
+                outcome.latency = time.perf_counter() - started
+        """
+        probe = self._admit()
+        outcome = _Outcome()
+        try:
+            yield outcome
+        except PROVIDER_FAILURES:
+            self._record(probe, failed=True, latency=None)
+            raise
+        except BaseException:
+            # 요청 오류/취소 등은 제공자 상태와 무관하므로 집계하지 않음
+            if probe:
+                self._probe_in_flight = False
+            raise
+        else:
+            self._record(probe, failed=False, latency=outcome.latency)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._prune(now)
+        calls = len(self._window)
+        return {
+            "enabled": settings.CIRCUIT_ENABLED,
+            "state": self.state,
+            "retry_after_sec": round(self._retry_after(now), 1) if self.state == OPEN else 0.0,
+            "window_calls": calls,
+            "window_error_rate": round(sum(1 for _, f, _ in self._window if f) / calls, 3) if calls else 0.0,
+            "window_slow_rate": round(sum(1 for _, _, s in self._window if s) / calls, 3) if calls else 0.0,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+            "last_trip_reason": self.last_trip_reason,
+        }
@@ -0,0 +1,142 @@
+"""업로드 문서 다이제스트 (요약/핵심 용어/목차) 사전 생성 서비스"""
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from app.db.mongo import get_database
+from app.services.openai_svc_qa import SYSTEM_PROMPT_BASE, generate_chat_response
+from app.services.summarizer import DIRECT_SUMMARY_MAX_CHARS, summarize_text
+from app.services.prompt_budget import SUMMARY_CONTEXT_TOKENS
+
+# 다이제스트 로컬 저장 디렉토리 (MongoDB 미연결 시에도 사용)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+DIGEST_DIR = os.path.join(BASE_DIR, "data", "digests")
+os.makedirs(DIGEST_DIR, exist_ok=True)
+
+DEFAULT_SUMMARY_QUESTION = "이 문서의 핵심 내용을 요약해주세요."
+
+OUTLINE_PROMPT = SYSTEM_PROMPT_BASE + """
+
+참고 자료를 바탕으로 아래 형식 그대로 답하세요. 다른 말은 덧붙이지 마세요.
+핵심 용어: 용어1, 용어2, 용어3 (최대 10개)
+목차:
+- 첫 번째 주제
+- 두 번째 주제
+"""
+
+
+def _digest_path(storage_id: str) -> str:
+    return os.path.join(DIGEST_DIR, f"{storage_id}.json")
+
+
+def _parse_outline(text: str) -> dict:
+    """'핵심 용어:' / '목차:' 형식의 응답을 key_terms, outline으로 분리"""
+    key_terms: List[str] = []
+    outline: List[str] = []
+    in_outline = False
+
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("핵심 용어"):
+            terms = line.split(":", 1)[1] if ":" in line else ""
+            key_terms = [t.strip() for t in terms.split(",") if t.strip()][:10]
+            in_outline = False
+        elif line.startswith("목차"):
+            in_outline = True
+        elif in_outline:
+            outline.append(line.lstrip("-*0123456789. ").strip())
+
+    return {"key_terms": key_terms, "outline": [item for item in outline if item]}
+
+
+async def build_document_digest(storage_id: str, text: str, content_hash: str) -> Optional[dict]:
+    """
+    문서 다이제스트 생성 후 저장 (업로드 직후 백그라운드 작업으로 실행)
+
+    - summary_md: 기본 요약 (긴 문서는 map-reduce, 청크 요약 캐시 재사용)
+    - key_terms / outline: 요약을 바탕으로 한 번의 LLM 호출로 생성
+    - content_hash와 함께 저장하여 내용이 바뀌면 무효화
+    - 같은 내용(content_hash)의 다이제스트가 이미 있으면 LLM 호출 없이 그대로 반환 (재업로드 등)
+    """
+    if not text or not text.strip():
+        return None
+
+    existing = await get_document_digest(storage_id, content_hash)
+    if existing:
+        print(f"[INFO] 다이제스트 재사용 (내용 동일): {storage_id}")
+        return existing
+
+    try:
+        summary = await summarize_text(DEFAULT_SUMMARY_QUESTION, text)
+
+        outline_raw = await generate_chat_response(
+            "핵심 용어와 목차를 정리해주세요.",
+            summary["answer_md"] if len(text) > DIRECT_SUMMARY_MAX_CHARS else text,
+            OUTLINE_PROMPT,
+            temperature=0.3,
+            context_max_tokens=SUMMARY_CONTEXT_TOKENS,
+            endpoint="qa_digest"
+        )
+
+        digest = {
+            "content_hash": content_hash,
+            "summary_md": summary["answer_md"],
+            "citations": summary.get("citations", []),
+            **_parse_outline(outline_raw),
+            "generated_at": datetime.utcnow().isoformat(),
+        }
+    except Exception as e:
+        print(f"[WARNING] 다이제스트 생성 실패 ({storage_id}): {e}")
+        return None
+
+    # 1. 로컬 저장
+    with open(_digest_path(storage_id), "w", encoding="utf-8") as f:
+        json.dump(digest, f, ensure_ascii=False)
+
+    # 2. MongoDB uploaded_documents 레코드에 저장 (같은 내용일 때만)
+    try:
+        db = get_database()
+        await db["uploaded_documents"].update_one(
+            {"storage_id": storage_id, "content_hash": content_hash},
+            {"$set": {"digest": digest}}
+        )
+    except Exception as e:
+        print(f"다이제스트 MongoDB 저장 오류 (로컬은 정상 저장됨): {e}")
+
+    print(f"[INFO] 다이제스트 생성 완료: {storage_id}")
+    return digest
+
+
+async def get_document_digest(storage_id: str, content_hash: str) -> Optional[dict]:
+    """
+    저장된 다이제스트 조회 (content_hash가 다르면 무효로 간주하여 None)
+    - MongoDB 우선, 실패 시 로컬 파일
+    """
+    try:
+        db = get_database()
+        doc = await db["uploaded_documents"].find_one(
+            {"storage_id": storage_id},
+            {"digest": 1, "_id": 0}
+        )
+        digest = (doc or {}).get("digest")
+        if digest and digest.get("content_hash") == content_hash:
+            return digest
+    except Exception:
+        pass
+
+    path = _digest_path(storage_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        digest = json.load(f)
+    return digest if digest.get("content_hash") == content_hash else None
+
+
+def delete_document_digest(storage_id: str):
+    """로컬 다이제스트 삭제"""
+    path = _digest_path(storage_id)
+    if os.path.exists(path):
+        os.remove(path)
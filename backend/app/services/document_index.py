@@ -0,0 +1,213 @@
+"""업로드 문서 청크 인덱스 (로컬 임베딩 기반 관련 청크 검색)"""
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_service import aget_embedding_service
+from app.services.prompt_budget import count_tokens
+
+# 청크 인덱스 저장 디렉토리
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+CHUNK_INDEX_DIR = os.path.join(BASE_DIR, "data", "chunks")
+os.makedirs(CHUNK_INDEX_DIR, exist_ok=True)
+
+EMBEDDING_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 (prompt_budget.count_tokens: tiktoken 사용 가능하면 정확한 값, 아니면 근사치)"""
+    return count_tokens(text)
+
+
+def split_text(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
+    """
+    문단/문장 경계를 우선하는 문자 기준 청킹
+
+    Args:
+        text: 원문 텍스트
+        chunk_size: 청크 최대 길이 (문자)
+        overlap: 인접 청크 간 겹치는 길이 (문자)
+
+    Returns:
+        청크 리스트
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # 청크 후반부에서 문단 > 줄바꿈 > 문장 경계 순으로 자를 위치 탐색
+            window_start = start + chunk_size // 2
+            for sep in ("\n\n", "\n", ". ", "다. ", " "):
+                cut = text.rfind(sep, window_start, end)
+                if cut != -1:
+                    end = cut + len(sep)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        if end >= length:
+            break
+        next_start = max(end - overlap, start + 1)
+        # 겹침 구간이 단어 중간에서 시작하지 않도록 다음 공백 이후로 이동
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+
+    return chunks
+
+
+class DocumentIndex:
+    """
+    문서별 청크 벡터 인덱스
+
+    - 업로드 시 청킹 + 로컬 임베딩(ko-sroberta) 후 <storage_id>.json / .npy로 저장
+    - 질문 시 상위 k개 청크를 토큰 예산 안에서 선택하여 컨텍스트 구성
+    """
+
+    def __init__(self, index_dir: str = CHUNK_INDEX_DIR, max_cached: int = 32):
+        self.index_dir = index_dir
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[str, Tuple[List[str], np.ndarray]]" = OrderedDict()
+
+    def _paths(self, storage_id: str) -> Tuple[str, str]:
+        base = os.path.join(self.index_dir, storage_id)
+        return f"{base}.json", f"{base}.npy"
+
+    def exists(self, storage_id: str) -> bool:
+        meta_path, vec_path = self._paths(storage_id)
+        return os.path.exists(meta_path) and os.path.exists(vec_path)
+
+    async def build(self, storage_id: str, text: str) -> int:
+        """
+        문서 텍스트를 청킹/임베딩하여 인덱스 저장
+        (내용 해시가 같으면 재생성하지 않음)
+
+        Returns:
+            청크 개수
+        """
+        content_hash = hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+        meta_path, vec_path = self._paths(storage_id)
+
+        if self.exists(storage_id):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("content_hash") == content_hash:
+                    return len(meta.get("chunks", []))
+            except Exception:
+                pass
+
+        chunks = split_text(text)
+        if not chunks:
+            return 0
+
+        service = await aget_embedding_service()
+        embeddings = await service.create_embeddings_batch(chunks)
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+        np.save(vec_path, vectors)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "storage_id": storage_id,
+                "model": EMBEDDING_MODEL_NAME,
+                "content_hash": content_hash,
+                "chunks": chunks,
+            }, f, ensure_ascii=False)
+
+        self._cache.pop(storage_id, None)
+        print(f"[INFO] 청크 인덱스 생성 완료: {storage_id} ({len(chunks)}개 청크)")
+        return len(chunks)
+
+    def _load(self, storage_id: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        if storage_id in self._cache:
+            self._cache.move_to_end(storage_id)
+            return self._cache[storage_id]
+
+        if not self.exists(storage_id):
+            return None
+
+        meta_path, vec_path = self._paths(storage_id)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            chunks = json.load(f).get("chunks", [])
+        vectors = np.load(vec_path)
+
+        self._cache[storage_id] = (chunks, vectors)
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return chunks, vectors
+
+    async def select_context(
+        self,
+        storage_id: str,
+        question: str,
+        top_k: int = 6,
+        token_budget: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        질문과 관련도가 높은 청크를 토큰 예산 안에서 선택
+
+        Args:
+            storage_id: 문서 저장 ID
+            question: 사용자 질문
+            top_k: 최대 청크 개수
+            token_budget: 컨텍스트에 허용할 최대 토큰 수 (기본 PROMPT_CONTEXT_TOKENS)
+
+        Returns:
+            선택된 청크를 문서 순서대로 이어붙인 컨텍스트 (인덱스가 없으면 None)
+        """
+        loaded = await asyncio.to_thread(self._load, storage_id)
+        if not loaded:
+            return None
+
+        chunks, vectors = loaded
+        if not chunks:
+            return None
+
+        service = await aget_embedding_service()
+        query = np.asarray(await service.create_embedding(question), dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = vectors @ query
+
+        token_budget = token_budget or settings.PROMPT_CONTEXT_TOKENS
+        selected = []
+        used_tokens = 0
+        for idx in np.argsort(-scores)[:top_k]:
+            chunk_tokens = estimate_tokens(chunks[idx])
+            if selected and used_tokens + chunk_tokens > token_budget:
+                continue
+            selected.append(int(idx))
+            used_tokens += chunk_tokens
+
+        # 원문 흐름을 유지하도록 문서 순서로 정렬
+        selected.sort()
+        return "\n\n...\n\n".join(chunks[idx] for idx in selected)
+
+    def forget(self, storage_id: str) -> List[str]:
+        """메모리 캐시에서만 제거하고 인덱스 파일 경로 반환 (파일 삭제는 호출 측에서, 다음 질문 시 재생성)"""
+        self._cache.pop(storage_id, None)
+        return list(self._paths(storage_id))
+
+    def delete(self, storage_id: str):
+        """문서 인덱스 삭제"""
+        for path in self.forget(storage_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# 싱글톤 인스턴스
+document_index = DocumentIndex()
@@ -0,0 +1,96 @@
+"""RAG용 임베딩 백엔드 레지스트리 (OpenAI / 로컬 모델 교체 가능)"""
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+
+class LocalSentenceEmbeddings(Embeddings):
+    """
+    로컬 EmbeddingService(ko-sroberta)를 LangChain Embeddings 인터페이스로 감싼 어댑터
+    - 네트워크 호출 없이 CPU에서 배치 인코딩
+    - 정규화된 벡터를 반환하므로 FAISS L2 거리 순위가 코사인 유사도 순위와 같음
+    """
+
+    def __init__(self, batch_size: int = 32):
+        from app.services.embedding_service import get_embedding_service
+
+        self.service = get_embedding_service()
+        self.batch_size = batch_size
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.service.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True
+        )
+        return [vector.tolist() for vector in vectors]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._encode(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return await asyncio.to_thread(self._encode, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await asyncio.to_thread(self._encode, [text]))[0]
+
+
+def _create_openai_embeddings() -> Embeddings:
+    from langchain_openai import OpenAIEmbeddings
+    from app.services.http_clients import client_registry
+
+    return OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        openai_api_key=settings.OPENAI_API_KEY,
+        **client_registry.langchain_kwargs()
+    )
+
+
+# 이름 -> (생성 함수, 식별자)
+# 식별자는 인덱스 메타데이터에 기록되어, 다른 임베딩으로 만든 인덱스를 섞어 쓰지 않도록 함
+_EMBEDDER_REGISTRY: Dict[str, Tuple[Callable[[], Embeddings], str]] = {}
+_EMBEDDER_INSTANCES: Dict[str, Embeddings] = {}
+
+
+def register_embedder(name: str, factory: Callable[[], Embeddings], identity: Optional[str] = None):
+    """
+    임베딩 백엔드 등록
+
+    Args:
+        name: 설정(RAG_EMBEDDER)에서 사용할 이름
+        factory: Embeddings 인스턴스 생성 함수 (최초 사용 시 1회 호출)
+        identity: 인덱스 메타데이터에 기록할 식별자 (기본값: name)
+    """
+    _EMBEDDER_REGISTRY[name] = (factory, identity or name)
+    _EMBEDDER_INSTANCES.pop(name, None)
+
+
+def get_embedder(name: str) -> Embeddings:
+    """등록된 임베딩 백엔드 인스턴스 반환"""
+    if name not in _EMBEDDER_REGISTRY:
+        raise ValueError(f"등록되지 않은 임베딩 백엔드입니다: {name} (사용 가능: {', '.join(_EMBEDDER_REGISTRY)})")
+    if name not in _EMBEDDER_INSTANCES:
+        factory, _ = _EMBEDDER_REGISTRY[name]
+        _EMBEDDER_INSTANCES[name] = factory()
+    return _EMBEDDER_INSTANCES[name]
+
+
+def get_embedder_identity(name: str) -> str:
+    """인덱스 메타데이터용 임베딩 식별자 반환"""
+    if name not in _EMBEDDER_REGISTRY:
+        raise ValueError(f"등록되지 않은 임베딩 백엔드입니다: {name}")
+    return _EMBEDDER_REGISTRY[name][1]
+
+
+register_embedder("openai", _create_openai_embeddings, "openai:text-embedding-3-small")
+register_embedder("local", LocalSentenceEmbeddings, "local:jhgan/ko-sroberta-multitask")
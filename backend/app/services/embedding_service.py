@@ -1,8 +1,16 @@
 """한국어 임베딩 생성 서비스 (ko-sroberta-multitask)"""
-from typing import List, Dict
+from typing import List, Dict, Optional
 import asyncio
 import os
-from sentence_transformers import SentenceTransformer
+import threading
+import time
+
+# 모델 로드 실패 후 이 시간 동안은 다시 시도하지 않고 즉시 실패 (호출 측은 바로 폴백)
+LOAD_RETRY_SECONDS = 300
+
+
+class EmbeddingModelUnavailable(RuntimeError):
+    """임베딩 모델을 불러올 수 없을 때 (최근 로드 실패가 기억된 경우 포함)"""
 
 
 class EmbeddingService:
@@ -11,6 +19,8 @@ class EmbeddingService:
     def __init__(self):
         # 한국어 특화 오픈소스 모델 사용
         # 로컬 캐시 경로 직접 지정
+        from sentence_transformers import SentenceTransformer
+
         model_path = os.path.expanduser("~/.cache/huggingface/hub/models--jhgan--ko-sroberta-multitask")
         self.model = SentenceTransformer(model_path)
         self.embedding_dimension = 768  # ko-sroberta는 768차원
@@ -133,3 +143,57 @@ class EmbeddingService:
             return 0.0
 
         return dot_product / (magnitude1 * magnitude2)
+
+
+# 공유 인스턴스 (모델 로딩 비용이 크므로 최초 사용 시 1회만 로드)
+_embedding_service: Optional[EmbeddingService] = None
+_load_lock = threading.Lock()
+_load_error: Optional[str] = None
+_load_failed_at = 0.0
+
+
+def _raise_if_recently_failed():
+    if _load_error is not None and time.monotonic() - _load_failed_at < LOAD_RETRY_SECONDS:
+        raise EmbeddingModelUnavailable(f"임베딩 모델을 사용할 수 없습니다: {_load_error}")
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    공유 EmbeddingService 인스턴스 반환 (동기, 첫 호출 시 모델 로드로 블로킹)
+    - 이벤트 루프에서는 aget_embedding_service() 사용
+    - 로드 실패는 LOAD_RETRY_SECONDS 동안 기억하고 EmbeddingModelUnavailable로 즉시 실패
+    """
+    global _embedding_service, _load_error, _load_failed_at
+    if _embedding_service is not None:
+        return _embedding_service
+    _raise_if_recently_failed()
+    with _load_lock:
+        if _embedding_service is not None:
+            return _embedding_service
+        _raise_if_recently_failed()
+        try:
+            _embedding_service = EmbeddingService()
+        except Exception as e:
+            _load_error = str(e) or type(e).__name__
+            _load_failed_at = time.monotonic()
+            print(f"[WARNING] 임베딩 모델 로드 실패 ({LOAD_RETRY_SECONDS}초 동안 재시도 안 함): {e}")
+            raise EmbeddingModelUnavailable(f"임베딩 모델을 사용할 수 없습니다: {_load_error}") from e
+        _load_error = None
+        return _embedding_service
+
+
+async def aget_embedding_service() -> EmbeddingService:
+    """공유 EmbeddingService 인스턴스 반환 (모델 로드는 스레드에서 수행해 이벤트 루프를 막지 않음)"""
+    if _embedding_service is not None:
+        return _embedding_service
+    _raise_if_recently_failed()
+    return await asyncio.to_thread(get_embedding_service)
+
+
+def warm_up() -> bool:
+    """모델 미리 로드 (lifespan에서 스레드로 실행해 첫 요청 지연 방지)"""
+    try:
+        get_embedding_service()
+        return True
+    except EmbeddingModelUnavailable:
+        return False
@@ -0,0 +1,232 @@
+"""업로드 문서 전문 검색 인덱스 (한국어 n-gram + 위치 정보 역색인)"""
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# 인덱스 저장 디렉토리
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+FULLTEXT_DIR = os.path.join(BASE_DIR, "data", "fulltext")
+os.makedirs(FULLTEXT_DIR, exist_ok=True)
+
+_WORD_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+PHRASE_BONUS = 2.0
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """
+    검색용 토큰화 (토큰, 문자 위치) 리스트
+
+    - 한글 연속 구간: 글자 bigram (한 글자 단어는 unigram)
+    - 영문/숫자: 단어 단위 (소문자)
+    - 위치는 원문 문자 오프셋이므로 bigram이 연속이면 위치도 1씩 증가
+    """
+    tokens: List[Tuple[str, int]] = []
+    for match in _WORD_RE.finditer((text or "").lower()):
+        word, start = match.group(), match.start()
+        if word[0] >= "가":
+            if len(word) == 1:
+                tokens.append((word, start))
+            else:
+                tokens.extend((word[i:i + 2], start + i) for i in range(len(word) - 1))
+        else:
+            tokens.append((word, start))
+    return tokens
+
+
+def _query_words(query: str) -> List[List[str]]:
+    """질의를 단어별 토큰 시퀀스로 분리 (구문 일치 확인용)"""
+    return [[token for token, _ in tokenize(match.group())] for match in _WORD_RE.finditer((query or "").lower())]
+
+
+class FullTextIndex:
+    """
+    전문 검색 역색인
+
+    - 메모리: 토큰 -> {storage_id: 출현 빈도} (BM25 점수 계산용)
+    - 디스크: 문서별 위치 포스팅 (<storage_id>.idx, zlib 압축 JSON)
+      상위 후보 문서만 위치 포스팅을 읽어 구문 일치 확인과 스니펫 위치 계산
+    """
+
+    def __init__(self, index_dir: str = FULLTEXT_DIR):
+        self.index_dir = index_dir
+        self._tf: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_tokens: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, storage_id: str) -> str:
+        return os.path.join(self.index_dir, f"{storage_id}.idx")
+
+    # ----------------------------
+    # 로드 / 저장
+    # ----------------------------
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for filename in os.listdir(self.index_dir):
+                if not filename.endswith(".idx"):
+                    continue
+                storage_id = filename[:-4]
+                try:
+                    data = self._read_postings(storage_id)
+                    self._add_to_memory(storage_id, data["length"], data["postings"])
+                except Exception as e:
+                    print(f"[WARNING] 전문 검색 인덱스 로드 실패 ({filename}): {e}")
+            self._loaded = True
+
+    def _read_postings(self, storage_id: str) -> dict:
+        with open(self._path(storage_id), "rb") as f:
+            return json.loads(zlib.decompress(f.read()).decode("utf-8"))
+
+    def _add_to_memory(self, storage_id: str, length: int, postings: Dict[str, List[int]]):
+        for token, positions in postings.items():
+            self._tf[token][storage_id] = len(positions)
+        self._doc_lengths[storage_id] = length
+        self._doc_tokens[storage_id] = list(postings.keys())
+
+    def _remove_from_memory(self, storage_id: str):
+        for token in self._doc_tokens.pop(storage_id, []):
+            docs = self._tf.get(token)
+            if docs is not None:
+                docs.pop(storage_id, None)
+                if not docs:
+                    del self._tf[token]
+        self._doc_lengths.pop(storage_id, None)
+
+    # ----------------------------
+    # 색인 / 삭제
+    # ----------------------------
+    def add_document(self, storage_id: str, text: str) -> int:
+        """
+        문서 색인 (같은 storage_id가 있으면 교체)
+
+        Returns:
+            고유 토큰 수
+        """
+        self._ensure_loaded()
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for token, position in tokenize(text):
+            postings[token].append(position)
+
+        payload = zlib.compress(json.dumps({"length": len(text or ""), "postings": postings}).encode("utf-8"))
+        tmp_path = f"{self._path(storage_id)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(storage_id))
+
+        with self._lock:
+            self._remove_from_memory(storage_id)
+            self._add_to_memory(storage_id, len(text or ""), postings)
+        return len(postings)
+
+    def remove_document(self, storage_id: str):
+        """문서 색인 삭제"""
+        self._ensure_loaded()
+        with self._lock:
+            self._remove_from_memory(storage_id)
+        if os.path.exists(self._path(storage_id)):
+            os.remove(self._path(storage_id))
+
+    # ----------------------------
+    # 검색
+    # ----------------------------
+    def _bm25(self, tokens: List[str]) -> Dict[str, float]:
+        total_docs = len(self._doc_lengths)
+        avg_length = (sum(self._doc_lengths.values()) / total_docs) if total_docs else 1.0
+        scores: Dict[str, float] = defaultdict(float)
+
+        for token in set(tokens):
+            docs = self._tf.get(token)
+            if not docs:
+                continue
+            idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for storage_id, tf in docs.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[storage_id] / avg_length)
+                scores[storage_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    @staticmethod
+    def _phrase_positions(postings: Dict[str, List[int]], word_tokens: List[str]) -> List[int]:
+        """단어의 토큰이 연속된 위치로 나타나는 시작 위치 목록"""
+        if not word_tokens or word_tokens[0] not in postings:
+            return []
+        following = [set(postings.get(token, ())) for token in word_tokens[1:]]
+        return [
+            start for start in postings[word_tokens[0]]
+            if all(start + offset in positions for offset, positions in enumerate(following, 1))
+        ]
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        문서 검색
+
+        Args:
+            query: 검색어
+            limit: 최대 결과 수
+
+        Returns:
+            [{"storage_id", "score", "match_count", "match_position"}, ...] (점수 내림차순)
+        """
+        self._ensure_loaded()
+        words = [w for w in _query_words(query) if w]
+        tokens = [token for word in words for token in word]
+        if not tokens:
+            return []
+
+        with self._lock:
+            scores = self._bm25(tokens)
+
+        # 상위 후보만 위치 포스팅을 읽어 구문 일치 보너스와 스니펫 위치 계산
+        candidates = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit * 3]
+        results = []
+        for storage_id, score in candidates:
+            try:
+                postings = self._read_postings(storage_id)["postings"]
+            except Exception:
+                continue
+
+            match_position: Optional[int] = None
+            match_count = 0
+            for word_tokens in words:
+                starts = self._phrase_positions(postings, word_tokens)
+                if starts:
+                    score += PHRASE_BONUS
+                    match_count += len(starts)
+                    if match_position is None:
+                        match_position = starts[0]
+
+            if match_position is None:
+                first = [postings[token][0] for token in tokens if token in postings]
+                match_position = min(first) if first else 0
+
+            results.append({
+                "storage_id": storage_id,
+                "score": round(score, 4),
+                "match_count": match_count,
+                "match_position": match_position,
+            })
+
+        results.sort(key=lambda item: item["score"], reverse=True)
+        return results[:limit]
+
+    def stats(self) -> dict:
+        self._ensure_loaded()
+        return {"documents": len(self._doc_lengths), "terms": len(self._tf)}
+
+
+# 싱글톤 인스턴스
+fulltext_index = FullTextIndex()
@@ -0,0 +1,187 @@
+"""OpenAI 호출용 공유 HTTP 클라이언트 레지스트리 (커넥션 풀 재사용 + 요청 메트릭)"""
+import os
+from typing import Optional, Union
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+
+# 응답 대기(read) 타임아웃 (초) - 연결/풀 대기 타임아웃은 설정에서 따로 지정
+REQ_TIMEOUT = int(os.getenv("OPENAI_TIMEOUT_SEC", "120"))
+
+
+class _RequestCounter:
+    """
+    클라이언트별 요청 수 집계 (전송 계층을 감싸 직접 세므로 httpx/httpcore 내부 구조에 의존하지 않음)
+    - in_flight: 응답 헤더를 아직 받지 못한 요청 수 (연결 풀 대기 포함)
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def started(self):
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, failed: bool):
+        self.in_flight -= 1
+        if failed:
+            self.failures += 1
+
+    def stats(self, client: Optional[Union[httpx.AsyncClient, httpx.Client]]) -> Optional[dict]:
+        if client is None:
+            return None
+        return {
+            "closed": client.is_closed,
+            "requests": self.requests,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "utilization": round(self.in_flight / settings.HTTP_MAX_CONNECTIONS, 3),
+        }
+
+
+class _CountingAsyncTransport(httpx.AsyncBaseTransport):
+    """요청 수를 세는 비동기 전송 계층 (실제 전송은 httpx.AsyncHTTPTransport)"""
+
+    def __init__(self, counter: _RequestCounter, **kwargs):
+        self._counter = counter
+        self._transport = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._counter.started()
+        failed = True
+        try:
+            response = await self._transport.handle_async_request(request)
+            failed = False
+            return response
+        finally:
+            self._counter.finished(failed)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class _CountingTransport(httpx.BaseTransport):
+    """요청 수를 세는 동기 전송 계층 (실제 전송은 httpx.HTTPTransport)"""
+
+    def __init__(self, counter: _RequestCounter, **kwargs):
+        self._counter = counter
+        self._transport = httpx.HTTPTransport(**kwargs)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._counter.started()
+        failed = True
+        try:
+            response = self._transport.handle_request(request)
+            failed = False
+            return response
+        finally:
+            self._counter.finished(failed)
+
+    def close(self):
+        self._transport.close()
+
+
+class ClientRegistry:
+    """
+    OpenAI 호출이 공유하는 HTTP 클라이언트
+
+    - lifespan 시작 시 start(), 종료 시 aclose() (lifespan 밖에서 쓰면 처음 사용할 때 생성)
+    - AsyncOpenAI(게이트웨이)와 LangChain(ChatOpenAI, OpenAIEmbeddings)이 같은 풀 사용
+    - keep-alive로 TLS 핸드셰이크를 재사용하고, 최대 연결 수/타임아웃을 한 곳에서 관리
+    """
+
+    def __init__(self):
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._sync_http: Optional[httpx.Client] = None
+        self._openai: Optional[AsyncOpenAI] = None
+        self._async_counter = _RequestCounter()
+        self._sync_counter = _RequestCounter()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            REQ_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SEC,
+            pool=settings.HTTP_POOL_TIMEOUT_SEC,
+        )
+
+    @property
+    def async_http(self) -> httpx.AsyncClient:
+        if self._async_http is None or self._async_http.is_closed:
+            self._async_http = httpx.AsyncClient(
+                transport=_CountingAsyncTransport(self._async_counter, limits=self._limits()),
+                timeout=self._timeout(),
+            )
+            self._openai = None
+        return self._async_http
+
+    @property
+    def sync_http(self) -> httpx.Client:
+        """동기 호출용 (LangChain의 동기 경로)"""
+        if self._sync_http is None or self._sync_http.is_closed:
+            self._sync_http = httpx.Client(
+                transport=_CountingTransport(self._sync_counter, limits=self._limits()),
+                timeout=self._timeout(),
+            )
+        return self._sync_http
+
+    @property
+    def openai(self) -> AsyncOpenAI:
+        http_client = self.async_http
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL or None,
+                http_client=http_client,
+            )
+        return self._openai
+
+    def langchain_kwargs(self) -> dict:
+        """ChatOpenAI / OpenAIEmbeddings 생성 인자"""
+        kwargs = {"http_client": self.sync_http, "http_async_client": self.async_http}
+        if settings.OPENAI_BASE_URL:
+            kwargs["base_url"] = settings.OPENAI_BASE_URL
+        return kwargs
+
+    async def start(self):
+        """lifespan 시작 시 클라이언트 미리 생성"""
+        _ = self.openai
+
+    async def aclose(self):
+        """lifespan 종료 시 열린 연결 정리"""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+        if self._sync_http is not None:
+            self._sync_http.close()
+        self._async_http = None
+        self._sync_http = None
+        self._openai = None
+
+    def stats(self) -> dict:
+        return {
+            "limits": {
+                "max_connections": settings.HTTP_MAX_CONNECTIONS,
+                "max_keepalive": settings.HTTP_MAX_KEEPALIVE,
+                "keepalive_expiry_sec": settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+                "read_timeout_sec": REQ_TIMEOUT,
+            },
+            "async": self._async_counter.stats(self._async_http),
+            "sync": self._sync_counter.stats(self._sync_http),
+        }
+
+
+# 싱글톤 인스턴스
+client_registry = ClientRegistry()
@@ -0,0 +1,162 @@
+"""LLM 토큰 스트림에서 JSON 배열 항목을 점진적으로 추출하는 파서 (잘리거나 깨진 응답 복구 포함)"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_ITEMS_KEY_RE = re.compile(r'"items"\s*:\s*\[')
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def repair_json(text: str) -> str:
+    """
+    모델이 자주 내는 사소한 JSON 오류 보정
+
+    - 문자열 안의 줄바꿈/탭 등 제어 문자를 이스케이프
+    - 닫는 괄호 앞의 쉼표(trailing comma) 제거
+    """
+    out: List[str] = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            elif ord(ch) < 0x20:
+                ch = _CONTROL_ESCAPES.get(ch, f"\\u{ord(ch):04x}")
+            out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "}]":
+            # 직전의 공백을 건너뛰고 쉼표가 있으면 제거
+            i = len(out) - 1
+            while i >= 0 and out[i].isspace():
+                i -= 1
+            if i >= 0 and out[i] == ",":
+                del out[i]
+        out.append(ch)
+    return "".join(out)
+
+
+def _loads_item(raw: str) -> Optional[Dict[str, Any]]:
+    """항목 객체 파싱 (실패하면 보정 후 한 번 더 시도, 그래도 실패하면 None)"""
+    try:
+        item = json.loads(raw)
+    except json.JSONDecodeError:
+        try:
+            item = json.loads(repair_json(raw))
+        except json.JSONDecodeError:
+            return None
+    return item if isinstance(item, dict) else None
+
+
+class ItemsStreamParser:
+    """
+    {"items": [{...}, {...}, ...]} 형태의 응답에서 완성된 항목을 도착 순서대로 추출
+
+    - 문자열/이스케이프 상태를 추적하여 문자열 안의 괄호는 무시
+    - 항목 객체가 닫히는 즉시 json.loads로 파싱하여 반환 (실패하면 repair_json으로 보정 후 재시도)
+    - 코드블록(```json)이나 앞뒤 여분 텍스트는 "items" 키를 찾을 때까지 건너뜀
+
+    사용 예:
+        parser = ItemsStreamParser()
+        for delta in stream:
+            for item in parser.feed(delta):
+                ...
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0                    # 다음에 검사할 위치
+        self._array_started = False
+        self._depth = 0                  # 배열 내부 기준 중첩 깊이
+        self._in_string = False
+        self._escape = False
+        self._item_start: Optional[int] = None
+        self.done = False                # 배열이 닫혔는지 여부
+        self.errors: List[str] = []      # 파싱에 실패한 항목 원문
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        새 텍스트 조각을 추가하고 이번에 완성된 항목 목록 반환
+        """
+        if self.done or not text:
+            return []
+        self._buffer += text
+
+        if not self._array_started:
+            match = _ITEMS_KEY_RE.search(self._buffer)
+            if not match:
+                return []
+            self._array_started = True
+            self._pos = match.end()
+
+        items: List[Dict[str, Any]] = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._item_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0 and ch == "]":
+                    self.done = True
+                    self._pos = i + 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and ch == "}" and self._item_start is not None:
+                    raw = buffer[self._item_start:i + 1]
+                    self._item_start = None
+                    item = _loads_item(raw)
+                    if item is not None:
+                        items.append(item)
+                    else:
+                        self.errors.append(raw)
+        else:
+            self._pos = len(buffer)
+
+        # 처리가 끝난 앞부분은 버려 버퍼가 커지지 않게 함
+        keep_from = self._item_start if self._item_start is not None else self._pos
+        self._buffer = buffer[keep_from:]
+        self._pos -= keep_from
+        if self._item_start is not None:
+            self._item_start = 0
+        return items
+
+
+def salvage_items(text: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    전체 응답에서 완성된 items 항목만 건져냄 (max_tokens로 잘렸거나 일부가 깨진 응답용)
+
+    - "items" 키 없이 배열만 온 경우도 처리
+    - 마지막의 미완성 항목과 보정해도 파싱되지 않는 항목은 버림
+
+    Returns:
+        (항목 목록, 배열이 정상적으로 닫혔는지 여부)
+    """
+    parser = ItemsStreamParser()
+    items = parser.feed(text or "")
+    if not parser._array_started:
+        start = (text or "").find("[")
+        if start == -1:
+            return [], False
+        parser = ItemsStreamParser()
+        items = parser.feed('{"items": ' + text[start:])
+    return items, parser.done
@@ -0,0 +1,269 @@
+"""비동기 LLM 게이트웨이 (전역/모델별 동시 실행 제한 + 호출 예산 + 대기 시간/사용량 메트릭)"""
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.http_clients import REQ_TIMEOUT, client_registry
+from app.services.prompt_budget import MODEL_CONTEXT_WINDOWS
+from app.services.rate_limiter import estimate_message_tokens, upstream_budget
+from app.services.single_flight import SingleFlight, canonical_key
+from app.services.usage_meter import usage_meter
+
+logger = logging.getLogger("econ.llm")
+
+
+def parse_model_limits(spec: str) -> Dict[str, int]:
+    """'gpt-4o=2,gpt-3.5-turbo=8' 형식의 모델별 동시 실행 한도 파싱"""
+    limits: Dict[str, int] = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"[LLM] 잘못된 모델 동시 실행 설정 무시: {part}")
+    return limits
+
+
+class _ModelStats:
+    """모델별 호출/대기 시간 통계 (최근 대기 시간 샘플로 p95 계산)"""
+
+    def __init__(self, window: int = 500):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_latency = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=window)
+
+    def snapshot(self, limit: int) -> dict:
+        waits = sorted(self.recent_waits)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "limit": limit,
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_wait_ms": round(self.total_wait / self.calls * 1000, 1) if self.calls else 0.0,
+            "p95_wait_ms": round(p95 * 1000, 1),
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_latency_ms": round(self.total_latency / self.calls * 1000, 1) if self.calls else 0.0,
+        }
+
+
+class LLMGateway:
+    """
+    Chat Completions 호출 단일 진입점
+
+    - 공유 AsyncOpenAI 클라이언트(client_registry)로 이벤트 루프를 막지 않음
+    - 모델은 호출마다 지정 (전역 상태 변경 없음)
+    - 전역 세마포어(LLM_MAX_CONCURRENCY) + 모델별 세마포어(LLM_MODEL_CONCURRENCY)
+    - 슬롯을 얻기까지의 대기 시간을 모델별로 기록
+    - 호출 전 업스트림 RPM/TPM 예산 확보, 응답 후 엔드포인트별 토큰/비용 기록
+    - 서킷 브레이커: 제공자 장애/지연이 이어지면 호출 없이 즉시 CircuitOpenError
+    - 허용 목록에 없는 모델은 기본 모델(OPENAI_MODEL)로 호출 (클라이언트가 지정한 이름마다 세마포어/통계가 늘지 않도록)
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, model_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.model_limits = model_limits if model_limits is not None else parse_model_limits(settings.LLM_MODEL_CONCURRENCY)
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, _ModelStats] = defaultdict(_ModelStats)
+        self._single_flight = SingleFlight()
+        self.breaker = CircuitBreaker()
+        self.coalesce_opt_out = {name.strip() for name in settings.LLM_COALESCE_OPT_OUT.split(",") if name.strip()}
+        self.allowed_models = (
+            set(MODEL_CONTEXT_WINDOWS)
+            | set(self.model_limits)
+            | {name.strip() for name in settings.LLM_ALLOWED_MODELS.split(",") if name.strip()}
+        )
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        return client_registry.openai
+
+    def resolve_model(self, model: Optional[str]) -> str:
+        """호출할 모델 이름 (지정하지 않았거나 허용 목록에 없으면 OPENAI_MODEL)"""
+        if not model:
+            return settings.OPENAI_MODEL
+        if model not in self.allowed_models and model != settings.OPENAI_MODEL:
+            logger.warning(f"[LLM] 허용되지 않은 모델 요청, 기본 모델로 대체: {model[:50]} -> {settings.OPENAI_MODEL}")
+            return settings.OPENAI_MODEL
+        return model
+
+    def _limit_for(self, model: str) -> int:
+        return self.model_limits.get(model, self.max_concurrency)
+
+    def _semaphores(self, model: str):
+        # 세마포어는 실행 중인 이벤트 루프에서 처음 사용할 때 생성
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        if model not in self._model_semaphores:
+            self._model_semaphores[model] = asyncio.Semaphore(self._limit_for(model))
+        return self._global_semaphore, self._model_semaphores[model]
+
+    @asynccontextmanager
+    async def _slot(self, model: str):
+        """전역/모델별 슬롯 획득 (대기 시간, 실행 중 호출 수, 오류, 지연 시간 기록)"""
+        stats = self._stats[model]
+        global_semaphore, model_semaphore = self._semaphores(model)
+
+        queued_at = time.perf_counter()
+        acquired = False
+        stats.waiting += 1
+        try:
+            async with model_semaphore, global_semaphore:
+                acquired = True
+                started = time.perf_counter()
+                wait = started - queued_at
+                stats.waiting -= 1
+                stats.calls += 1
+                stats.in_flight += 1
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                stats.recent_waits.append(wait)
+                try:
+                    yield
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    stats.in_flight -= 1
+                    stats.total_latency += time.perf_counter() - started
+        finally:
+            # 대기 중 취소된 경우
+            if not acquired:
+                stats.waiting -= 1
+
+    def should_coalesce(self, endpoint: Optional[str], coalesce: bool = True) -> bool:
+        """동일 요청 공유 여부 (전역 설정, 엔드포인트별 opt-out, 호출별 지정)"""
+        return settings.LLM_COALESCE and coalesce and endpoint not in self.coalesce_opt_out
+
+    async def chat(
+        self,
+        messages: List[dict],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        max_tokens: int = 800,
+        timeout: float = REQ_TIMEOUT,
+        response_format: Optional[dict] = None,
+        endpoint: Optional[str] = None,
+        coalesce: bool = True,
+    ) -> str:
+        """
+        Chat Completions 호출
+
+        Args:
+            messages: 메시지 목록
+            model: 사용할 모델 (None이거나 허용 목록에 없으면 OPENAI_MODEL)
+            temperature: 생성 온도
+            max_tokens: 최대 출력 토큰
+            timeout: 요청 타임아웃 (초)
+            response_format: 응답 형식 (예: {"type": "json_object"})
+            endpoint: 호출한 기능 이름 (opt-out 설정 및 메트릭용, 예: "problems", "recommend")
+            coalesce: False면 같은 요청이 실행 중이어도 별도로 호출 (다양한 결과가 필요한 경우)
+
+        Returns:
+            응답 텍스트
+        """
+        model = self.resolve_model(model)
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if response_format:
+            request["response_format"] = response_format
+
+        async def call() -> str:
+            prompt_estimate = estimate_message_tokens(messages)
+            with self.breaker.guard() as outcome:
+                await upstream_budget.acquire(prompt_estimate + max_tokens)
+                async with self._slot(model):
+                    started = time.perf_counter()
+                    resp = await self.client.chat.completions.create(**request, timeout=timeout)
+                    outcome.latency = time.perf_counter() - started
+            content = (resp.choices[0].message.content or "").strip()
+
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+            else:
+                prompt_tokens, completion_tokens = prompt_estimate, estimate_message_tokens([{"content": content}])
+            usage_meter.record(endpoint, model, prompt_tokens, completion_tokens, estimated=usage is None)
+            upstream_budget.settle(prompt_estimate + max_tokens, prompt_tokens + completion_tokens)
+            return content
+
+        if self.should_coalesce(endpoint, coalesce):
+            # 같은 요청이 이미 실행 중이면 그 결과를 함께 사용
+            return await self._single_flight.do(canonical_key(request), call)
+        return await call()
+
+    async def stream_chat(
+        self,
+        messages: List[dict],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        max_tokens: int = 800,
+        timeout: float = REQ_TIMEOUT,
+        endpoint: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Chat Completions 스트리밍 호출 (delta 텍스트 단위로 yield)
+        - 스트림이 끝나거나 제너레이터가 닫힐 때까지 슬롯을 점유
+        - 스트림 응답에는 usage가 없어 출력 토큰은 받은 텍스트로 추정 (중간에 닫혀도 받은 만큼 기록)
+        """
+        model = self.resolve_model(model)
+        self.breaker.reject_if_open()
+        prompt_estimate = estimate_message_tokens(messages)
+        await upstream_budget.acquire(prompt_estimate + max_tokens)
+        received: List[str] = []
+        async with self._slot(model):
+            # 서킷은 연결/응답 시작까지만 판단 (이후 소비 측이 스트림을 닫는 것은 장애가 아님)
+            with self.breaker.guard() as outcome:
+                started = time.perf_counter()
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout,
+                    stream=True,
+                )
+                outcome.latency = time.perf_counter() - started
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                completion_estimate = estimate_message_tokens([{"content": "".join(received)}])
+                usage_meter.record(endpoint, model, prompt_estimate, completion_estimate, estimated=True)
+                upstream_budget.settle(prompt_estimate + max_tokens, prompt_estimate + completion_estimate)
+                await stream.response.aclose()
+
+    def stats(self) -> dict:
+        """모델별 호출/대기 시간 통계"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "models": {model: s.snapshot(self._limit_for(model)) for model, s in self._stats.items()},
+            "circuit": self.breaker.stats(),
+            "coalescing": {"enabled": settings.LLM_COALESCE, "opt_out": sorted(self.coalesce_opt_out), **self._single_flight.stats()},
+        }
+
+
+# 싱글톤 인스턴스
+llm_gateway = LLMGateway()
@@ -1,23 +1,29 @@
 import os
 import re
 import json
+import asyncio
 import logging
-from typing import Any, Dict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
-from tenacity import retry, stop_after_attempt, wait_exponential
-from openai import OpenAI
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
 from app.services.prompts.problem_prompt import build_problem_prompt, build_retry_problem_prompt
 from app.services.demo_service import generate_demo_problems, generate_demo_retry_problems
+from app.services.llm_gateway import llm_gateway
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.rate_limiter import UpstreamBudgetExceeded
+from app.services.json_stream import ItemsStreamParser, repair_json, salvage_items
+from app.services.single_flight import SingleFlight, canonical_key
 from app.core.config import settings
+from app.models.problems import ProblemItem, RetryProblemItem
 
 # 로거
 logger = logging.getLogger("econ.llm")
 
-# OpenAI 클라이언트 (main.py에서 load_dotenv()가 먼저 실행되어야 함)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# 기본 모델 (호출마다 model 인자로 바꿀 수 있음, 전역 상태는 변경하지 않음)
 MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")  # 더 빠른 모델로 변경
-REQ_TIMEOUT = int(os.getenv("OPENAI_TIMEOUT_SEC", "120"))  # 2분으로 증가
 
 def _extract_json(text: str) -> Dict[str, Any]:
     """
@@ -37,55 +43,324 @@ def _extract_json(text: str) -> Dict[str, Any]:
         if first != -1 and last != -1 and last > first:
             s = s[first:last + 1]
 
-    return json.loads(s)
+    try:
+        return json.loads(s)
+    except json.JSONDecodeError:
+        # 제어 문자/trailing comma 같은 사소한 오류는 보정 후 재시도
+        return json.loads(repair_json(s))
+
+def _parse_items(raw: str) -> List[Any]:
+    """
+    응답에서 items 배열 추출
+    - 정상 JSON이면 그대로 반환
+    - max_tokens로 잘렸거나 형식이 깨졌으면 완성된 항목만 건져냄 (전체를 버리고 다시 생성하지 않도록)
+    """
+    try:
+        data = _extract_json(raw)
+        if isinstance(data, dict) and isinstance(data.get("items"), list) and data["items"]:
+            return data["items"]
+    except Exception as e:
+        logger.warning(f"[LLM JSON 파싱 실패, 항목 복구 시도] {e}")
+
+    items, closed = salvage_items(raw)
+    if not items:
+        logger.error(f"[LLM JSON 파싱 실패]\n=== RAW START ===\n{raw}\n=== RAW END ===")
+        raise ValueError("AI 응답의 JSON에서 'items' 항목을 찾지 못했습니다.")
+    logger.warning(f"[LLM JSON 복구] {'형식 오류' if closed else '잘린'} 응답에서 완성된 항목 {len(items)}개 복구")
+    return items
+
+SYSTEM_PROMPT = "경제학 문제 출제 전문가. JSON만 출력."
+
+# 같은 조건(topic, level, count, style)의 문제 생성 요청 공유 (분할/보충 호출까지 포함한 요청 단위)
+_problem_flight = SingleFlight()
+
+class LLMCallCounter:
+    """count_llm_calls() 블록 안에서 실제로 실행된 LLM 호출 수 (분할/보충/재시도 호출 포함)"""
 
-@retry(stop=stop_after_attempt(2), wait=wait_exponential(multiplier=1, min=1, max=4), reraise=True)
-def _chat_complete(prompt: str) -> str:
+    def __init__(self):
+        self.calls = 0
+
+_call_counter: ContextVar[Optional[LLMCallCounter]] = ContextVar("llm_call_counter", default=None)
+
+@contextmanager
+def count_llm_calls() -> Iterator[LLMCallCounter]:
+    """
+    블록 안에서 실행된 _chat_complete 호출 수 집계 (문제 은행 보충 예산 계산용)
+    - 분할 생성의 하위 요청(gather 태스크)도 같은 컨텍스트를 이어받으므로 함께 집계
+    """
+    counter = LLMCallCounter()
+    token = _call_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _call_counter.reset(token)
+
+def check_problem_rules(item: ProblemItem, style: str, index: int) -> Optional[str]:
+    """
+    mcq 규칙 준수 확인 (위반 시 오류 메시지, 통과 시 None)
+    """
+    if style == "mcq":
+        if item.options is None or len(item.options) != 4:
+            return f"{index+1}번 문항: 객관식은 보기 4개가 필요합니다."
+    return None
+
+@retry(
+    stop=stop_after_attempt(2),
+    wait=wait_exponential(multiplier=1, min=1, max=4),
+    retry=retry_if_not_exception_type((CircuitOpenError, UpstreamBudgetExceeded)),
+    reraise=True
+)
+async def _chat_complete(prompt: str, model: str = MODEL, endpoint: str = "problems", coalesce: bool = True) -> str:
     """
     OpenAI Chat Completions 호출 (지수 백오프 2회 재시도)
+    - LLM 게이트웨이를 통해 동시 호출 수 제한
+    - 같은 프롬프트가 동시에 실행 중이면 결과 공유 (coalesce=False로 해제)
+    - 서킷이 열렸거나 호출 예산을 넘은 경우는 재시도하지 않고 바로 전달
     """
-    resp = client.chat.completions.create(
-        model=MODEL,
+    counter = _call_counter.get()
+    if counter is not None:
+        counter.calls += 1
+    return await llm_gateway.chat(
         messages=[
-            {"role": "system", "content": "경제학 문제 출제 전문가. JSON만 출력."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user",   "content": prompt},
         ],
+        model=model,
         temperature=0.5,  # 더 일관된 결과
         max_tokens=800,   # 토큰 수 줄임
-        timeout=REQ_TIMEOUT,
+        endpoint=endpoint,
+        coalesce=coalesce,
     )
-    return (resp.choices[0].message.content or "").strip()
 
-def generate_econ_problems_payload(topic: str, level: str, count: int, style: str) -> Dict[str, Any]:
+async def _generate_problem_batch(
+    topic: str, level: str, count: int, style: str, note: str = "", coalesce: bool = True
+) -> Dict[str, Any]:
+    """
+    단일 LLM 호출로 count개 문항 생성 (note는 프롬프트 끝에 덧붙이는 추가 지시)
+    """
+    prompt = build_problem_prompt(topic, level, count, style)
+    if note:
+        prompt = f"{prompt}\n\n{note}"
+    raw = await _chat_complete(prompt, coalesce=coalesce)
+    return {"items": _parse_items(raw)}
+
+def _normalize_question(question: str) -> str:
+    return re.sub(r"\s+", "", question or "").lower()
+
+def _merge_valid_items(merged: List[Dict[str, Any]], raw_items: List[Any], style: str, seen: set):
+    """
+    검증(ProblemItem + mcq 규칙)을 통과하고 질문이 중복되지 않는 문항만 merged에 추가
+    """
+    for raw in raw_items:
+        if not isinstance(raw, dict):
+            continue
+        try:
+            item = ProblemItem(**raw)
+        except Exception as e:
+            logger.warning(f"[LLM 문항 검증 실패] {e}")
+            continue
+        if check_problem_rules(item, style, len(merged)):
+            continue
+        key = _normalize_question(item.question)
+        if key in seen:
+            continue
+        seen.add(key)
+        merged.append(raw)
+
+async def _generate_problems_fanout(topic: str, level: str, count: int, style: str) -> Dict[str, Any]:
+    """
+    큰 요청을 PROBLEM_FANOUT_CHUNK_SIZE개 단위 하위 요청으로 나눠 동시에 생성
+
+    1. 하위 요청을 동시에 호출 (전체 지연 시간 ≈ 가장 느린 작은 호출)
+    2. 검증 통과 문항만 합치고 질문 기준 중복 제거
+    3. 부족분은 이미 출제된 질문을 제외하도록 지시한 후속 호출로 보충
+    """
+    chunk_size = max(1, settings.PROBLEM_FANOUT_CHUNK_SIZE)
+    sizes = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    logger.info(f"[REAL] 문제 생성 분할: {count}문제 → {len(sizes)}개 하위 요청 {sizes}")
+
+    # 같은 프롬프트의 동시 호출은 비슷한 문항을 내기 쉬우므로 하위 요청마다 세트 번호를 명시
+    results = await asyncio.gather(
+        *(
+            _generate_problem_batch(
+                topic, level, size, style,
+                note=f"(전체 {len(sizes)}개 세트 중 {i + 1}번째 세트입니다. 다른 세트와 겹치지 않도록 서로 다른 세부 개념을 다루세요.)",
+                coalesce=False  # 하위 요청은 서로 다른 결과가 필요
+            )
+            for i, size in enumerate(sizes)
+        ),
+        return_exceptions=True
+    )
+
+    merged: List[Dict[str, Any]] = []
+    seen: set = set()
+    errors = []
+    for result in results:
+        if isinstance(result, Exception):
+            errors.append(result)
+            logger.warning(f"[LLM 하위 요청 실패] {result}")
+            continue
+        _merge_valid_items(merged, result.get("items", []), style, seen)
+
+    return await _fill_missing(topic, level, count, style, merged, seen, errors)
+
+def _exclude_note(questions: List[str]) -> str:
+    existing = "\n".join(f"- {question}" for question in questions)
+    return f"다음 문항과 겹치지 않는 새로운 문항만 출제하세요.\n{existing}" if existing else ""
+
+async def _fill_missing(
+    topic: str, level: str, count: int, style: str,
+    merged: List[Dict[str, Any]], seen: set, errors: List[Exception]
+) -> Dict[str, Any]:
+    """
+    검증 통과 문항이 count개보다 적으면 부족한 개수만 한 번 더 요청해 채움
+    (전체를 다시 생성하지 않고, 이미 출제된 질문은 제외하도록 지시)
+    """
+    missing = count - len(merged)
+    if missing > 0:
+        logger.info(f"[REAL] 부족분 보충 요청: {missing}문제")
+        note = _exclude_note([item["question"] for item in merged])
+        try:
+            top_up = await _generate_problem_batch(topic, level, missing, style, note=note, coalesce=False)
+            _merge_valid_items(merged, top_up.get("items", []), style, seen)
+        except Exception as e:
+            errors.append(e)
+            logger.warning(f"[LLM 보충 요청 실패] {e}")
+
+    if not merged:
+        if errors:
+            raise errors[0]
+        raise ValueError("AI 응답에 'items' 배열이 없거나 비어 있습니다.")
+
+    return {"items": merged[:count]}
+
+async def generate_econ_problems_payload(
+    topic: str, level: str, count: int, style: str, coalesce: bool = True
+) -> Dict[str, Any]:
     """
     OpenAI에 문제 생성을 요청해 JSON payload(dict)를 반환.
     DEMO 모드일 때는 더미 데이터를 반환합니다.
+    PROBLEM_FANOUT_CHUNK_SIZE보다 많은 문항은 하위 요청으로 나눠 동시에 생성합니다.
+    coalesce=True면 같은 조건의 요청이 동시에 실행 중일 때 (분할 여부와 관계없이) 결과를 공유합니다.
+    검증(ProblemItem + mcq 규칙)을 통과한 문항만 반환하고, 잘린 응답 등으로 모자라면 부족분만 보충합니다.
     """
     # DEMO 모드 확인
     if settings.DEMO:
         logger.info(f"[DEMO] 더미 문제 생성: {topic}, {level}, {count}문제, {style}")
         return generate_demo_problems(topic, level, count, style)
-    
-    # 실제 OpenAI 호출
+
+    if llm_gateway.should_coalesce("problems", coalesce):
+        key = canonical_key({"topic": topic, "level": level, "count": count, "style": style})
+        payload = await _problem_flight.do(key, lambda: _generate_problems(topic, level, count, style))
+        # 공유된 결과를 호출 측이 수정해도 서로 영향이 없도록 목록은 복사해서 반환
+        return {"items": list(payload["items"])}
+    return await _generate_problems(topic, level, count, style)
+
+def problem_coalescing_stats() -> Dict[str, Any]:
+    """문제 생성 요청 공유 통계"""
+    return _problem_flight.stats()
+
+async def _generate_problems(topic: str, level: str, count: int, style: str) -> Dict[str, Any]:
+    """실제 OpenAI 호출 (요청 공유는 generate_econ_problems_payload에서 처리하므로 하위 호출은 공유하지 않음)"""
     logger.info(f"[REAL] OpenAI 문제 생성: {topic}, {level}, {count}문제, {style}")
-    prompt = build_problem_prompt(topic, level, count, style)
-    raw = _chat_complete(prompt)
+    if count > settings.PROBLEM_FANOUT_CHUNK_SIZE:
+        return await _generate_problems_fanout(topic, level, count, style)
+
+    data = await _generate_problem_batch(topic, level, count, style, coalesce=False)
+    merged: List[Dict[str, Any]] = []
+    seen: set = set()
+    _merge_valid_items(merged, data["items"], style, seen)
+    return await _fill_missing(topic, level, count, style, merged, seen, [])
+
+async def stream_econ_problems(topic: str, level: str, count: int, style: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    문제 생성 스트리밍: 토큰 스트림에서 items 배열 항목이 완성될 때마다 dict로 yield
+    DEMO 모드이거나 LLM 서킷이 열려 있으면 더미 데이터를 순서대로 반환합니다.
+    검증을 통과한 문항이 모자라면 (응답 잘림, 배열 조기 종료, 검증 실패) 부족분만 추가로 요청해 이어서 반환합니다.
+    """
+    if settings.DEMO:
+        logger.info(f"[DEMO] 더미 문제 스트리밍: {topic}, {level}, {count}문제, {style}")
+        for item in generate_demo_problems(topic, level, count, style).get("items", []):
+            yield item
+        return
 
+    logger.info(f"[REAL] OpenAI 문제 스트리밍: {topic}, {level}, {count}문제, {style}")
+    prompt = build_problem_prompt(topic, level, count, style)
+    parser = ItemsStreamParser()
+    deltas = llm_gateway.stream_chat(
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user",   "content": prompt},
+        ],
+        model=MODEL,
+        temperature=0.5,
+        max_tokens=800,
+        endpoint="problems",
+    )
+    # 검증(ProblemItem + mcq 규칙)을 통과한 문항의 질문 (보충 여부/제외 목록 판단용)
+    questions: List[str] = []
     try:
-        data = _extract_json(raw)
-    except Exception as e:
-        logger.error(f"[LLM JSON 파싱 실패] {e}\n=== RAW START ===\n{raw}\n=== RAW END ===")
-        raise
+        async for delta in deltas:
+            for item in parser.feed(delta):
+                if _is_valid_problem(item, style, len(questions)):
+                    questions.append(item["question"])
+                yield item
+            if parser.done:
+                break
+    except CircuitOpenError as e:
+        logger.warning(f"[DEGRADED] LLM 서킷 열림, 더미 문제로 대체: {e}")
+        for item in generate_demo_problems(topic, level, count, style).get("items", []):
+            yield item
+        return
+    finally:
+        await deltas.aclose()
 
-    if "items" not in data or not isinstance(data["items"], list) or len(data["items"]) == 0:
-        raise ValueError("AI 응답에 'items' 배열이 없거나 비어 있습니다.")
+    for raw in parser.errors:
+        logger.error(f"[LLM 항목 JSON 파싱 실패]\n=== RAW START ===\n{raw}\n=== RAW END ===")
 
-    return data
+    # 잘린 응답뿐 아니라 배열이 일찍 닫혔거나 검증 실패 문항이 있어도 부족분만 보충
+    missing = count - len(questions)
+    if missing > 0:
+        reason = "잘린 스트림" if not parser.done else "검증 통과 문항"
+        logger.info(f"[REAL] {reason} 부족분 보충 요청: {missing}문제")
+        try:
+            top_up = await _generate_problem_batch(
+                topic, level, missing, style, note=_exclude_note(questions), coalesce=False
+            )
+        except Exception as e:
+            logger.warning(f"[LLM 보충 요청 실패] {e}")
+            return
+        for item in top_up["items"]:
+            yield item
+
+def _is_valid_problem(raw: Any, style: str, index: int) -> bool:
+    """스트림 항목이 검증(ProblemItem + mcq 규칙)을 통과하는지"""
+    if not isinstance(raw, dict):
+        return False
+    try:
+        item = ProblemItem(**raw)
+    except Exception:
+        return False
+    return check_problem_rules(item, style, index) is None
 
-def generate_retry_problems_payload(wrong_questions: list, num_questions: int, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
+def _valid_retry_items(raw_items: List[Any]) -> List[Dict[str, Any]]:
+    """RetryProblemItem 검증을 통과한 항목만 남김"""
+    valid = []
+    for raw in raw_items:
+        if not isinstance(raw, dict):
+            continue
+        try:
+            RetryProblemItem(**raw)
+        except Exception as e:
+            logger.warning(f"[LLM 재시도 문항 검증 실패] {e}")
+            continue
+        valid.append(raw)
+    return valid
+
+async def generate_retry_problems_payload(wrong_questions: list, num_questions: int, model: str = "gpt-3.5-turbo") -> Dict[str, Any]:
     """
     틀린 문제들을 분석하여 재시도 문제를 생성하는 함수
-    DEMO 모드일 때는 더미 데이터를 반환합니다.
+    DEMO 모드이거나 LLM 서킷이 열려 있으면 더미 데이터를 반환합니다.
     """
     # DEMO 모드 확인
     if settings.DEMO:
@@ -96,28 +371,31 @@ def generate_retry_problems_payload(wrong_questions: list, num_questions: int, m
     logger.info(f"[REAL] OpenAI 재시도 문제 생성: {len(wrong_questions)}개 틀린 문제 분석, {num_questions}문제")
     prompt = build_retry_problem_prompt(wrong_questions, num_questions)
     
-    # 모델별 클라이언트 설정
-    global MODEL
-    if model != MODEL:
-        # 다른 모델 사용 시 임시로 클라이언트 설정 변경
-        original_model = MODEL
-        MODEL = model
-    
     try:
-        raw = _chat_complete(prompt)
-        
+        raw = await _chat_complete(prompt, model=model, endpoint="retry")
+    except CircuitOpenError as e:
+        logger.warning(f"[DEGRADED] LLM 서킷 열림, 더미 재시도 문제로 대체: {e}")
+        return generate_demo_retry_problems(wrong_questions, num_questions)
+
+    items = _valid_retry_items(_parse_items(raw))
+
+    # 잘린 응답 등으로 모자라면 부족분만 한 번 더 요청
+    missing = num_questions - len(items)
+    if missing > 0:
+        logger.info(f"[REAL] 재시도 문제 부족분 보충 요청: {missing}문제")
+        note = _exclude_note([item["question"] for item in items])
         try:
-            data = _extract_json(raw)
+            raw = await _chat_complete(
+                f"{build_retry_problem_prompt(wrong_questions, missing)}\n\n{note}",
+                model=model, endpoint="retry", coalesce=False
+            )
+            items.extend(_valid_retry_items(_parse_items(raw)))
         except Exception as e:
-            logger.error(f"[LLM JSON 파싱 실패] {e}\n=== RAW START ===\n{raw}\n=== RAW END ===")
-            raise
-        
-        if "items" not in data or not isinstance(data["items"], list) or len(data["items"]) == 0:
-            raise ValueError("AI 응답에 'items' 배열이 없거나 비어 있습니다.")
-        
-        return data
-        
-    finally:
-        # 원래 모델로 복원
-        if model != original_model:
-            MODEL = original_model
+            if not items:
+                raise
+            logger.warning(f"[LLM 보충 요청 실패] {e}")
+
+    if not items:
+        raise ValueError("AI 응답에 'items' 배열이 없거나 비어 있습니다.")
+
+    return {"items": items[:num_questions]}
@@ -1,13 +1,13 @@
 """OpenAI API 서비스"""
 import json
 from typing import List, Dict, Any
-from openai import AsyncOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 from app.core.config import settings
 from app.core.security import sanitize_input, is_safe_prompt
 from app.models.common import ProblemItem, RecommendItem
-
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+from app.services.llm_gateway import llm_gateway
+from app.services.rate_limiter import UpstreamBudgetExceeded
+from app.services.circuit_breaker import CircuitOpenError
 
 
 # ===== 시스템 프롬프트 =====
@@ -18,7 +18,12 @@ SYSTEM_PROMPT_BASE = """당신은 경제 전문가이자 교육자입니다.
 - 한국어로 명확하고 전문적인 톤을 유지합니다."""
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_not_exception_type((CircuitOpenError, UpstreamBudgetExceeded)),
+    reraise=True
+)
 async def generate_chat_response(
     question: str,
     context: str = None,
@@ -42,14 +47,14 @@ async def generate_chat_response(
     
     messages.append({"role": "user", "content": question})
     
-    response = await client.chat.completions.create(
+    # 동시 호출 제한/호출 예산/서킷 브레이커/사용량 집계를 위해 LLM 게이트웨이 경유
+    return await llm_gateway.chat(
+        messages,
         model=settings.OPENAI_MODEL,
-        messages=messages,
         max_tokens=settings.OPENAI_MAX_TOKENS,
-        temperature=0.7
+        temperature=0.7,
+        endpoint="qa_chat"
     )
-    
-    return response.choices[0].message.content
 
 
 async def generate_summary(question: str, context: str = None) -> Dict[str, Any]:
@@ -117,19 +122,18 @@ async def generate_problems(
 
 전체를 JSON 배열로 반환하세요. 반드시 유효한 JSON 형식이어야 합니다."""
     
-    response = await client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
+    content = await llm_gateway.chat(
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT_BASE},
             {"role": "user", "content": prompt}
         ],
+        model=settings.OPENAI_MODEL,
         max_tokens=3000,
         temperature=0.8,
-        response_format={"type": "json_object"}
+        response_format={"type": "json_object"},
+        endpoint="problems"
     )
     
-    content = response.choices[0].message.content
-    
     try:
         # JSON 파싱
         data = json.loads(content)
@@ -200,19 +204,19 @@ async def generate_recommendations(
 
 전체를 JSON 배열로 반환. 반드시 유효한 JSON."""
     
-    response = await client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
+    # 같은 조건의 추천 요청이 동시에 몰리면 LLM 게이트웨이에서 한 번만 호출
+    content = await llm_gateway.chat(
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT_BASE},
             {"role": "user", "content": prompt}
         ],
+        model=settings.OPENAI_MODEL,
         max_tokens=2000,
         temperature=0.7,
-        response_format={"type": "json_object"}
+        response_format={"type": "json_object"},
+        endpoint="recommend"
     )
     
-    content = response.choices[0].message.content
-    
     try:
         data = json.loads(content)
         
@@ -1,11 +1,16 @@
 """OpenAI API 서비스"""
 import json
 import os       
-from typing import List, Dict, Any
-from openai import AsyncOpenAI, OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 from app.core.config import settings
 from app.core.security import sanitize_input, is_safe_prompt
+from app.services.llm_gateway import llm_gateway
+from app.services.rate_limiter import UpstreamBudgetExceeded
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.prompt_budget import (
+    SUMMARY_CONTEXT_TOKENS, PromptBudget, allocate_budget, fit_context, truncate_tokens
+)
 from app.models.common import ProblemItem, RecommendItem
 from dotenv import load_dotenv
 
@@ -13,9 +18,6 @@ load_dotenv('env.txt')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
 
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
-
 # ===== 시스템 프롬프트 =====
 SYSTEM_PROMPT_BASE = """당신은 경제 전문가이자 교육자입니다.
 - 정확하고 근거 있는 답변을 제공합니다.
@@ -24,18 +26,28 @@ SYSTEM_PROMPT_BASE = """당신은 경제 전문가이자 교육자입니다.
 - 한국어로 명확하고 전문적인 톤을 유지합니다."""
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-async def generate_chat_response(
+SUMMARY_PROMPT = SYSTEM_PROMPT_BASE + """
+    
+요청된 주제에 대해 핵심만 간결하게 5~10 문장으로 요약해주세요.
+- 가능하면 출처 표기 (예: [출처: 한국은행])
+"""
+
+
+def _build_messages(
     question: str,
     context: str = None,
     system_prompt: str = SYSTEM_PROMPT_BASE,
-    temperature: float = 0.7
-) -> str:
+    context_max_tokens: Optional[int] = None
+) -> Tuple[List[Dict[str, str]], PromptBudget]:
     """
-    일반 Q&A 응답 생성
+    입력 검증 후 Chat Completions 메시지 구성
+    - 모델 윈도우를 토큰 기준으로 시스템 프롬프트/질문/참고 자료/출력에 배분
+    - 참고 자료가 예산을 넘으면 앞부분이 아니라 질문과 관련된 부분을 남김
     """
+    budget = allocate_budget(system_prompt, settings.OPENAI_MODEL, context_cap=context_max_tokens)
+
     # 입력 검증
-    question = sanitize_input(question, max_length=2000)
+    question = truncate_tokens(sanitize_input(question, max_length=None), budget.question_tokens, settings.OPENAI_MODEL)
     if not is_safe_prompt(question):
         raise ValueError("안전하지 않은 입력이 감지되었습니다.")
 
@@ -46,8 +58,8 @@ async def generate_chat_response(
     print(f"[OpenAI Service] context 수신: {len(context) if context else 0}자")
 
     if context:
-        context = sanitize_input(context, max_length=5000)
-        print(f"[OpenAI Service] sanitize 후 context: {len(context)}자")
+        context = fit_context(sanitize_input(context, max_length=None), question, budget.context_tokens, settings.OPENAI_MODEL)
+        print(f"[OpenAI Service] 예산({budget.context_tokens}토큰) 적용 후 context: {len(context)}자")
         print(f"[OpenAI Service] context 미리보기: {context[:300]}...")
         messages.append({"role": "user", "content": f"참고 자료:\n{context}"})
         print(f"[OpenAI Service] [OK] context를 messages에 추가함")
@@ -55,39 +67,94 @@ async def generate_chat_response(
         print(f"[OpenAI Service] [WARN] context가 없음!")
 
     messages.append({"role": "user", "content": question})
+    return messages, budget
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=retry_if_not_exception_type((UpstreamBudgetExceeded, CircuitOpenError, ValueError)),
+    reraise=True
+)
+async def generate_chat_response(
+    question: str,
+    context: str = None,
+    system_prompt: str = SYSTEM_PROMPT_BASE,
+    temperature: float = 0.7,
+    context_max_tokens: Optional[int] = None,
+    endpoint: str = "qa_chat"
+) -> str:
+    """
+    일반 Q&A 응답 생성
+    - context_max_tokens: 참고 자료 최대 토큰 (기본 PROMPT_CONTEXT_TOKENS, 요약처럼 통째로 넣어야 하면 크게 지정)
+    - endpoint: 사용량 집계용 기능 이름 (qa_chat, qa_summary, qa_digest)
+    - 예산 초과(UpstreamBudgetExceeded), 서킷 열림(CircuitOpenError), 입력 오류(ValueError)는 재시도하지 않고 바로 전달
+    """
+    messages, budget = _build_messages(question, context, system_prompt, context_max_tokens)
 
     print(f"[OpenAI Service] 총 메시지 개수: {len(messages)}")
     print(f"[OpenAI Service] OpenAI API 호출 시작...")
 
-    response = await client.chat.completions.create(
+    answer = await llm_gateway.chat(
+        messages,
         model=settings.OPENAI_MODEL,
-        messages=messages,
-        max_tokens=settings.OPENAI_MAX_TOKENS,
-        temperature=temperature
+        temperature=temperature,
+        max_tokens=budget.max_output_tokens,
+        endpoint=endpoint
     )
 
     print(f"[OpenAI Service] OpenAI API 응답 받음")
-    return response.choices[0].message.content
+    return answer
 
 
-async def generate_summary(question: str, context: str = None) -> Dict[str, Any]:
+async def stream_chat_response(
+    question: str,
+    context: str = None,
+    system_prompt: str = SYSTEM_PROMPT_BASE,
+    temperature: float = 0.7,
+    context_max_tokens: Optional[int] = None,
+    endpoint: str = "qa_chat"
+) -> AsyncIterator[str]:
     """
-    요약 생성 (출처 포함)
+    Q&A 응답 스트리밍 (토큰 delta 단위로 yield)
+    - 소비 측이 다음 값을 요청할 때만 업스트림을 읽으므로 클라이언트 속도에 맞춰 진행
+    - 제너레이터가 닫히면(클라이언트 연결 종료 등) 업스트림 연결도 즉시 종료
+    - 일부를 이미 보낸 뒤에는 재시도할 수 없으므로 @retry 미적용
     """
-    summary_prompt = SYSTEM_PROMPT_BASE + """
-    
-요청된 주제에 대해 핵심만 간결하게 5~10 문장으로 요약해주세요.
-- 가능하면 출처 표기 (예: [출처: 한국은행])
-"""
-    answer = await generate_chat_response(question, context, summary_prompt, temperature=1.0)
-    
+    messages, budget = _build_messages(question, context, system_prompt, context_max_tokens)
+
+    deltas = llm_gateway.stream_chat(
+        messages,
+        model=settings.OPENAI_MODEL,
+        temperature=temperature,
+        max_tokens=budget.max_output_tokens,
+        endpoint=endpoint
+    )
+    try:
+        async for delta in deltas:
+            yield delta
+    finally:
+        await deltas.aclose()
+
+
+def extract_citations(answer: str) -> List[str]:
+    """답변에서 출처 표기 추출"""
     # 간단한 출처 추출 (실제로는 더 정교한 로직 필요)
-    citations = []
     if "[출처:" in answer or "(출처:" in answer:
-        citations = ["한국은행", "통계청", "금융감독원"]  # mock
+        return ["한국은행", "통계청", "금융감독원"]  # mock
+    return []
+
+
+async def generate_summary(question: str, context: str = None) -> Dict[str, Any]:
+    """
+    요약 생성 (출처 포함)
+    """
+    answer = await generate_chat_response(
+        question, context, SUMMARY_PROMPT, temperature=1.0,
+        context_max_tokens=SUMMARY_CONTEXT_TOKENS, endpoint="qa_summary"
+    )
     
     return {
         "answer_md": answer,
-        "citations": citations
+        "citations": extract_citations(answer)
     }
-
@@ -0,0 +1,311 @@
+"""사전 생성 문제 은행 (버킷별 재고 관리 + 백그라운드 보충)"""
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.problems import ProblemItem
+from app.services.llm_service import check_problem_rules, count_llm_calls, generate_econ_problems_payload
+from app.services.llm_gateway import llm_gateway
+
+# 문제 은행 로컬 저장 디렉토리
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+PROBLEM_BANK_DIR = os.path.join(BASE_DIR, "data", "problem_bank")
+os.makedirs(PROBLEM_BANK_DIR, exist_ok=True)
+
+TOPICS = ("macro", "finance", "trade", "stats")
+LEVELS = ("basic", "intermediate", "advanced")
+STYLES = ("mcq", "free")
+
+BucketKey = Tuple[str, str, str]
+
+# 한 번의 보충 주기에서 target 도달에 필요한 호출 수 외에 허용하는 추가 호출 수 (검증 탈락/중복 대비)
+EXTRA_REFILL_CALLS = 2
+
+
+def parse_low_water_overrides(spec: str) -> Dict[BucketKey, int]:
+    """'macro:basic:mcq=10,finance:advanced:free=3' 형식의 버킷별 low-water 설정 파싱"""
+    overrides: Dict[BucketKey, int] = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        key = tuple(p.strip() for p in name.split(":"))
+        if len(key) != 3:
+            continue
+        try:
+            overrides[key] = max(0, int(value))
+        except ValueError:
+            print(f"[WARNING] 잘못된 문제 은행 low-water 설정 무시: {part}")
+    return overrides
+
+
+class _BucketStats:
+    def __init__(self):
+        self.served = 0
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.generated = 0
+        self.rejected = 0
+        self.last_refill_at: Optional[float] = None
+
+
+class ProblemBank:
+    """
+    (topic, level, style) 버킷별로 검증된 문항 재고를 유지하고 요청 시 즉시 제공
+
+    - 요청 문항 수만큼 재고가 있으면 비복원 무작위 추출로 제공 (제공된 문항은 재고에서 제거)
+    - 재고가 low-water 아래로 내려가면 백그라운드 보충 루프를 깨워 target까지 LLM으로 보충
+    - 재고는 버킷별 JSON 파일로 저장하여 재시작 후에도 유지
+    """
+
+    def __init__(self, bank_dir: str = PROBLEM_BANK_DIR):
+        self.bank_dir = bank_dir
+        self.target = settings.PROBLEM_BANK_TARGET
+        self.low_water = settings.PROBLEM_BANK_LOW_WATER
+        self.low_water_overrides = parse_low_water_overrides(settings.PROBLEM_BANK_LOW_WATER_OVERRIDES)
+        self._buckets: Optional[Dict[BucketKey, List[dict]]] = None
+        self._stats: Dict[BucketKey, _BucketStats] = {}
+        self._wake: Optional[asyncio.Event] = None
+
+    # ----------------------------
+    # 저장소
+    # ----------------------------
+    def _path(self, key: BucketKey) -> str:
+        return os.path.join(self.bank_dir, f"{'_'.join(key)}.json")
+
+    def _ensure_loaded(self):
+        if self._buckets is not None:
+            return
+        self._buckets = {}
+        for key in self.bucket_keys():
+            self._stats[key] = _BucketStats()
+            items: List[dict] = []
+            if os.path.exists(self._path(key)):
+                try:
+                    with open(self._path(key), "r", encoding="utf-8") as f:
+                        items = json.load(f)
+                except Exception as e:
+                    print(f"[WARNING] 문제 은행 로드 실패 ({key}): {e}")
+            self._buckets[key] = items
+
+    def _save(self, key: BucketKey):
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._buckets[key], f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+
+    @staticmethod
+    def bucket_keys() -> List[BucketKey]:
+        return [(t, l, s) for t in TOPICS for l in LEVELS for s in STYLES]
+
+    def low_water_for(self, key: BucketKey) -> int:
+        return self.low_water_overrides.get(key, self.low_water)
+
+    # ----------------------------
+    # 제공
+    # ----------------------------
+    def take(self, topic: str, level: str, style: str, count: int) -> Optional[List[dict]]:
+        """
+        재고에서 count개 문항을 비복원 추출
+
+        Returns:
+            문항 dict 목록, 재고가 부족하면 None (호출 측에서 직접 생성)
+        """
+        self._ensure_loaded()
+        key = (topic, level, style)
+        bucket = self._buckets.get(key)
+        stats = self._stats.get(key)
+        if bucket is None:
+            return None
+
+        if len(bucket) < count:
+            stats.misses += 1
+            self._request_refill()
+            return None
+
+        picked = set(random.sample(range(len(bucket)), count))
+        items = [item for i, item in enumerate(bucket) if i in picked]
+        self._buckets[key] = [item for i, item in enumerate(bucket) if i not in picked]
+        self._save(key)
+
+        stats.hits += 1
+        stats.served += count
+        if len(self._buckets[key]) < self.low_water_for(key):
+            self._request_refill()
+        return items
+
+    def add(self, key: BucketKey, raw_items: List[dict]) -> int:
+        """
+        검증을 통과한 문항만 재고에 추가 (같은 질문은 중복 추가하지 않음)
+
+        Returns:
+            추가된 문항 수
+        """
+        self._ensure_loaded()
+        topic, level, style = key
+        bucket = self._buckets[key]
+        stats = self._stats[key]
+        seen = {item["question"].strip() for item in bucket}
+
+        added = 0
+        for i, raw in enumerate(raw_items):
+            try:
+                item = ProblemItem(**raw)
+            except Exception:
+                stats.rejected += 1
+                continue
+            if item.topic != topic or item.level != level or check_problem_rules(item, style, i):
+                stats.rejected += 1
+                continue
+            question = item.question.strip()
+            if question in seen:
+                continue
+            seen.add(question)
+            bucket.append(item.model_dump())
+            added += 1
+
+        if added:
+            self._save(key)
+        return added
+
+    # ----------------------------
+    # 보충
+    # ----------------------------
+    def _request_refill(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _depleted_buckets(self) -> List[BucketKey]:
+        self._ensure_loaded()
+        depleted = [key for key in self.bucket_keys() if len(self._buckets[key]) < self.low_water_for(key)]
+        # 실제 요청이 있었던 버킷(재고 부족 횟수, 제공 수 순)을 먼저, 그다음 재고가 적은 버킷부터
+        return sorted(
+            depleted,
+            key=lambda k: (-self._stats[k].misses, -self._stats[k].served, len(self._buckets[k])),
+        )
+
+    async def refill_bucket(self, key: BucketKey, max_calls: Optional[int] = None) -> Tuple[int, int]:
+        """
+        버킷을 target까지 보충 (PROBLEM_BANK_REFILL_BATCH개씩 생성)
+
+        Args:
+            max_calls: 이번 보충에서 허용할 LLM 호출 수 (None이면 target 도달에 필요한 만큼)
+                한도에 도달하면 새 생성을 시작하지 않음 (진행 중인 생성의 보충 호출만큼 넘을 수 있음)
+
+        Returns:
+            (추가된 문항 수, 실제 LLM 호출 수)
+        """
+        topic, level, style = key
+        stats = self._stats[key]
+        total_added = 0
+
+        batch_size = max(1, settings.PROBLEM_BANK_REFILL_BATCH)
+        call_limit = -(-self.target // batch_size) + EXTRA_REFILL_CALLS
+        if max_calls is not None:
+            call_limit = min(call_limit, max_calls)
+        # 생성 한 번에 부족분 보충/재시도 호출이 더해질 수 있으므로 실제 호출 수로 예산을 차감
+        # (생성 횟수도 같은 한도로 제한하여 LLM을 거치지 않는 경우에도 반복이 끝나도록 함)
+        attempts = 0
+        with count_llm_calls() as counter:
+            while counter.calls < call_limit and attempts < call_limit:
+                missing = self.target - len(self._buckets[key])
+                if missing <= 0:
+                    break
+                batch = min(missing, batch_size)
+                attempts += 1
+                try:
+                    # 사용자 요청과 결과를 공유하면 같은 문항이 재고에도 들어가므로 공유하지 않음
+                    payload = await generate_econ_problems_payload(topic, level, batch, style, coalesce=False)
+                except Exception as e:
+                    stats.refill_failures += 1
+                    print(f"[WARNING] 문제 은행 보충 실패 ({'/'.join(key)}): {e}")
+                    break
+                raw_items = payload.get("items", [])
+                stats.generated += len(raw_items)
+                total_added += self.add(key, raw_items)
+        calls = counter.calls
+
+        stats.refills += 1
+        stats.last_refill_at = time.time()
+        if total_added:
+            print(f"[INFO] 문제 은행 보충: {'/'.join(key)} +{total_added} (재고 {len(self._buckets[key])})")
+        return total_added, calls
+
+    async def refill_depleted(self) -> Dict[str, int]:
+        """
+        low-water 아래인 버킷을 순서대로 보충 (사용자 요청과 LLM 동시 실행 슬롯을 나눠 쓰도록 한 번에 하나씩)
+
+        한 주기의 LLM 호출 수는 PROBLEM_BANK_MAX_CALLS_PER_CYCLE로 제한하여,
+        빈 재고로 배포된 직후에도 모든 버킷을 한꺼번에 채우지 않고 여러 주기에 걸쳐 나눠 보충
+        """
+        results: Dict[str, int] = {}
+        budget = max(1, settings.PROBLEM_BANK_MAX_CALLS_PER_CYCLE)
+        for key in self._depleted_buckets():
+            if budget <= 0:
+                break
+            # 제공자 장애로 서킷이 열려 있으면 다음 주기로 미룸
+            if not llm_gateway.breaker.allows_calls():
+                break
+            added, calls = await self.refill_bucket(key, max_calls=budget)
+            budget -= calls
+            results["/".join(key)] = added
+        return results
+
+    async def run_periodic(self):
+        """
+        보충 루프 (lifespan에서 백그라운드 태스크로 시작, 재고 부족 시 즉시 깨어남)
+
+        시작 직후에는 보충하지 않고 첫 재고 부족 요청 또는 첫 점검 주기까지 기다림
+        """
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.PROBLEM_BANK_REFILL_INTERVAL_SEC)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not settings.DEMO:
+                try:
+                    await self.refill_depleted()
+                except Exception as e:
+                    print(f"[WARNING] 문제 은행 보충 루프 오류: {e}")
+
+    # ----------------------------
+    # 메트릭
+    # ----------------------------
+    def stats(self) -> dict:
+        """버킷별 재고/제공/보충 통계"""
+        self._ensure_loaded()
+        buckets = {}
+        for key in self.bucket_keys():
+            s = self._stats[key]
+            lookups = s.hits + s.misses
+            buckets["/".join(key)] = {
+                "inventory": len(self._buckets[key]),
+                "low_water": self.low_water_for(key),
+                "target": self.target,
+                "served": s.served,
+                "hits": s.hits,
+                "misses": s.misses,
+                "hit_rate": round(s.hits / lookups, 3) if lookups else 0.0,
+                "refills": s.refills,
+                "refill_failures": s.refill_failures,
+                "generated": s.generated,
+                "rejected": s.rejected,
+                "last_refill_at": s.last_refill_at,
+            }
+        return {
+            "enabled": settings.PROBLEM_BANK_ENABLED,
+            "total_inventory": sum(len(items) for items in self._buckets.values()),
+            "buckets": buckets,
+        }
+
+
+# 싱글톤 인스턴스
+problem_bank = ProblemBank()
@@ -0,0 +1,230 @@
+"""토큰 기준 프롬프트 예산 (모델별 배분 + 관련도 기반 컨텍스트 축소)"""
+import math
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+
+try:
+    import tiktoken
+except ImportError:  # 토크나이저가 없으면 근사치로 계산
+    tiktoken = None
+
+# 모델별 컨텍스트 윈도우 (입력 + 출력 토큰)
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4-turbo-preview": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+MESSAGE_OVERHEAD_TOKENS = 4  # 메시지마다 붙는 역할/구분 토큰
+REPLY_PRIMING_TOKENS = 3
+
+# 요약 입력은 관련도로 자르지 않도록 요약 청크(문자 기준)보다 넉넉하게
+SUMMARY_CONTEXT_TOKENS = 6000
+
+_encodings: Dict[str, object] = {}
+_tokenizer_failed = False
+
+
+def _encoding_for(model: Optional[str]):
+    """모델의 tiktoken 인코딩 (tiktoken이 없거나 인코딩 파일을 받을 수 없으면 None)"""
+    global _tokenizer_failed
+    if tiktoken is None or _tokenizer_failed:
+        return None
+    model = model or settings.OPENAI_MODEL
+    if model not in _encodings:
+        try:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # 첫 사용 시 인코딩 파일을 내려받으므로 오프라인이면 실패 (이후 근사치 사용)
+            _tokenizer_failed = True
+            print(f"[WARNING] tiktoken 인코딩을 불러오지 못해 근사치로 토큰 수 계산: {e}")
+            return None
+    return _encodings[model]
+
+
+def warm_up(model: Optional[str] = None) -> bool:
+    """인코딩 미리 불러오기 (lifespan에서 스레드로 실행해 첫 요청 지연 방지)"""
+    return _encoding_for(model) is not None
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사치 (한글 등 비ASCII 문자는 글자당 약 1토큰, ASCII는 4글자당 약 1토큰)"""
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii) // 4 + 1
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """토큰 수 (tiktoken 사용 가능하면 정확한 값, 아니면 근사치)"""
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[dict], model: Optional[str] = None) -> int:
+    """Chat Completions 메시지 목록의 입력 토큰 수"""
+    return sum(count_tokens(m.get("content") or "", model) + MESSAGE_OVERHEAD_TOKENS for m in messages) + REPLY_PRIMING_TOKENS
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """앞에서부터 max_tokens 토큰까지만 남김 (결과는 항상 원문의 접두어)"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding_for(model)
+    if encoding is not None:
+        # 토큰 경계가 한글 등 멀티바이트 문자 중간일 수 있으므로 완성되지 않은 마지막 문자는 버림
+        # (decode()는 U+FFFD로 바꿔 넣어 원문의 접두어가 아니게 됨)
+        head = encoding.decode_bytes(encoding.encode(text, disallowed_special=())[:max_tokens])
+        return head.decode("utf-8", errors="ignore")
+
+    # 근사치: 토큰 수가 예산 안에 들어오는 가장 긴 접두어를 이진 탐색
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+# ============================================
+# 예산 배분
+# ============================================
+
+class PromptBudget(NamedTuple):
+    question_tokens: int  # 질문에 허용하는 최대 토큰
+    context_tokens: int  # 참고 자료에 허용하는 최대 토큰
+    max_output_tokens: int  # 응답 max_tokens (윈도우를 넘지 않도록 조정)
+
+
+def allocate_budget(
+    system_prompt: str,
+    model: Optional[str] = None,
+    max_output_tokens: Optional[int] = None,
+    context_cap: Optional[int] = None,
+) -> PromptBudget:
+    """
+    모델 컨텍스트 윈도우를 시스템 프롬프트 / 질문 / 참고 자료 / 출력에 배분
+
+    - 출력: max_output_tokens (기본 OPENAI_MAX_TOKENS)
+    - 질문: PROMPT_QUESTION_TOKENS까지
+    - 참고 자료: context_cap(기본 PROMPT_CONTEXT_TOKENS)과 윈도우에 남은 양 중 작은 값
+    """
+    model = model or settings.OPENAI_MODEL
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    output = max_output_tokens or settings.OPENAI_MAX_TOKENS
+    output = min(output, window // 2)
+
+    fixed = count_tokens(system_prompt, model) + 3 * MESSAGE_OVERHEAD_TOKENS + REPLY_PRIMING_TOKENS
+    available = max(0, window - output - fixed)
+    question = min(settings.PROMPT_QUESTION_TOKENS, available)
+    context = min(context_cap or settings.PROMPT_CONTEXT_TOKENS, available - question)
+    return PromptBudget(question_tokens=question, context_tokens=max(0, context), max_output_tokens=output)
+
+
+# ============================================
+# 관련도 기반 컨텍스트 축소
+# ============================================
+
+SEGMENT_TOKENS = 300  # 관련도를 매기는 단위 (문단, 길면 문장 단위로 더 나눔)
+GAP_MARKER = "\n\n...\n\n"
+
+
+def _bigrams(text: str) -> set:
+    """공백/문장부호를 뺀 글자 2-gram (형태소 분석 없이 한국어 어절 변화에도 겹치도록)"""
+    compact = re.sub(r"[\s\W_]+", "", text.lower())
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def _segments(text: str, model: Optional[str]) -> List[str]:
+    """문단 단위로 나누고, SEGMENT_TOKENS를 넘는 문단은 문장 단위로 묶어 나눔"""
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph, model) <= SEGMENT_TOKENS:
+            pieces.append(paragraph)
+            continue
+        current = ""
+        for sentence in re.split(r"(?<=[.!?。다])\s+", paragraph):
+            candidate = f"{current} {sentence}".strip()
+            if current and count_tokens(candidate, model) > SEGMENT_TOKENS:
+                pieces.append(current)
+                current = sentence
+            else:
+                current = candidate
+        if current:
+            pieces.append(current)
+
+    # 문장 구분이 없는 긴 덩어리는 토큰 기준으로 자름
+    segments: List[str] = []
+    for piece in pieces:
+        while count_tokens(piece, model) > SEGMENT_TOKENS:
+            # 첫 글자가 예산보다 큰 경우에도 진행하도록 최소 한 글자
+            head = truncate_tokens(piece, SEGMENT_TOKENS, model) or piece[0]
+            segments.append(head)
+            piece = piece[len(head):].strip()
+        if piece:
+            segments.append(piece)
+    return segments
+
+
+def fit_context(context: str, question: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    참고 자료를 max_tokens 안으로 축소
+
+    - 예산 안이면 그대로 반환
+    - 넘으면 문단/문장 조각을 질문과 겹치는 글자 2-gram 비율로 점수 매겨 높은 순으로 채우고,
+      원문 순서대로 다시 이어붙임 (떨어진 조각 사이는 '...'로 표시)
+    """
+    if not context or max_tokens <= 0:
+        return ""
+    if count_tokens(context, model) <= max_tokens:
+        return context
+
+    segments = _segments(context, model)
+    question_grams = _bigrams(question)
+
+    def score(index: int) -> float:
+        grams = _bigrams(segments[index])
+        if not grams or not question_grams:
+            return 0.0
+        return len(grams & question_grams) / math.sqrt(len(grams))
+
+    # 점수가 같으면 앞쪽 조각 우선
+    ranked = sorted(range(len(segments)), key=lambda i: (-score(i), i))
+    gap_tokens = count_tokens(GAP_MARKER, model)
+    selected: List[int] = []
+    used = 0
+    for index in ranked:
+        tokens = count_tokens(segments[index], model) + gap_tokens
+        if used + tokens > max_tokens:
+            continue
+        selected.append(index)
+        used += tokens
+
+    if not selected:
+        return truncate_tokens(segments[ranked[0]], max_tokens, model)
+
+    selected.sort()
+    parts = [segments[selected[0]]]
+    for prev, index in zip(selected, selected[1:]):
+        parts.append(("\n\n" if index == prev + 1 else GAP_MARKER) + segments[index])
+    return "".join(parts)
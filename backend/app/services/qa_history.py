@@ -0,0 +1,53 @@
+"""Q&A 대화 기록 저장 서비스"""
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from app.db.mongo import get_database
+
+# MongoDB 미연결 시 로컬 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+HISTORY_PATH = os.path.join(BASE_DIR, "data", "qa_history.jsonl")
+os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+
+
+async def save_qa_message(
+    kind: str,
+    question: str,
+    answer_md: str,
+    citations: Optional[List[str]] = None,
+    context_ref: Optional[str] = None,
+    completed: bool = True,
+) -> dict:
+    """
+    Q&A 응답 기록 저장 (MongoDB 우선, 실패 시 로컬 JSONL)
+
+    Args:
+        kind: "chat" 또는 "summary"
+        question: 사용자 질문
+        answer_md: 최종 응답 (스트리밍 중단 시 그때까지 생성된 부분)
+        citations: 출처 목록
+        context_ref: 업로드 문서 파일명 등 컨텍스트 참조 (문서 본문은 저장하지 않음)
+        completed: 스트리밍이 끝까지 완료되었는지 여부
+    """
+    record = {
+        "kind": kind,
+        "question": question,
+        "answer_md": answer_md,
+        "citations": citations or [],
+        "context_ref": context_ref if context_ref and context_ref.endswith(".json") else None,
+        "completed": completed,
+        "created_at": datetime.utcnow(),
+    }
+
+    try:
+        db = get_database()
+        await db["qa_history"].insert_one(dict(record))
+        return record
+    except Exception as e:
+        print(f"Q&A 기록 MongoDB 저장 오류 (로컬에 저장): {e}")
+
+    with open(HISTORY_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps({**record, "created_at": record["created_at"].isoformat()}, ensure_ascii=False) + "\n")
+    return record
@@ -1,144 +1,696 @@
 """RAG (Retrieval-Augmented Generation) 서비스"""
 import os
-import pickle
-from typing import List, Optional
-from langchain.text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+import json
+import uuid
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_openai import ChatOpenAI
 from langchain_community.vectorstores import FAISS
 from langchain.chains.question_answering import load_qa_chain
 from langchain.callbacks import get_openai_callback
 from app.core.config import settings
+from app.services.embedders import get_embedder, get_embedder_identity
+from app.services.http_clients import client_registry
+from app.services.storage_manager import storage_manager
 
 # 벡터 스토어 저장 디렉토리
 VECTOR_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "vector_stores")
 os.makedirs(VECTOR_STORE_DIR, exist_ok=True)
 
+# 전체 업로드 문서를 담는 통합 인덱스 (append-only + 툼스톤 삭제)
+UNIFIED_STORE_NAME = "unified"
+UNIFIED_STORE_PATH = os.path.join(VECTOR_STORE_DIR, f"{UNIFIED_STORE_NAME}.faiss")
+TOMBSTONE_PATH = os.path.join(VECTOR_STORE_DIR, f"{UNIFIED_STORE_NAME}.tombstones.json")
+META_PATH = os.path.join(VECTOR_STORE_DIR, f"{UNIFIED_STORE_NAME}.meta.json")
+# 마지막 전체 저장(체크포인트) 이후 추가된 청크 (업로드마다 해당 문서분만 기록)
+SEGMENT_DIR = os.path.join(VECTOR_STORE_DIR, f"{UNIFIED_STORE_NAME}.segments")
+
+
+def estimate_store_bytes(store: FAISS) -> int:
+    """벡터 스토어의 메모리 사용량 근사치 (벡터 + 문서 텍스트)"""
+    index = store.index
+    vector_bytes = index.ntotal * index.d * 4  # float32
+    docstore = getattr(store.docstore, "_dict", {})
+    text_bytes = sum(len(doc.page_content.encode("utf-8")) for doc in docstore.values())
+    return vector_bytes + text_bytes
 
-class RAGService:
-    """RAG 서비스 클래스"""
+
+class ReadWriteLock:
+    """
+    읽기는 동시에, 쓰기는 단독으로 실행하는 락 (재진입 불가)
+    - 기다리는 쓰기가 있으면 새 읽기는 대기 (쓰기 기아 방지)
+    """
 
     def __init__(self):
-        """초기화"""
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class RAGService:
+    """
+    RAG 서비스 클래스
+
+    - 모든 업로드 문서의 청크를 하나의 FAISS 인덱스에 누적 (storage_id/filename/page 메타데이터)
+    - 인덱스는 처음 사용할 때 로드해 메모리에 유지 (VECTOR_STORE_CACHE_MB를 넘으면 작업 후 내려놓고 다음 사용 시 다시 로드)
+    - 업로드마다 추가분만 세그먼트로 저장하고, 세그먼트가 RAG_SEGMENT_MERGE_COUNT개 쌓이면 전체 저장
+    - 검색 시 storage_id로 문서 필터링 가능, 필터 없이 전체 문서 검색도 가능
+    - 삭제는 툼스톤으로 기록 후 비율이 임계치를 넘으면 압축(compaction)
+    - 검색은 읽기 락, 추가/삭제/압축은 쓰기 락 (FAISS 객체와 툼스톤을 함께 보호)
+    """
+
+    def __init__(self, embedder: Optional[str] = None):
+        """
+        초기화
+
+        Args:
+            embedder: 임베딩 백엔드 이름 (기본값: settings.RAG_EMBEDDER, "local" 또는 "openai")
+        """
+        self.embedder_name = embedder or settings.RAG_EMBEDDER
+        self.embeddings = get_embedder(self.embedder_name)
+        self.embedder_identity = get_embedder_identity(self.embedder_name)
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            **client_registry.langchain_kwargs()
         )
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+        self._lock = ReadWriteLock()
+        self._store: Optional[FAISS] = None
+        self._loaded = False
+        self._store_bytes = 0
+        self._next_segment = 1
+        self._segment_count = 0
+        self.checkpoints = 0
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._tombstones: Set[str] = self._load_tombstones()
+
+    # ============================================
+    # 툼스톤 관리
+    # ============================================
+
+    def _load_tombstones(self) -> Set[str]:
+        if not os.path.exists(TOMBSTONE_PATH):
+            return set()
+        try:
+            with open(TOMBSTONE_PATH, "r", encoding="utf-8") as f:
+                return set(json.load(f).get("deleted_ids", []))
+        except Exception as e:
+            print(f"툼스톤 로드 실패: {e}")
+            return set()
 
-    def create_vector_store(self, upload_id: str, texts: List[str]) -> FAISS:
-        """
-        텍스트 리스트로부터 벡터 스토어 생성
+    def _save_tombstones(self):
+        tmp_path = f"{TOMBSTONE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"deleted_ids": sorted(self._tombstones)}, f)
+        os.replace(tmp_path, TOMBSTONE_PATH)
 
-        Args:
-            upload_id: 문서 업로드 ID
-            texts: 텍스트 청크 리스트
+    # ============================================
+    # 인덱스 로드 / 저장
+    # ============================================
 
-        Returns:
-            FAISS 벡터 스토어
+    def load_vector_store(self) -> Optional[FAISS]:
         """
-        # 벡터 스토어 생성
-        knowledge_base = FAISS.from_texts(texts, self.embeddings)
+        통합 벡터 스토어 (메모리에 있으면 그대로, 없으면 디스크에서 로드)
 
-        # 벡터 스토어 저장
-        vector_store_path = os.path.join(VECTOR_STORE_DIR, f"{upload_id}.faiss")
-        knowledge_base.save_local(vector_store_path)
+        Returns:
+            FAISS 벡터 스토어 또는 None (아직 색인된 문서가 없을 때)
+        """
+        self._count_lookup()
+        return self._load_store()
+
+    def _count_lookup(self):
+        with self._stats_lock:
+            if self._loaded:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _load_store(self) -> Optional[FAISS]:
+        """load_vector_store와 같지만 적중/미스를 집계하지 않음 (내부 호출용)"""
+        with self._lock.read():
+            if self._loaded:
+                return self._store
+        with self._lock.write():
+            self._ensure_loaded()
+            return self._store
+
+    def _read_meta(self) -> dict:
+        if not os.path.exists(META_PATH):
+            return {}
+        try:
+            with open(META_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _write_meta(self, checkpoint: int):
+        tmp_path = f"{META_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "embedder": self.embedder_identity,
+                "dimension": self._store.index.d if self._store is not None else None,
+                "vector_count": self._store.index.ntotal if self._store is not None else 0,
+                "checkpoint": checkpoint,
+            }, f)
+        os.replace(tmp_path, META_PATH)
+
+    @staticmethod
+    def _segment_numbers() -> List[int]:
+        if not os.path.isdir(SEGMENT_DIR):
+            return []
+        # 메타데이터(.json)까지 기록된 세그먼트만 완성된 것으로 봄
+        return sorted(int(name[:-5]) for name in os.listdir(SEGMENT_DIR) if name.endswith(".json") and name[:-5].isdigit())
+
+    @staticmethod
+    def _segment_paths(number: int):
+        base = os.path.join(SEGMENT_DIR, f"{number:08d}")
+        return f"{base}.npy", f"{base}.json"
+
+    def _add_embeddings(self, texts: List[str], vectors, metadatas: List[dict], ids: List[str]):
+        """메모리 인덱스에 청크 추가 (쓰기 락 안에서 호출)"""
+        text_embeddings = list(zip(texts, [list(map(float, vector)) for vector in vectors]))
+        if self._store is None:
+            self._store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=ids)
+        else:
+            self._store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        self._store_bytes += len(vectors) * self._store.index.d * 4 + sum(len(text.encode("utf-8")) for text in texts)
+
+    def _ensure_loaded(self):
+        """체크포인트 + 이후 세그먼트를 읽어 메모리 인덱스 구성 (쓰기 락 안에서 호출)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        meta = self._read_meta()
+
+        # 다른 임베딩으로 만든 인덱스는 벡터 공간이 달라 사용할 수 없음
+        stored_identity = meta.get("embedder")
+        if stored_identity and stored_identity != self.embedder_identity:
+            print(f"[WARNING] 벡터 인덱스 임베딩 불일치 (저장: {stored_identity}, 현재: {self.embedder_identity}) - 재색인이 필요합니다.")
+            return
 
-        return knowledge_base
+        try:
+            if os.path.exists(UNIFIED_STORE_PATH):
+                self._store = FAISS.load_local(
+                    UNIFIED_STORE_PATH,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+                self._store_bytes = estimate_store_bytes(self._store)
+
+            checkpoint = meta.get("checkpoint", 0)
+            numbers = self._segment_numbers()
+            for number in numbers:
+                if number <= checkpoint:
+                    continue
+                vec_path, meta_path = self._segment_paths(number)
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    segment = json.load(f)
+                self._add_embeddings(segment["texts"], np.load(vec_path), segment["metadatas"], segment["ids"])
+                self._segment_count += 1
+            self._next_segment = max([checkpoint] + numbers) + 1
+        except Exception as e:
+            print(f"벡터 스토어 로드 실패: {e}")
+            self._store = None
+            self._store_bytes = 0
+
+    def _write_segment(self, texts: List[str], vectors, metadatas: List[dict], ids: List[str]):
+        """이번 추가분만 세그먼트 파일로 저장 (쓰기 락 안에서 호출, 문서 크기에 비례)"""
+        os.makedirs(SEGMENT_DIR, exist_ok=True)
+        vec_path, meta_path = self._segment_paths(self._next_segment)
+        np.save(vec_path, np.asarray(vectors, dtype=np.float32))
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ids": ids, "texts": texts, "metadatas": metadatas}, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+        self._next_segment += 1
+        self._segment_count += 1
+
+    def _checkpoint(self):
+        """전체 인덱스 저장 후 반영된 세그먼트 삭제 (쓰기 락 안에서 호출)"""
+        checkpoint = self._next_segment - 1
+        if self._store is not None:
+            self._store.save_local(UNIFIED_STORE_PATH)
+        self._write_meta(checkpoint)
+        for number in self._segment_numbers():
+            if number <= checkpoint:
+                for path in self._segment_paths(number):
+                    if os.path.exists(path):
+                        os.remove(path)
+        self._segment_count = 0
+        self.checkpoints += 1
+
+    @staticmethod
+    def _max_bytes() -> int:
+        return settings.VECTOR_STORE_CACHE_MB * 1024 * 1024
+
+    def _unload_if_over_limit(self):
+        """
+        메모리 한도를 넘은 인덱스를 내려놓음 (쓰기 락 안에서 호출)
+        - 체크포인트와 세그먼트가 디스크에 모두 있으므로 다음 사용 시 그대로 다시 로드됨
+        """
+        if not self._loaded or self._store_bytes <= self._max_bytes():
+            return
+        print(f"[INFO] 통합 벡터 인덱스 메모리 해제 "
+              f"({self._store_bytes / 1024 / 1024:.0f}MB > {settings.VECTOR_STORE_CACHE_MB}MB)")
+        self._store = None
+        self._loaded = False
+        self._store_bytes = 0
+        self._segment_count = 0
+        self.evictions += 1
+
+    def _evict_if_over_limit(self):
+        """읽기 작업을 마친 뒤 메모리 한도 확인"""
+        if self._store_bytes <= self._max_bytes():
+            return
+        with self._lock.write():
+            self._unload_if_over_limit()
+
+    def invalidate(self):
+        """메모리의 인덱스를 버리고 다음 사용 시 디스크에서 다시 로드"""
+        with self._lock.write():
+            self._store = None
+            self._loaded = False
+            self._store_bytes = 0
+            self._segment_count = 0
+            self._tombstones = self._load_tombstones()
+
+    def get_store_stats(self) -> dict:
+        """통합 인덱스 상태 (메모리 사용량, 적중/미스/해제 횟수, 미병합 세그먼트 수, 툼스톤 수)"""
+        with self._lock.read():
+            lookups = self.hits + self.misses
+            return {
+                "loaded": self._loaded,
+                "vectors": self._store.index.ntotal if self._store is not None else 0,
+                "bytes": self._store_bytes,
+                "max_bytes": self._max_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "pending_segments": self._segment_count,
+                "checkpoints": self.checkpoints,
+                "tombstones": len(self._tombstones),
+            }
 
-    def load_vector_store(self, upload_id: str) -> Optional[FAISS]:
+    # ============================================
+    # 문서 색인 / 삭제 / 압축
+    # ============================================
+
+    def _build_chunks(
+        self,
+        storage_id: str,
+        texts: List[str],
+        filename: str = "",
+        pages: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """페이지별 텍스트를 청킹하고 메타데이터/ID 부여"""
+        pages = pages or list(range(1, len(texts) + 1))
+        # 색인 회차별 고유 접두어 (재색인 시 툼스톤 처리된 이전 ID와 겹치지 않도록)
+        generation = uuid.uuid4().hex[:8]
+        chunks = []
+        for page, text in zip(pages, texts):
+            for piece in self.text_splitter.split_text(text or ""):
+                chunk_id = f"{storage_id}:{generation}:{len(chunks)}"
+                chunks.append({
+                    "id": chunk_id,
+                    "text": piece,
+                    "metadata": {
+                        "chunk_id": chunk_id,
+                        "storage_id": storage_id,
+                        "filename": filename,
+                        "page": page,
+                    },
+                })
+        return chunks
+
+    def _live_ids_for(self, storage_id: str) -> List[str]:
+        """storage_id에 속한 (툼스톤 제외) 청크 ID 목록 (락 안에서 호출)"""
+        if self._store is None:
+            return []
+        return [
+            doc_id
+            for doc_id, doc in self._store.docstore._dict.items()
+            if doc.metadata.get("storage_id") == storage_id and doc_id not in self._tombstones
+        ]
+
+    def _append(self, storage_id: str, chunks: List[Dict[str, Any]], vectors: List[List[float]]) -> int:
+        """임베딩된 청크를 통합 인덱스에 추가 (기존 청크는 툼스톤 처리)"""
+        texts = [chunk["text"] for chunk in chunks]
+        metadatas = [chunk["metadata"] for chunk in chunks]
+        ids = [chunk["id"] for chunk in chunks]
+
+        with self._lock.write():
+            self._ensure_loaded()
+
+            # 같은 문서를 다시 색인하면 이전 청크는 툼스톤으로 무효화 (append-only)
+            self._tombstones.update(self._live_ids_for(storage_id))
+
+            if self._store is None:
+                # 첫 색인이거나 기존 인덱스를 쓸 수 없는 경우 (임베딩 불일치 등): 남은 세그먼트까지 정리하고 새로 저장
+                if os.path.exists(UNIFIED_STORE_PATH) or self._segment_numbers():
+                    print("[WARNING] 기존 벡터 인덱스를 현재 임베딩 백엔드로 새로 생성합니다.")
+                self._tombstones.clear()
+                self._next_segment = max([self._next_segment - 1] + self._segment_numbers()) + 1
+                self._add_embeddings(texts, vectors, metadatas, ids)
+                self._checkpoint()
+            else:
+                self._add_embeddings(texts, vectors, metadatas, ids)
+                self._write_segment(texts, vectors, metadatas, ids)
+                if self._segment_count >= settings.RAG_SEGMENT_MERGE_COUNT:
+                    self._checkpoint()
+            self._save_tombstones()
+            self._unload_if_over_limit()
+
+        self.compact_if_needed()
+        return len(chunks)
+
+    def index_document(
+        self,
+        storage_id: str,
+        texts: List[str],
+        filename: str = "",
+        pages: Optional[List[int]] = None
+    ) -> int:
         """
-        저장된 벡터 스토어 로드
+        문서를 통합 인덱스에 추가
 
         Args:
-            upload_id: 문서 업로드 ID
+            storage_id: 문서 저장 ID
+            texts: 페이지(또는 섹션)별 텍스트 리스트
+            filename: 원본 파일명
+            pages: texts에 대응하는 페이지 번호 (기본값 1..n)
 
         Returns:
-            FAISS 벡터 스토어 또는 None
+            추가된 청크 개수
         """
-        try:
-            vector_store_path = os.path.join(VECTOR_STORE_DIR, f"{upload_id}.faiss")
+        chunks = self._build_chunks(storage_id, texts, filename, pages)
+        if not chunks:
+            return 0
+        vectors = self.embeddings.embed_documents([chunk["text"] for chunk in chunks])
+        return self._append(storage_id, chunks, vectors)
+
+    def delete_document(self, storage_id: str) -> int:
+        """
+        문서 삭제 (툼스톤 기록, 실제 제거는 압축 시 수행)
+
+        Returns:
+            툼스톤 처리된 청크 개수
+        """
+        with self._lock.write():
+            self._ensure_loaded()
+            ids = self._live_ids_for(storage_id)
+            self._tombstones.update(ids)
+            self._save_tombstones()
+            self._unload_if_over_limit()
+
+        self.compact_if_needed()
+        return len(ids)
 
-            if not os.path.exists(vector_store_path):
-                return None
+    def compact(self) -> int:
+        """
+        툼스톤 처리된 청크를 인덱스에서 실제로 제거 (전체 저장 포함)
 
-            knowledge_base = FAISS.load_local(
-                vector_store_path,
-                self.embeddings,
-                allow_dangerous_deserialization=True
+        Returns:
+            제거된 청크 개수
+        """
+        with self._lock.write():
+            self._ensure_loaded()
+            if self._store is None or not self._tombstones:
+                return 0
+
+            existing = set(self._store.docstore._dict.keys())
+            removable = [doc_id for doc_id in self._tombstones if doc_id in existing]
+            if removable:
+                self._store.delete(removable)
+                self._store_bytes = estimate_store_bytes(self._store)
+                self._checkpoint()
+
+            self._tombstones.clear()
+            self._save_tombstones()
+            print(f"[INFO] 통합 벡터 인덱스 압축 완료: {len(removable)}개 청크 제거")
+            self._unload_if_over_limit()
+            return len(removable)
+
+    def compact_if_needed(self) -> int:
+        """툼스톤 비율이 임계치(RAG_COMPACT_RATIO)를 넘으면 압축"""
+        if not self._tombstones:
+            return 0
+        self._load_store()
+        with self._lock.read():
+            needed = (
+                self._store is not None
+                and bool(self._tombstones)
+                and len(self._tombstones) / max(self._store.index.ntotal, 1) >= settings.RAG_COMPACT_RATIO
             )
+        if not needed:
+            self._evict_if_over_limit()
+            return 0
+        return self.compact()
+
+    # ============================================
+    # 검색 / 답변
+    # ============================================
+
+    def _make_filter(self, storage_ids: Optional[List[str]]):
+        """문서 필터 + 툼스톤 제외 필터 (읽기 락 안에서만 사용)"""
+        allowed = set(storage_ids) if storage_ids else None
+        tombstones = self._tombstones
+
+        def _filter(metadata: Dict[str, Any]) -> bool:
+            if metadata.get("chunk_id") in tombstones:
+                return False
+            return allowed is None or metadata.get("storage_id") in allowed
+
+        return _filter
+
+    @staticmethod
+    def _fetch_k(k: int) -> int:
+        return max(k * 10, 50)
+
+    def _search_by_vector(self, embedding: List[float], k: int, storage_ids: Optional[List[str]]) -> List[Any]:
+        """임베딩으로 검색 (질문 임베딩은 락 밖에서 미리 계산)"""
+        while True:
+            self._load_store()
+            with self._lock.read():
+                # 로드 직후 다른 스레드가 메모리에서 내려놓았으면 다시 로드
+                if not self._loaded:
+                    continue
+                if self._store is None:
+                    return []
+                results = self._store.similarity_search_by_vector(
+                    embedding, k=k, filter=self._make_filter(storage_ids), fetch_k=self._fetch_k(k)
+                )
+            break
+        self._evict_if_over_limit()
+        return results
+
+    def search(self, question: str, k: int = 4, storage_ids: Optional[List[str]] = None) -> List[Any]:
+        """
+        질문과 유사한 청크 검색
 
-            return knowledge_base
-        except Exception as e:
-            print(f"벡터 스토어 로드 실패: {e}")
-            return None
+        Args:
+            question: 검색 질문
+            k: 반환할 청크 개수
+            storage_ids: 검색 대상 문서 (None이면 전체 문서)
+
+        Returns:
+            LangChain Document 리스트 (metadata에 storage_id/filename/page 포함)
+        """
+        if self.load_vector_store() is None:
+            return []
+        return self._search_by_vector(self.embeddings.embed_query(question), k, storage_ids)
 
     def search_similar_documents(self, upload_id: str, question: str, k: int = 4) -> List[str]:
         """
-        질문과 유사한 문서 청크 검색
+        특정 문서 안에서 질문과 유사한 청크 텍스트 검색
 
         Args:
-            upload_id: 문서 업로드 ID
+            upload_id: 문서 업로드 ID (storage_id)
             question: 검색 질문
             k: 반환할 문서 개수
 
         Returns:
             유사한 문서 청크 리스트
         """
-        knowledge_base = self.load_vector_store(upload_id)
+        return [doc.page_content for doc in self.search(question, k=k, storage_ids=[upload_id])]
 
-        if not knowledge_base:
-            return []
+    def _run_chain(self, question: str, references: List[Any]) -> dict:
+        chain = load_qa_chain(self.llm, chain_type="stuff")
+
+        # 답변 생성 (토큰 사용량 추적)
+        with get_openai_callback() as cb:
+            response = chain.run(input_documents=references, question=question)
+            tokens_used = cb.total_tokens
 
-        # 유사도 검색
-        docs = knowledge_base.similarity_search(question, k=k)
+        return self._format_answer(response, references, tokens_used)
 
-        return [doc.page_content for doc in docs]
+    @staticmethod
+    def _format_answer(answer: str, references: List[Any], tokens_used: int) -> dict:
+        if not references:
+            return {
+                "answer": "관련 문서를 찾을 수 없습니다.",
+                "references": [],
+                "tokens_used": 0
+            }
+        return {
+            "answer": answer,
+            "references": [doc.page_content[:200] + "..." for doc in references],
+            "sources": [
+                {
+                    "storage_id": doc.metadata.get("storage_id"),
+                    "filename": doc.metadata.get("filename"),
+                    "page": doc.metadata.get("page"),
+                }
+                for doc in references
+            ],
+            "tokens_used": tokens_used,
+            "reference_count": len(references)
+        }
 
-    def generate_answer(self, question: str, upload_id: str) -> dict:
+    def generate_answer(self, question: str, upload_id: Optional[str] = None) -> dict:
         """
         RAG 기반 답변 생성
 
         Args:
             question: 사용자 질문
-            upload_id: 문서 업로드 ID
+            upload_id: 문서 업로드 ID (None이면 전체 문서 대상)
 
         Returns:
             답변 및 메타데이터
         """
-        # 벡터 스토어 로드
-        knowledge_base = self.load_vector_store(upload_id)
+        if self._load_store() is None:
+            raise ValueError("색인된 문서가 없습니다.")
+
+        references = self.search(question, k=4, storage_ids=[upload_id] if upload_id else None)
+        if not references:
+            return self._format_answer("", [], 0)
+
+        return self._run_chain(question, references)
+
+    # ============================================
+    # 비동기 API (FastAPI 핸들러에서 이벤트 루프를 막지 않음)
+    # ============================================
+
+    async def _aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        """배치 단위 비동기 임베딩 (동시 요청 수 제한)"""
+        batch_size = settings.RAG_EMBED_BATCH_SIZE
+        semaphore = asyncio.Semaphore(settings.RAG_EMBED_CONCURRENCY)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embeddings.aembed_documents(batch)
+
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    async def aindex_document(
+        self,
+        storage_id: str,
+        texts: List[str],
+        filename: str = "",
+        pages: Optional[List[int]] = None
+    ) -> int:
+        """
+        문서를 통합 인덱스에 추가 (비동기)
+        - 임베딩은 배치로 나눠 동시 요청, 인덱스 추가/저장은 스레드에서 수행
+        """
+        chunks = self._build_chunks(storage_id, texts, filename, pages)
+        if not chunks:
+            return 0
+        vectors = await self._aembed_texts([chunk["text"] for chunk in chunks])
+        return await asyncio.to_thread(self._append, storage_id, chunks, vectors)
+
+    async def adelete_document(self, storage_id: str) -> int:
+        """문서 삭제 (비동기)"""
+        return await asyncio.to_thread(self.delete_document, storage_id)
+
+    async def aload_vector_store(self) -> Optional[FAISS]:
+        """통합 벡터 스토어 (비동기, 디스크 로드는 스레드에서 수행)"""
+        if self._loaded:
+            self._count_lookup()
+            return self._store
+        return await asyncio.to_thread(self.load_vector_store)
+
+    async def asearch(self, question: str, k: int = 4, storage_ids: Optional[List[str]] = None) -> List[Any]:
+        """질문과 유사한 청크 검색 (비동기, 락을 잡는 검색은 스레드에서 수행)"""
+        if await self.aload_vector_store() is None:
+            return []
+        embedding = await self.embeddings.aembed_query(question)
+        return await asyncio.to_thread(self._search_by_vector, embedding, k, storage_ids)
+
+    async def asearch_similar_documents(self, upload_id: str, question: str, k: int = 4) -> List[str]:
+        """특정 문서 안에서 질문과 유사한 청크 텍스트 검색 (비동기)"""
+        docs = await self.asearch(question, k=k, storage_ids=[upload_id])
+        return [doc.page_content for doc in docs]
+
+    async def agenerate_answer(self, question: str, upload_id: Optional[str] = None) -> dict:
+        """
+        RAG 기반 답변 생성 (비동기)
 
-        if not knowledge_base:
-            raise ValueError(f"벡터 스토어를 찾을 수 없습니다: {upload_id}")
+        Args:
+            question: 사용자 질문
+            upload_id: 문서 업로드 ID (None이면 전체 문서 대상)
 
-        # 관련 문서 검색
-        references = knowledge_base.similarity_search(question, k=4)
+        Returns:
+            답변 및 메타데이터
+        """
+        if await asyncio.to_thread(self._load_store) is None:
+            raise ValueError("색인된 문서가 없습니다.")
 
+        references = await self.asearch(question, k=4, storage_ids=[upload_id] if upload_id else None)
         if not references:
-            return {
-                "answer": "관련 문서를 찾을 수 없습니다.",
-                "references": [],
-                "tokens_used": 0
-            }
+            return self._format_answer("", [], 0)
 
-        # QA 체인 생성
         chain = load_qa_chain(self.llm, chain_type="stuff")
 
-        # 답변 생성 (토큰 사용량 추적)
         with get_openai_callback() as cb:
-            response = chain.run(input_documents=references, question=question)
+            result = await chain.ainvoke({"input_documents": references, "question": question})
             tokens_used = cb.total_tokens
 
-        return {
-            "answer": response,
-            "references": [doc.page_content[:200] + "..." for doc in references],
-            "tokens_used": tokens_used,
-            "reference_count": len(references)
-        }
+        return self._format_answer(result["output_text"], references, tokens_used)
 
 
 # 싱글톤 인스턴스
 rag_service = RAGService()
+
+# 저장소 정리로 문서 전체가 삭제되면 통합 인덱스에서도 툼스톤 처리
+storage_manager.add_eviction_hook(rag_service.adelete_document)
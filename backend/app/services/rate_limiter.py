@@ -0,0 +1,220 @@
+"""토큰 버킷 기반 요청 제한 (클라이언트/엔드포인트별) 및 업스트림 LLM 호출 예산"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.services.prompt_budget import count_message_tokens
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        """amount개를 꺼내려면 기다려야 하는 시간 (초, 0이면 즉시 가능)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else math.inf
+
+    def consume(self, amount: float = 1.0):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """사후 보정 (실제 사용량이 예상보다 많으면 음수로 내려가 이후 요청이 기다림)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+# ============================================
+# 클라이언트 요청 제한
+# ============================================
+
+def _trusted_proxies() -> set:
+    return {address.strip() for address in settings.TRUSTED_PROXIES.split(",") if address.strip()}
+
+
+def client_identifier(request: Request) -> str:
+    """
+    클라이언트 식별자 (연결 주소)
+
+    - X-Forwarded-For는 연결 주소가 TRUSTED_PROXIES에 있을 때만 사용
+      (그 외에는 클라이언트가 값을 바꿔가며 제한을 우회할 수 있음)
+    - 오른쪽부터 보면서 신뢰하는 프록시가 아닌 첫 주소를 클라이언트로 봄
+    """
+    host = request.client.host if request.client else "unknown"
+    trusted = _trusted_proxies()
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or host not in trusted:
+        return host
+    for address in reversed([part.strip() for part in forwarded.split(",") if part.strip()]):
+        if address not in trusted:
+            return address
+    return host
+
+
+class ClientRateLimiter:
+    """
+    (클라이언트, 엔드포인트)별 토큰 버킷
+
+    - 분당 RATE_LIMIT_PER_MINUTE개 속도로 채워지고 RATE_LIMIT_BURST개까지 연속 요청 허용
+    - 버킷 수는 max_keys로 제한 (가장 오래 사용되지 않은 버킷부터 제거, 제거된 버킷은 가득 찬 상태와 같음)
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, client: str, endpoint: str) -> float:
+        """
+        요청 1건 허용 여부 확인
+
+        Returns:
+            0이면 허용, 양수면 다시 시도할 수 있을 때까지 남은 시간 (초)
+        """
+        key = (client, endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(settings.RATE_LIMIT_PER_MINUTE / 60.0, settings.RATE_LIMIT_BURST)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        wait = bucket.wait_time(1)
+        if wait > 0:
+            self.rejected += 1
+            return wait
+        bucket.consume(1)
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "per_minute": settings.RATE_LIMIT_PER_MINUTE,
+            "burst": settings.RATE_LIMIT_BURST,
+            "tracked_clients": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+client_rate_limiter = ClientRateLimiter()
+
+
+def rate_limit(endpoint: str):
+    """
+    라우트 의존성: 클라이언트별 요청 제한 (초과 시 429 + Retry-After)
+
+    사용 예:
+        @router.post("/chat", dependencies=[Depends(rate_limit("qa_chat"))])
+    """
+    async def dependency(request: Request):
+        if settings.RATE_LIMIT_PER_MINUTE <= 0:
+            return
+        wait = client_rate_limiter.check(client_identifier(request), endpoint)
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="요청이 많습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+    return dependency
+
+
+# ============================================
+# 업스트림 LLM 호출 예산 (전체 공유)
+# ============================================
+
+class UpstreamBudgetExceeded(Exception):
+    """업스트림 예산 대기 시간이 한도를 넘을 때 (라우터에서 429로 처리)"""
+
+    def __init__(self, wait: float):
+        super().__init__(f"Rate budget exceeded: LLM 호출 예산 초과 (예상 대기 {wait:.1f}초)")
+        self.wait = wait
+
+
+def estimate_message_tokens(messages: List[dict]) -> int:
+    """메시지 입력 토큰 수 (prompt_budget 토크나이저 사용)"""
+    return count_message_tokens(messages)
+
+
+class UpstreamBudget:
+    """
+    모든 LLM 호출이 공유하는 분당 요청 수(RPM) / 토큰 수(TPM) 예산
+
+    - 호출 전 예상 토큰(입력 추정치 + max_tokens)만큼 예약, 예산이 없으면 순서대로 대기
+    - 응답 후 실제 사용량으로 보정
+    - 대기 시간이 LLM_BUDGET_MAX_WAIT_SEC를 넘으면 즉시 UpstreamBudgetExceeded
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        rpm = rpm or settings.LLM_BUDGET_RPM
+        tpm = tpm or settings.LLM_BUDGET_TPM
+        self.requests = TokenBucket(rpm / 60.0, rpm)
+        self.tokens = TokenBucket(tpm / 60.0, tpm)
+        self._lock: Optional[asyncio.Lock] = None
+        self.waited = 0
+        self.total_wait = 0.0
+        self.rejected = 0
+
+    async def acquire(self, estimated_tokens: int):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # 락을 잡은 채 기다려 먼저 온 요청이 먼저 나가도록 함
+        async with self._lock:
+            started = time.monotonic()
+            while True:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    break
+                if time.monotonic() - started + wait > settings.LLM_BUDGET_MAX_WAIT_SEC:
+                    self.rejected += 1
+                    raise UpstreamBudgetExceeded(wait)
+                await asyncio.sleep(wait)
+
+            self.requests.consume(1)
+            self.tokens.consume(estimated_tokens)
+            elapsed = time.monotonic() - started
+            if elapsed > 0.001:
+                self.waited += 1
+                self.total_wait += elapsed
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def stats(self) -> dict:
+        return {
+            "rpm": int(self.requests.capacity),
+            "tpm": int(self.tokens.capacity),
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens),
+            "waited": self.waited,
+            "total_wait_sec": round(self.total_wait, 2),
+            "rejected": self.rejected,
+        }
+
+
+# 싱글톤 인스턴스
+upstream_budget = UpstreamBudget()
@@ -0,0 +1,236 @@
+"""자료 추천 결과 캐시 (MongoDB TTL 인덱스 + 로컬 파일 폴백, stale-while-revalidate)"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.mongo import get_database
+
+# MongoDB 미연결 시 로컬 저장 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+LOCAL_CACHE_PATH = os.path.join(BASE_DIR, "data", "cache", "recommend.json")
+os.makedirs(os.path.dirname(LOCAL_CACHE_PATH), exist_ok=True)
+
+COLLECTION = "recommend_cache"
+
+# MongoDB 호출이 실패하면 이 시간 동안은 MongoDB를 건너뛰고 로컬 파일만 사용 (초)
+MONGO_RETRY_SECONDS = 60
+# MongoDB 호출 1회 최대 대기 시간 (서버 선택 대기 포함, 초)
+MONGO_TIMEOUT_SECONDS = 2
+
+
+def normalize_inputs(topic: str, level: str, purpose: str) -> Dict[str, str]:
+    """대소문자/공백 차이를 무시하도록 입력 정규화"""
+    return {
+        "topic": re.sub(r"\s+", " ", (topic or "").strip()).lower(),
+        "level": (level or "").strip().lower(),
+        "purpose": (purpose or "").strip().lower(),
+    }
+
+
+def make_cache_key(topic: str, level: str, purpose: str) -> str:
+    normalized = normalize_inputs(topic, level, purpose)
+    raw = f"{normalized['topic']}|{normalized['level']}|{normalized['purpose']}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RecommendCache:
+    """
+    (topic, level, purpose) 단위 추천 결과 캐시
+
+    - RECOMMEND_CACHE_FRESH_SEC 이내: 그대로 반환
+    - 그 이후 RECOMMEND_CACHE_STALE_SEC 동안: 이전 결과를 즉시 반환하고 백그라운드에서 갱신
+    - 그 이후: 만료 (MongoDB는 expires_at TTL 인덱스로 자동 삭제)
+    - MongoDB에 닿지 않으면 MONGO_RETRY_SECONDS 동안 로컬 파일만 사용 (요청마다 연결 대기하지 않음)
+    """
+
+    def __init__(self, local_path: str = LOCAL_CACHE_PATH):
+        self.local_path = local_path
+        self._index_ready = False
+        self._mongo_retry_at = 0.0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    # ----------------------------
+    # 저장소 (MongoDB 우선, 실패 시 로컬 파일)
+    # ----------------------------
+    def _mongo_available(self) -> bool:
+        return time.time() >= self._mongo_retry_at
+
+    async def _mongo(self, operation: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        컬렉션에 operation 실행 (MONGO_TIMEOUT_SECONDS 제한)
+        - 실패하면 MONGO_RETRY_SECONDS 동안 _mongo_available()이 False
+        """
+        async def run():
+            collection = get_database()[COLLECTION]
+            if not self._index_ready:
+                await collection.create_index("expires_at", expireAfterSeconds=0)
+                await collection.create_index("key", unique=True)
+                self._index_ready = True
+            return await operation(collection)
+
+        try:
+            return await asyncio.wait_for(run(), timeout=MONGO_TIMEOUT_SECONDS)
+        except Exception:
+            self._mongo_retry_at = time.time() + MONGO_RETRY_SECONDS
+            raise
+
+    def _load_local(self) -> Dict[str, dict]:
+        if not os.path.exists(self.local_path):
+            return {}
+        try:
+            with open(self.local_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_local(self, entries: Dict[str, dict]):
+        now = time.time()
+        entries = {k: v for k, v in entries.items() if v["expires_at"] > now}
+        tmp_path = f"{self.local_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.local_path)
+
+    async def _read(self, key: str) -> Optional[dict]:
+        """캐시 항목 조회 ({"items", "created_at"(epoch)} 또는 None)"""
+        if self._mongo_available():
+            try:
+                doc = await self._mongo(lambda c: c.find_one({"key": key}, {"_id": 0}))
+                if doc is None or doc["expires_at"] <= datetime.utcnow():
+                    return None
+                age = (datetime.utcnow() - doc["created_at"]).total_seconds()
+                return {"items": doc["items"], "created_at": time.time() - age}
+            except Exception:
+                pass
+
+        entry = self._load_local().get(key)
+        if entry is None or entry["expires_at"] <= time.time():
+            return None
+        return entry
+
+    async def _write(self, key: str, inputs: Dict[str, str], items: List[dict]):
+        ttl = settings.RECOMMEND_CACHE_FRESH_SEC + settings.RECOMMEND_CACHE_STALE_SEC
+        if self._mongo_available():
+            now = datetime.utcnow()
+            try:
+                await self._mongo(lambda c: c.update_one(
+                    {"key": key},
+                    {"$set": {**inputs, "key": key, "items": items,
+                              "created_at": now, "expires_at": now + timedelta(seconds=ttl)}},
+                    upsert=True
+                ))
+                return
+            except Exception as e:
+                print(f"추천 캐시 MongoDB 저장 오류 (로컬에 저장): {e}")
+
+        entries = self._load_local()
+        now = time.time()
+        entries[key] = {**inputs, "items": items, "created_at": now, "expires_at": now + ttl}
+        self._save_local(entries)
+
+    # ----------------------------
+    # 조회 / 갱신
+    # ----------------------------
+    async def get_or_generate(
+        self, topic: str, level: str, purpose: str,
+        generate: Callable[[], Awaitable[List[dict]]]
+    ) -> List[dict]:
+        """
+        캐시된 추천 결과 반환 (없으면 generate 호출 후 저장)
+
+        Args:
+            generate: 추천 항목(dict) 목록을 만드는 코루틴 함수
+        """
+        key = make_cache_key(topic, level, purpose)
+        inputs = normalize_inputs(topic, level, purpose)
+        entry = await self._read(key)
+
+        if entry is not None:
+            age = time.time() - entry["created_at"]
+            if age < settings.RECOMMEND_CACHE_FRESH_SEC:
+                self.fresh_hits += 1
+            else:
+                self.stale_hits += 1
+                self._schedule_refresh(key, inputs, generate)
+            return entry["items"]
+
+        self.misses += 1
+        items = await generate()
+        if items:
+            await self._write(key, inputs, items)
+        return items
+
+    def _schedule_refresh(self, key: str, inputs: Dict[str, str], generate):
+        """오래된 항목을 백그라운드에서 갱신 (같은 키는 한 번만)"""
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                items = await generate()
+                if items:
+                    await self._write(key, inputs, items)
+                self.refreshes += 1
+            except Exception as e:
+                self.refresh_failures += 1
+                print(f"[WARNING] 추천 캐시 갱신 실패: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def invalidate(self, topic: Optional[str] = None, level: Optional[str] = None,
+                         purpose: Optional[str] = None) -> int:
+        """
+        캐시 무효화 (세 값을 모두 주면 해당 항목만, 아니면 전체)
+
+        Returns:
+            삭제된 항목 수
+        """
+        key = make_cache_key(topic, level, purpose) if topic and level and purpose else None
+        deleted = 0
+        if self._mongo_available():
+            try:
+                result = await self._mongo(lambda c: c.delete_many({"key": key} if key else {}))
+                deleted += result.deleted_count
+            except Exception:
+                pass
+
+        entries = self._load_local()
+        if key:
+            deleted += 1 if entries.pop(key, None) is not None else 0
+        else:
+            deleted += len(entries)
+            entries = {}
+        self._save_local(entries)
+        return deleted
+
+    def stats(self) -> dict:
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.fresh_hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": len(self._refreshing),
+            "mongo_available": self._mongo_available(),
+            "fresh_seconds": settings.RECOMMEND_CACHE_FRESH_SEC,
+            "stale_seconds": settings.RECOMMEND_CACHE_STALE_SEC,
+        }
+
+
+# 싱글톤 인스턴스
+recommend_cache = RecommendCache()
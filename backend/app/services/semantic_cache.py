@@ -0,0 +1,142 @@
+"""Q&A 의미 기반 응답 캐시 (로컬 임베딩 유사도 + TTL + LRU)"""
+import hashlib
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_service import aget_embedding_service
+
+
+def context_cache_key(context: Optional[str], document_hash: Optional[str] = None) -> str:
+    """
+    캐시 구분 키
+    - 업로드 문서: 문서 내용 해시 (질문마다 검색되는 청크가 달라도 같은 문서면 같은 키)
+    - 그 외: 전달된 컨텍스트 원문 해시 (컨텍스트 없음도 하나의 키)
+    """
+    if document_hash:
+        return f"doc:{document_hash}"
+    return "ctx:" + hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """
+    같은 컨텍스트에서 의미가 비슷한 질문의 이전 답변을 재사용
+
+    - 질문을 ko-sroberta로 임베딩 (정규화 후 내적 = 코사인 유사도)
+    - 같은 컨텍스트 키의 항목 중 유사도가 threshold 이상인 가장 가까운 답변 반환
+    - TTL이 지난 항목은 조회 시 제거, 최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+    - 프로세스 메모리에만 보관 (재시작 시 초기화)
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None,
+                 threshold: Optional[float] = None, embedder=None):
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.SEMANTIC_CACHE_TTL_SEC
+        self.threshold = threshold or settings.SEMANTIC_CACHE_THRESHOLD
+        self._embedder = embedder
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._by_context: Dict[str, Dict[int, None]] = {}
+        self._ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.expired = 0
+
+    async def embed(self, question: str) -> np.ndarray:
+        embedder = self._embedder or await aget_embedding_service()
+        vector = np.asarray(await embedder.create_embedding(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        ids = self._by_context.get(entry["context_key"])
+        if ids is not None:
+            ids.pop(entry_id, None)
+            if not ids:
+                del self._by_context[entry["context_key"]]
+
+    async def lookup(self, question: str, context_key: str) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        """
+        유사 질문의 캐시된 답변 조회
+
+        Returns:
+            (캐시 항목 또는 None, 질문 임베딩) - 임베딩은 store()에 그대로 넘겨 재계산을 피함
+        """
+        vector = await self.embed(question)
+        now = time.time()
+
+        best_id, best_score = None, -1.0
+        for entry_id in list(self._by_context.get(context_key, ())):
+            entry = self._entries[entry_id]
+            if now - entry["created_at"] > self.ttl_seconds:
+                self._remove(entry_id)
+                self.expired += 1
+                continue
+            score = float(np.dot(entry["vector"], vector))
+            if score > best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None or best_score < self.threshold:
+            self.misses += 1
+            return None, vector
+
+        self._entries.move_to_end(best_id)
+        self.hits += 1
+        entry = self._entries[best_id]
+        return {"answer_md": entry["answer_md"], "question": entry["question"], "similarity": round(best_score, 4)}, vector
+
+    def store(self, question: str, context_key: str, answer_md: str, vector: np.ndarray):
+        """답변 저장 (같은 질문으로 간주되는 기존 항목은 교체, 최대 항목 수 초과 시 LRU 제거)"""
+        for old_id in list(self._by_context.get(context_key, ())):
+            if float(np.dot(self._entries[old_id]["vector"], vector)) >= self.threshold:
+                self._remove(old_id)
+
+        entry_id = next(self._ids)
+        self._entries[entry_id] = {
+            "context_key": context_key,
+            "question": question,
+            "answer_md": answer_md,
+            "vector": vector,
+            "created_at": time.time(),
+        }
+        self._by_context.setdefault(context_key, {})[entry_id] = None
+
+        while len(self._entries) > self.max_entries:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self.evictions += 1
+
+    def record_bypass(self):
+        self.bypassed += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_context.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.SEMANTIC_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "contexts": len(self._by_context),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# 싱글톤 인스턴스
+semantic_cache = SemanticCache()
@@ -0,0 +1,68 @@
+"""동일 요청 단일 실행 (single-flight) 유틸리티"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+def canonical_key(payload: Dict[str, Any]) -> str:
+    """요청 파라미터를 정렬된 JSON으로 직렬화한 해시 (같은 요청이면 같은 키)"""
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출이 하나의 실행 결과를 공유
+
+    - 첫 호출(leader)만 실제로 실행하고, 실행 중에 들어온 호출(follower)은 같은 태스크를 기다림
+    - 실행은 별도 태스크로 돌려 leader 요청이 취소돼도 follower에게는 결과가 전달됨
+    - 기다리는 호출이 모두 취소되면 실행도 취소
+    - 완료되면 키를 지우므로 결과를 캐시하지는 않음
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            self._waiters.pop(key, None)
+        # 아무도 결과를 가져가지 않은 예외가 경고로 남지 않도록 처리
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._tasks),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / calls, 3) if calls else 0.0,
+        }
@@ -0,0 +1,338 @@
+"""업로드/파생 데이터 디스크 사용량 관리 (용량 제한 + LRU 정리)"""
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.mongo import get_database
+from app.services.digest_service import DIGEST_DIR
+from app.services.document_index import CHUNK_INDEX_DIR, document_index
+from app.services.fulltext_index import FULLTEXT_DIR, fulltext_index
+from app.services.summarizer import SUMMARY_CACHE_DIR
+from app.services.text_store import TEXT_STORE_DIR
+from app.services.upload_manifest import DATA_DIR, JSON_DIR, upload_manifest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+VECTOR_STORE_DIR = os.path.join(BASE_DIR, "vector_stores")
+USAGE_PATH = os.path.join(DATA_DIR, "storage_usage.json")
+
+# 최근 이 시간 안에 사용된 문서는 정리 대상에서 제외 (업로드 처리 중인 문서 보호)
+MIN_IDLE_SECONDS = 600
+
+# 문서 전체 정리 시 호출되는 함수 (storage_id를 받아 다른 서비스의 상태를 정리)
+EvictionHook = Callable[[str], Awaitable[Any]]
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += _file_size(os.path.join(root, name))
+    return total
+
+
+def _remove_paths(paths: List[str]):
+    """파일/디렉토리 삭제 (스레드에서 실행, 이미 없거나 실패한 항목은 건너뜀)"""
+    for path in paths:
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"[WARNING] 저장소 정리 중 삭제 실패 ({path}): {e}")
+
+
+class StorageManager:
+    """
+    storage_id별 디스크 사용량과 마지막 접근 시각을 추적하고 용량 제한을 적용
+
+    - 다시 만들 수 있는 파생 데이터(청크 인덱스, 요약 캐시)를 먼저 LRU로 정리 (다음 질문 시 재생성)
+    - 그래도 초과하면 문서 전체(업로드 파일, JSON, 추출 텍스트, 전문 검색 색인, 다이제스트)를 LRU로 정리
+    - 정리는 STORAGE_QUOTA_MB * STORAGE_TARGET_RATIO 이하가 될 때까지 수행
+    - 통합 벡터 인덱스는 툼스톤 + compact()로만 줄어들므로 용량 계산에서 제외 (사용량만 보고)
+    - 선택과 메모리 상태 변경은 이벤트 루프에서, 디렉토리 스캔과 파일 삭제만 스레드에서 수행
+    """
+
+    def __init__(self, usage_path: str = USAGE_PATH):
+        self.usage_path = usage_path
+        self._last_access: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()  # 접근 기록 (스캔 스레드와 이벤트 루프가 공유)
+        self._dirty = False
+        self._eviction_hooks: List[EvictionHook] = []
+        self.last_sweep: Optional[dict] = None
+
+    def add_eviction_hook(self, hook: EvictionHook):
+        """문서 전체 정리 시 호출할 함수 등록 (예: 통합 벡터 인덱스 툼스톤 처리)"""
+        self._eviction_hooks.append(hook)
+
+    # ----------------------------
+    # 접근 기록
+    # ----------------------------
+    def _ensure_loaded(self):
+        """접근 기록 로드 (self._lock을 잡은 상태에서 호출)"""
+        if self._last_access is not None:
+            return
+        self._last_access = {}
+        if os.path.exists(self.usage_path):
+            try:
+                with open(self.usage_path, "r", encoding="utf-8") as f:
+                    self._last_access = json.load(f).get("last_access", {})
+            except Exception as e:
+                print(f"[WARNING] 저장소 사용 기록 로드 실패: {e}")
+
+    def touch(self, storage_id: str):
+        """문서 접근 기록 (디스크 반영은 정리 주기마다)"""
+        with self._lock:
+            self._ensure_loaded()
+            self._last_access[storage_id] = time.time()
+            self._dirty = True
+
+    def forget(self, storage_id: str):
+        with self._lock:
+            self._ensure_loaded()
+            if self._last_access.pop(storage_id, None) is not None:
+                self._dirty = True
+
+    def flush(self):
+        """접근 기록 저장"""
+        with self._lock:
+            self._ensure_loaded()
+            if not self._dirty:
+                return
+            snapshot = dict(self._last_access)
+            self._dirty = False
+        tmp_path = f"{self.usage_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"last_access": snapshot}, f)
+        os.replace(tmp_path, self.usage_path)
+
+    def _access_time(self, storage_id: str) -> float:
+        with self._lock:
+            self._ensure_loaded()
+            accessed = self._last_access.get(storage_id)
+        if accessed is not None:
+            return accessed
+        # 기록이 없으면 JSON 파일 수정 시각으로 대체
+        json_path = os.path.join(JSON_DIR, f"{storage_id}.json")
+        return os.path.getmtime(json_path) if os.path.exists(json_path) else 0.0
+
+    # ----------------------------
+    # 사용량 계산
+    # ----------------------------
+    def _known_storage_ids(self) -> List[str]:
+        ids = set()
+        for directory, suffix in ((JSON_DIR, ".json"), (FULLTEXT_DIR, ".idx"), (DIGEST_DIR, ".json")):
+            if os.path.isdir(directory):
+                ids.update(name[:-len(suffix)] for name in os.listdir(directory) if name.endswith(suffix))
+        if os.path.isdir(TEXT_STORE_DIR):
+            ids.update(name for name in os.listdir(TEXT_STORE_DIR) if not name.endswith(".tmp"))
+        if os.path.isdir(CHUNK_INDEX_DIR):
+            ids.update(os.path.splitext(name)[0] for name in os.listdir(CHUNK_INDEX_DIR))
+        return sorted(ids)
+
+    def _original_files(self, storage_id: str) -> List[str]:
+        entry = upload_manifest.get(storage_id) or {}
+        return [os.path.join(UPLOAD_DIR, name) for name in entry.get("original_filenames", []) if name]
+
+    def _document_usage(self, storage_id: str) -> Dict[str, Any]:
+        """
+        문서별 사용량
+        - derived: 다시 만들 수 있는 청크 인덱스
+        - original: 원본과 함께만 지우는 데이터 (전문 검색 색인/다이제스트는 원본 없이 재생성할 수 없음)
+        - files: 업로드 원본 파일 경로별 크기 (여러 문서가 같은 파일을 참조할 수 있어 original과 따로 집계)
+        """
+        files = {path: _file_size(path) for path in self._original_files(storage_id)}
+        derived = (
+            _file_size(os.path.join(CHUNK_INDEX_DIR, f"{storage_id}.json"))
+            + _file_size(os.path.join(CHUNK_INDEX_DIR, f"{storage_id}.npy"))
+        )
+        original = (
+            _file_size(os.path.join(JSON_DIR, f"{storage_id}.json"))
+            + _dir_size(os.path.join(TEXT_STORE_DIR, storage_id))
+            + _file_size(os.path.join(DIGEST_DIR, f"{storage_id}.json"))
+            + _file_size(os.path.join(FULLTEXT_DIR, f"{storage_id}.idx"))
+        )
+        return {"derived": derived, "original": original, "files": files, "accessed": self._access_time(storage_id)}
+
+    def _summary_cache_files(self) -> List[Tuple[float, str, int]]:
+        if not os.path.isdir(SUMMARY_CACHE_DIR):
+            return []
+        files = []
+        for name in os.listdir(SUMMARY_CACHE_DIR):
+            path = os.path.join(SUMMARY_CACHE_DIR, name)
+            try:
+                files.append((os.path.getmtime(path), path, _file_size(path)))
+            except OSError:
+                continue  # 스캔 중 삭제된 파일
+        return files
+
+    def _scan(self) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[float, str, int]], dict]:
+        """문서별 사용량, 요약 캐시 파일 목록, 전체 통계 계산 (디스크를 훑으므로 스레드에서 실행)"""
+        documents = {storage_id: self._document_usage(storage_id) for storage_id in self._known_storage_ids()}
+        summary_files = self._summary_cache_files()
+        summary_cache_bytes = sum(size for _, _, size in summary_files)
+        vector_store_bytes = _dir_size(VECTOR_STORE_DIR)
+
+        derived = sum(u["derived"] for u in documents.values()) + summary_cache_bytes
+        upload_files = {path: size for u in documents.values() for path, size in u["files"].items()}
+        original = sum(u["original"] for u in documents.values()) + sum(upload_files.values())
+        return documents, summary_files, {
+            "documents": len(documents),
+            "derived_bytes": derived,
+            "original_bytes": original,
+            "total_bytes": derived + original,  # 용량 제한 적용 대상 (통합 벡터 인덱스 제외)
+            "summary_cache_bytes": summary_cache_bytes,
+            "vector_store_bytes": vector_store_bytes,
+            "quota_bytes": settings.STORAGE_QUOTA_MB * 1024 * 1024,
+            "last_sweep": self.last_sweep,
+        }
+
+    def usage(self) -> dict:
+        """디스크 사용량 통계"""
+        return self._scan()[2]
+
+    # ----------------------------
+    # 정리
+    # ----------------------------
+    def _evict_derived(self, storage_id: str) -> List[str]:
+        """청크 인덱스 정리 (메모리 캐시만 여기서 비우고 삭제할 파일 목록 반환)"""
+        return document_index.forget(storage_id)
+
+    async def _evict_original(self, storage_id: str, released_files: List[str]) -> List[str]:
+        """
+        문서 전체 정리 (메모리 상태/MongoDB는 여기서 정리하고 삭제할 파일 목록 반환)
+
+        Args:
+            released_files: 이 문서만 참조하던 업로드 원본 파일 (다른 문서가 참조하는 파일은 남김)
+        """
+        paths = self._evict_derived(storage_id) + released_files
+        paths += [
+            os.path.join(TEXT_STORE_DIR, storage_id),
+            os.path.join(JSON_DIR, f"{storage_id}.json"),
+            os.path.join(DIGEST_DIR, f"{storage_id}.json"),
+        ]
+        upload_manifest.remove(storage_id)
+        self.forget(storage_id)
+
+        # 전문 검색 색인은 자체 락으로 보호되므로 스레드에서 제거
+        await asyncio.to_thread(fulltext_index.remove_document, storage_id)
+        for hook in self._eviction_hooks:
+            try:
+                await hook(storage_id)
+            except Exception as e:
+                print(f"문서 정리 후속 작업 오류 ({storage_id}): {e}")
+
+        # MongoDB 레코드는 정리됨으로 표시 (업로드 이력은 남김)
+        try:
+            db = get_database()
+            await db["uploaded_documents"].update_one(
+                {"storage_id": storage_id},
+                {"$set": {"status": "evicted", "evicted_at": datetime.utcnow()}, "$unset": {"digest": ""}}
+            )
+        except Exception as e:
+            print(f"MongoDB 업로드 레코드 정리 오류 ({storage_id}): {e}")
+        return paths
+
+    async def sweep(self) -> dict:
+        """
+        용량 제한 초과 시 LRU 정리 (다시 만들 수 있는 파생 데이터 우선, 원본은 마지막)
+        - 항목 하나의 정리가 실패해도 나머지는 계속 진행
+
+        Returns:
+            정리 결과 요약
+        """
+        quota = settings.STORAGE_QUOTA_MB * 1024 * 1024
+        target = int(quota * settings.STORAGE_TARGET_RATIO)
+        documents, summary_files, usage = await asyncio.to_thread(self._scan)
+        total = usage["total_bytes"]
+        now = time.time()
+
+        freed = 0
+        evicted_derived: List[str] = []
+        evicted_original: List[str] = []
+        to_remove: List[str] = []
+
+        if total > quota:
+            # 1단계: 파생 데이터 (문서별 청크 인덱스 + 요약 캐시 파일을 접근 시각 순으로)
+            candidates: List[Tuple[float, str, str, int]] = [
+                (u["accessed"], "document", sid, u["derived"])
+                for sid, u in documents.items() if u["derived"] > 0
+            ]
+            candidates += [(mtime, "summary_cache", path, size) for mtime, path, size in summary_files]
+            candidates.sort()
+
+            for accessed, kind, key, size in candidates:
+                if total - freed <= target:
+                    break
+                if now - accessed < MIN_IDLE_SECONDS:
+                    continue
+                if kind == "document":
+                    to_remove += self._evict_derived(key)
+                    evicted_derived.append(key)
+                else:
+                    to_remove.append(key)
+                freed += size
+
+            # 2단계: 원본 (가장 오래 사용되지 않은 문서부터)
+            if total - freed > target:
+                references = Counter(path for u in documents.values() for path in u["files"])
+                for accessed, storage_id in sorted((u["accessed"], sid) for sid, u in documents.items()):
+                    if total - freed <= target:
+                        break
+                    if now - accessed < MIN_IDLE_SECONDS:
+                        continue
+                    try:
+                        files = documents[storage_id]["files"]
+                        released = [path for path in files if references[path] <= 1]
+                        to_remove += await self._evict_original(storage_id, released)
+                    except Exception as e:
+                        print(f"[WARNING] 문서 정리 실패 ({storage_id}): {e}")
+                        continue
+                    references.subtract(files.keys())
+                    if storage_id not in evicted_derived:
+                        freed += documents[storage_id]["derived"]
+                    evicted_original.append(storage_id)
+                    freed += documents[storage_id]["original"] + sum(files[path] for path in released)
+
+        if to_remove:
+            await asyncio.to_thread(_remove_paths, to_remove)
+        await asyncio.to_thread(self.flush)
+        self.last_sweep = {
+            "at": datetime.utcnow().isoformat(),
+            "total_bytes_before": total,
+            "freed_bytes": freed,
+            "evicted_derived": evicted_derived,
+            "evicted_original": evicted_original,
+        }
+        if freed:
+            print(f"[INFO] 저장소 정리: {freed / 1024 / 1024:.1f}MB 확보 "
+                  f"(파생 {len(evicted_derived)}건, 원본 {len(evicted_original)}건)")
+        return self.last_sweep
+
+    async def run_periodic(self):
+        """STORAGE_GC_INTERVAL_SEC 주기로 정리 실행 (lifespan에서 백그라운드 태스크로 시작)"""
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"[WARNING] 저장소 정리 실패: {e}")
+            await asyncio.sleep(settings.STORAGE_GC_INTERVAL_SEC)
+
+
+# 싱글톤 인스턴스
+storage_manager = StorageManager()
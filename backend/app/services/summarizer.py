@@ -0,0 +1,185 @@
+"""대용량 문서 map-reduce 요약 서비스 (청크 요약 캐시 포함)"""
+import asyncio
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.document_index import split_text
+from app.services.openai_svc_qa import SYSTEM_PROMPT_BASE, generate_chat_response, generate_summary
+from app.services.prompt_budget import SUMMARY_CONTEXT_TOKENS
+
+# 청크 요약 캐시 디렉토리
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+SUMMARY_CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "summaries")
+os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+
+# 프롬프트가 바뀌면 버전을 올려 이전 캐시를 무효화
+PROMPT_VERSION = "v1"
+
+DIRECT_SUMMARY_MAX_CHARS = 5000  # 이 길이 이하 문서는 한 번의 호출로 요약
+MAP_CHUNK_CHARS = 4000      # map 단계 청크 크기
+REDUCE_INPUT_CHARS = 4500   # reduce 한 번에 합칠 요약 길이
+
+MAP_PROMPT = SYSTEM_PROMPT_BASE + """
+
+주어진 문서 일부의 핵심 내용을 5문장 이내로 요약하세요.
+- 수치, 날짜, 고유명사는 그대로 유지
+- 문서에 없는 내용은 추가하지 않음
+"""
+
+REDUCE_PROMPT = SYSTEM_PROMPT_BASE + """
+
+여러 부분 요약을 하나의 일관된 요약으로 통합하세요.
+- 중복되는 내용은 합치고 핵심 수치는 유지
+- 7문장 이내
+"""
+
+
+class SummaryCache:
+    """청크 해시 기반 부분 요약 캐시 (로컬 파일)"""
+
+    def __init__(self, cache_dir: str = SUMMARY_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(stage: str, text: str) -> str:
+        return hashlib.sha256(f"{PROMPT_VERSION}:{stage}:{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = os.path.join(self.cache_dir, f"{key}.txt")
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, key: str, summary: str):
+        path = os.path.join(self.cache_dir, f"{key}.txt")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(summary)
+        os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+summary_cache = SummaryCache()
+
+# map/reduce 요약 호출 동시 실행 제한 (모든 요약 요청이 공유, 첫 사용 시 생성)
+_summary_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _summary_semaphore
+    if _summary_semaphore is None:
+        _summary_semaphore = asyncio.Semaphore(settings.SUMMARY_MAX_CONCURRENCY)
+    return _summary_semaphore
+
+
+async def _summarize_cached(stage: str, text: str, system_prompt: str) -> str:
+    """캐시를 먼저 확인하고, 없으면 LLM으로 요약 후 캐시에 저장"""
+    key = summary_cache.make_key(stage, text)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async with _get_semaphore():
+        summary = await generate_chat_response(
+            "위 참고 자료를 요약해주세요.",
+            text,
+            system_prompt,
+            temperature=0.3,
+            context_max_tokens=SUMMARY_CONTEXT_TOKENS,
+            endpoint="qa_summary"
+        )
+
+    summary_cache.put(key, summary)
+    return summary
+
+
+def _group_for_reduce(summaries: List[str], max_chars: int = REDUCE_INPUT_CHARS) -> List[str]:
+    """요약들을 reduce 입력 크기 이하의 묶음으로 합침"""
+    groups: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for summary in summaries:
+        if current and current_len + len(summary) > max_chars:
+            groups.append("\n\n".join(current))
+            current, current_len = [], 0
+        current.append(summary)
+        current_len += len(summary)
+    if current:
+        groups.append("\n\n".join(current))
+    return groups
+
+
+async def reduce_document(text: str) -> str:
+    """
+    대용량 문서를 map-reduce로 하나의 통합 요약으로 축약
+
+    1. map: 문서를 청크로 나눠 동시에 요약 (요청 전체 합산 SUMMARY_MAX_CONCURRENCY로 제한, 청크 해시로 캐시)
+    2. reduce: 부분 요약을 묶어 다시 요약하는 과정을 하나가 될 때까지 반복
+    """
+    chunks = split_text(text, chunk_size=MAP_CHUNK_CHARS, overlap=0)
+    summaries = await asyncio.gather(
+        *(_summarize_cached("map", chunk, MAP_PROMPT) for chunk in chunks)
+    )
+    print(f"[Summarizer] map 완료: {len(chunks)}개 청크 (캐시 {summary_cache.stats()})")
+
+    level = 0
+    while len(summaries) > 1:
+        groups = _group_for_reduce(list(summaries))
+        if len(groups) == len(summaries) and len(groups) > 1:
+            # 요약이 하나씩도 묶이지 않으면 두 개씩 강제로 묶어 진행 보장
+            groups = ["\n\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        if len(groups) == 1:
+            summaries = groups
+            break
+        level += 1
+        summaries = await asyncio.gather(
+            *(_summarize_cached("reduce", group, REDUCE_PROMPT) for group in groups)
+        )
+        print(f"[Summarizer] reduce {level}단계 완료: {len(summaries)}개 요약")
+
+    return summaries[0] if summaries else ""
+
+
+async def summarize_document(question: str, text: str) -> Dict[str, Any]:
+    """
+    대용량 문서 map-reduce 요약
+
+    map-reduce로 통합 요약을 만든 뒤, 이를 컨텍스트로 사용자 질문에 맞춘 최종 요약 생성
+
+    Args:
+        question: 사용자 요약 요청
+        text: 문서 전체 텍스트
+
+    Returns:
+        {"answer_md": ..., "citations": [...]}
+    """
+    combined = await reduce_document(text)
+    return await generate_summary(question, combined)
+
+
+async def prepare_summary_context(text: Optional[str]) -> Optional[str]:
+    """최종 요약 호출에 넣을 컨텍스트 (긴 문서는 map-reduce 통합 요약으로 대체)"""
+    if text and len(text) > DIRECT_SUMMARY_MAX_CHARS:
+        return await reduce_document(text)
+    return text
+
+
+async def summarize_text(question: str, text: Optional[str]) -> Dict[str, Any]:
+    """문서 길이에 따라 단일 호출 요약 또는 map-reduce 요약 선택"""
+    if text and len(text) > DIRECT_SUMMARY_MAX_CHARS:
+        return await summarize_document(question, text)
+    return await generate_summary(question, text)
@@ -0,0 +1,129 @@
+"""추출 텍스트 압축 저장소 (청크 단위 zlib 압축 + 오프셋 테이블)"""
+import hashlib
+import json
+import os
+import shutil
+import zlib
+from typing import List, Optional
+
+# 텍스트 저장 디렉토리
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+TEXT_STORE_DIR = os.path.join(BASE_DIR, "data", "text")
+os.makedirs(TEXT_STORE_DIR, exist_ok=True)
+
+BLOB_FILENAME = "text.bin"
+OFFSETS_FILENAME = "offsets.json"
+
+
+class TextStore:
+    """
+    문서별 추출 텍스트를 한 번만 저장하는 로컬 청크 저장소
+
+    - data/text/<storage_id>/text.bin: 고정 길이(문자) 청크를 각각 zlib 압축하여 이어붙인 파일
+    - data/text/<storage_id>/offsets.json: 청크별 문자 범위와 바이트 위치
+    - 필요한 문자 범위에 해당하는 청크만 읽어 압축 해제
+    """
+
+    def __init__(self, root_dir: str = TEXT_STORE_DIR, chunk_chars: int = 64 * 1024):
+        self.root_dir = root_dir
+        self.chunk_chars = chunk_chars
+
+    def _doc_dir(self, storage_id: str) -> str:
+        return os.path.join(self.root_dir, storage_id)
+
+    def exists(self, storage_id: str) -> bool:
+        return os.path.exists(os.path.join(self._doc_dir(storage_id), OFFSETS_FILENAME))
+
+    def put(self, storage_id: str, text: str) -> dict:
+        """
+        텍스트 저장 (기존 내용은 교체)
+
+        Returns:
+            저장 메타데이터 (text_length, chunk_count, compressed_bytes, content_hash)
+        """
+        text = text or ""
+        doc_dir = self._doc_dir(storage_id)
+        tmp_dir = f"{doc_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        chunks: List[dict] = []
+        byte_offset = 0
+        with open(os.path.join(tmp_dir, BLOB_FILENAME), "wb") as blob:
+            for start in range(0, len(text), self.chunk_chars):
+                piece = text[start:start + self.chunk_chars]
+                compressed = zlib.compress(piece.encode("utf-8"), 6)
+                blob.write(compressed)
+                chunks.append({
+                    "start": start,
+                    "end": start + len(piece),
+                    "offset": byte_offset,
+                    "length": len(compressed),
+                })
+                byte_offset += len(compressed)
+
+        meta = {
+            "storage_id": storage_id,
+            "text_length": len(text),
+            "chunk_chars": self.chunk_chars,
+            "chunk_count": len(chunks),
+            "compressed_bytes": byte_offset,
+            "content_hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        }
+        with open(os.path.join(tmp_dir, OFFSETS_FILENAME), "w", encoding="utf-8") as f:
+            json.dump({**meta, "chunks": chunks}, f)
+
+        shutil.rmtree(doc_dir, ignore_errors=True)
+        os.replace(tmp_dir, doc_dir)
+        return meta
+
+    def _load_offsets(self, storage_id: str) -> Optional[dict]:
+        path = os.path.join(self._doc_dir(storage_id), OFFSETS_FILENAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def meta(self, storage_id: str) -> Optional[dict]:
+        """저장 메타데이터 조회 (청크 테이블 제외)"""
+        offsets = self._load_offsets(storage_id)
+        if offsets is None:
+            return None
+        offsets.pop("chunks", None)
+        return offsets
+
+    def read(self, storage_id: str, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+        """
+        문자 범위 [start, end) 읽기 (해당 범위의 청크만 압축 해제)
+
+        Returns:
+            텍스트 또는 None (저장된 문서가 없을 때)
+        """
+        offsets = self._load_offsets(storage_id)
+        if offsets is None:
+            return None
+
+        total = offsets["text_length"]
+        end = total if end is None else min(end, total)
+        start = max(0, start)
+        if start >= end:
+            return ""
+
+        parts = []
+        with open(os.path.join(self._doc_dir(storage_id), BLOB_FILENAME), "rb") as blob:
+            for chunk in offsets["chunks"]:
+                if chunk["end"] <= start or chunk["start"] >= end:
+                    continue
+                blob.seek(chunk["offset"])
+                piece = zlib.decompress(blob.read(chunk["length"])).decode("utf-8")
+                parts.append(piece[max(start - chunk["start"], 0):end - chunk["start"]])
+
+        return "".join(parts)
+
+    def delete(self, storage_id: str):
+        """저장된 텍스트 삭제"""
+        shutil.rmtree(self._doc_dir(storage_id), ignore_errors=True)
+
+
+# 싱글톤 인스턴스
+text_store = TextStore()
@@ -0,0 +1,173 @@
+"""업로드 문서 매니페스트 (목록 조회용 경량 메타데이터 인덱스)"""
+import bisect
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+# 데이터 디렉토리 (app/routers/qa.py와 동일한 위치)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+JSON_DIR = os.path.join(DATA_DIR, "json")
+MANIFEST_PATH = os.path.join(DATA_DIR, "uploads_manifest.json")
+
+# 페이지 커서의 타임스탬프와 storage_id 구분자
+CURSOR_SEPARATOR = "|"
+
+
+class UploadManifest:
+    """
+    업로드 메타데이터만 보관하는 로컬 인덱스 파일
+
+    - full_text 없이 목록 조회에 필요한 필드만 저장
+    - 메모리에 (timestamp, storage_id) 정렬 키를 유지하여 페이지 조회는 O(page size)
+    - 업로드 시 upsert로 갱신, 파일이 없으면 data/json에서 1회 재구성
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH, json_dir: str = JSON_DIR):
+        self.path = path
+        self.json_dir = json_dir
+        self._entries: Optional[Dict[str, dict]] = None
+        self._order: List[Tuple[str, str]] = []  # (timestamp, storage_id) 오름차순
+
+    # ----------------------------
+    # 로드 / 저장
+    # ----------------------------
+    def _ensure_loaded(self):
+        if self._entries is not None:
+            return
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f).get("entries", {})
+            except Exception as e:
+                print(f"[WARNING] 매니페스트 로드 실패, 재구성합니다: {e}")
+                self._entries = None
+
+        if self._entries is None:
+            self._entries = self._rebuild_from_json_dir()
+            self._save()
+
+        self._order = sorted(
+            (entry.get("timestamp") or "", storage_id)
+            for storage_id, entry in self._entries.items()
+        )
+
+    def _rebuild_from_json_dir(self) -> Dict[str, dict]:
+        """기존 JSON 파일들로부터 매니페스트 재구성 (최초 1회 마이그레이션)"""
+        entries: Dict[str, dict] = {}
+        if not os.path.isdir(self.json_dir):
+            return entries
+
+        for filename in os.listdir(self.json_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.json_dir, filename), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                entry = build_manifest_entry(data, filename)
+                entries[entry["storage_id"]] = entry
+            except Exception as e:
+                print(f"[WARNING] 매니페스트 재구성 중 파일 건너뜀 ({filename}): {e}")
+
+        print(f"[INFO] 업로드 매니페스트 재구성 완료: {len(entries)}건")
+        return entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self._entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # ----------------------------
+    # 공개 API
+    # ----------------------------
+    def upsert(self, entry: dict):
+        """업로드 메타데이터 추가/갱신"""
+        self._ensure_loaded()
+        storage_id = entry["storage_id"]
+
+        previous = self._entries.get(storage_id)
+        if previous is not None:
+            old_key = (previous.get("timestamp") or "", storage_id)
+            idx = bisect.bisect_left(self._order, old_key)
+            if idx < len(self._order) and self._order[idx] == old_key:
+                self._order.pop(idx)
+
+        self._entries[storage_id] = entry
+        bisect.insort(self._order, (entry.get("timestamp") or "", storage_id))
+        self._save()
+
+    def remove(self, storage_id: str):
+        """업로드 메타데이터 삭제"""
+        self._ensure_loaded()
+        entry = self._entries.pop(storage_id, None)
+        if entry is None:
+            return
+
+        key = (entry.get("timestamp") or "", storage_id)
+        idx = bisect.bisect_left(self._order, key)
+        if idx < len(self._order) and self._order[idx] == key:
+            self._order.pop(idx)
+        self._save()
+
+    def get(self, storage_id: str) -> Optional[dict]:
+        """storage_id로 메타데이터 조회"""
+        self._ensure_loaded()
+        return self._entries.get(storage_id)
+
+    def list_page(self, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        최신순 페이지 조회 ((타임스탬프, storage_id) 커서 기반)
+
+        Args:
+            limit: 페이지 크기
+            cursor: 이전 페이지의 next_cursor ("timestamp|storage_id", 이 항목보다 이전 항목만 반환)
+                    storage_id 없이 타임스탬프만 주면 그 시각보다 이전 항목만 반환
+
+        Returns:
+            (항목 리스트, 다음 페이지 커서 또는 None)
+        """
+        self._ensure_loaded()
+
+        # cursor 정렬 키보다 작은 항목의 끝 위치 (cursor 없으면 전체)
+        # 타임스탬프가 같은 항목이 페이지 경계에 걸려도 storage_id로 구분하므로 건너뛰지 않음
+        end = bisect.bisect_left(self._order, parse_cursor(cursor)) if cursor else len(self._order)
+        start = max(0, end - limit)
+
+        page = self._order[start:end]
+        items = [self._entries[storage_id] for _, storage_id in reversed(page)]
+        next_cursor = format_cursor(*page[0]) if page and start > 0 else None
+        return items, next_cursor
+
+
+def format_cursor(timestamp: str, storage_id: str) -> str:
+    """페이지 커서 문자열 생성"""
+    return f"{timestamp}{CURSOR_SEPARATOR}{storage_id}"
+
+
+def parse_cursor(cursor: str) -> Tuple[str, str]:
+    """페이지 커서를 정렬 키로 변환 (이전 형식인 타임스탬프만 있는 커서도 허용)"""
+    timestamp, _, storage_id = cursor.partition(CURSOR_SEPARATOR)
+    return timestamp, storage_id
+
+
+def build_manifest_entry(data: dict, json_filename: Optional[str] = None) -> dict:
+    """업로드 JSON 데이터에서 매니페스트 항목(메타데이터만) 생성"""
+    storage_id = data.get("storage_id") or (json_filename or "").replace(".json", "")
+    files = data.get("files", [])
+
+    return {
+        "storage_id": storage_id,
+        "filename": json_filename or f"{storage_id}.json",
+        "timestamp": data.get("timestamp"),
+        "question": data.get("question"),
+        "file_count": len(files),
+        "original_filenames": [f.get("filename", "") for f in files],
+        "total_text_length": data.get("total_text_length", 0),
+    }
+
+
+# 싱글톤 인스턴스
+upload_manifest = UploadManifest()
@@ -0,0 +1,61 @@
+"""LLM 호출 토큰 사용량 및 비용 집계 (엔드포인트/모델별)"""
+from collections import defaultdict
+from typing import Dict, Tuple
+
+# 모델별 1K 토큰당 가격 (USD, 입력/출력) - 목록에 없는 모델은 비용 0으로 집계
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return prompt_tokens / 1000 * prompt_price + completion_tokens / 1000 * completion_price
+
+
+class UsageMeter:
+    """엔드포인트별 호출 수, 입력/출력 토큰, 추정 비용"""
+
+    def __init__(self):
+        self._usage: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "estimated_calls": 0}
+        )
+
+    def record(self, endpoint: str, model: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+        """
+        호출 1건 기록
+
+        Args:
+            estimated: 응답에 usage가 없어(스트리밍 등) 추정치로 기록한 경우 True
+        """
+        usage = self._usage[(endpoint or "unknown", model)]
+        usage["calls"] += 1
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+        usage["cost_usd"] += estimate_cost(model, prompt_tokens, completion_tokens)
+        if estimated:
+            usage["estimated_calls"] += 1
+
+    def stats(self) -> dict:
+        endpoints: Dict[str, dict] = {}
+        total_cost = 0.0
+        total_tokens = 0
+        for (endpoint, model), usage in sorted(self._usage.items()):
+            entry = endpoints.setdefault(endpoint, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                                    "cost_usd": 0.0, "models": {}})
+            entry["calls"] += usage["calls"]
+            entry["prompt_tokens"] += usage["prompt_tokens"]
+            entry["completion_tokens"] += usage["completion_tokens"]
+            entry["cost_usd"] = round(entry["cost_usd"] + usage["cost_usd"], 6)
+            entry["models"][model] = {**usage, "cost_usd": round(usage["cost_usd"], 6)}
+            total_cost += usage["cost_usd"]
+            total_tokens += usage["prompt_tokens"] + usage["completion_tokens"]
+        return {"total_tokens": total_tokens, "total_cost_usd": round(total_cost, 6), "endpoints": endpoints}
+
+
+# 싱글톤 인스턴스
+usage_meter = UsageMeter()
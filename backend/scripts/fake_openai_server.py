@@ -0,0 +1,343 @@
+"""
+부하/지연 테스트용 OpenAI 호환 가짜 서버
+
+실제 API 비용 없이 /problems, /qa/chat, /recommend, /quiz/retry의 실제 비동기 경로(게이트웨이,
+예산, 서킷 브레이커, 스트리밍)를 측정하기 위한 서버입니다.
+
+사용법:
+    python scripts/fake_openai_server.py --port 8100 --latency lognormal --latency-ms 800 --error-rate 0.02
+
+    # 백엔드는 DEMO=false, OPENAI_BASE_URL=http://127.0.0.1:8100/v1 로 실행
+
+지원 엔드포인트:
+    POST /v1/chat/completions  (stream=true 지원, max_tokens를 넘으면 잘라서 finish_reason="length")
+    POST /v1/embeddings
+    GET/POST /_fake/config     실행 중 설정 조회/변경 (일부 필드만 보내도 됨)
+    GET  /_fake/stats          요청/오류 통계
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from app.services.demo_service import load_sample_problems
+
+
+class FakeConfig(BaseModel):
+    latency: str = "lognormal"  # fixed | uniform | normal | lognormal | exponential
+    latency_ms: float = 800  # 첫 응답까지 지연 (fixed/normal/exponential은 평균, lognormal은 중앙값)
+    latency_jitter: float = 0.5  # uniform: ±비율, normal: 표준편차 비율, lognormal: sigma
+    token_ms: float = 15  # 스트리밍 토큰 간 간격
+    chars_per_token: float = 2.0  # 토큰 수 추정 (한글 기준)
+    error_rate: float = 0.0  # 500 응답 비율
+    rate_limit_rate: float = 0.0  # 429 응답 비율
+    retry_after_sec: int = 1  # 429 응답의 Retry-After
+    answer_chars: int = 600  # Q&A 답변 길이
+    seed: Optional[int] = None
+
+
+class FakeConfigUpdate(BaseModel):
+    latency: Optional[str] = None
+    latency_ms: Optional[float] = None
+    latency_jitter: Optional[float] = None
+    token_ms: Optional[float] = None
+    chars_per_token: Optional[float] = None
+    error_rate: Optional[float] = None
+    rate_limit_rate: Optional[float] = None
+    retry_after_sec: Optional[int] = None
+    answer_chars: Optional[int] = None
+
+
+config = FakeConfig()
+rng = random.Random()
+stats = {"requests": 0, "streams": 0, "errors_injected": 0, "rate_limited": 0, "embeddings": 0, "in_flight": 0}
+
+app = FastAPI(title="Fake OpenAI")
+
+
+# ============================================
+# 지연 / 오류 주입
+# ============================================
+
+def sample_latency() -> float:
+    """설정된 분포에서 첫 응답 지연 시간(초) 추출"""
+    base = config.latency_ms / 1000
+    jitter = config.latency_jitter
+    if config.latency == "uniform":
+        value = rng.uniform(base * (1 - jitter), base * (1 + jitter))
+    elif config.latency == "normal":
+        value = rng.gauss(base, base * jitter)
+    elif config.latency == "lognormal":
+        value = rng.lognormvariate(0, jitter) * base
+    elif config.latency == "exponential":
+        value = rng.expovariate(1 / base) if base > 0 else 0
+    else:
+        value = base
+    return max(0.0, value)
+
+
+def injected_error() -> Optional[JSONResponse]:
+    roll = rng.random()
+    if roll < config.rate_limit_rate:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"retry-after": str(config.retry_after_sec)},
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        stats["errors_injected"] += 1
+        return JSONResponse(
+            {"error": {"message": "The server had an error (fake)", "type": "server_error", "code": None}},
+            status_code=500,
+        )
+    return None
+
+
+def count_tokens(text: str) -> int:
+    return max(1, int(len(text) / config.chars_per_token))
+
+
+# ============================================
+# 프롬프트별 응답 내용
+# ============================================
+
+_sequence = 0
+
+
+def _next_sequence() -> int:
+    global _sequence
+    _sequence += 1
+    return _sequence
+
+
+def fake_problem_items(topic: str, level: str, count: int, style: str) -> List[dict]:
+    """샘플 문제를 틀로 ProblemItem 형식 문항 생성 (문제 은행 중복 제거에 걸리지 않도록 일련번호 부여)"""
+    samples = load_sample_problems().get("items", [])
+    matching = [s for s in samples if s.get("topic") == topic] or samples
+    items = []
+    for i in range(count):
+        sample = matching[i % len(matching)]
+        question = f"{sample['question'][:170]} (모의 #{_next_sequence()})"
+        item = {
+            "question": question,
+            "options": sample.get("options"),
+            "answer": sample["answer"],
+            "explanation": sample["explanation"],
+            "topic": topic,
+            "level": level,
+        }
+        if style == "free":
+            item["options"] = None
+            item["answer"] = sample["explanation"][:60]
+        elif not item["options"] or len(item["options"]) != 4:
+            item["options"] = ["A) 보기1", "B) 보기2", "C) 보기3", "D) 보기4"]
+            item["answer"] = "A"
+        items.append(item)
+    return items
+
+
+def build_content(messages: List[dict]) -> str:
+    """프롬프트 내용으로 기능을 구분해 그럴듯한 응답 생성"""
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+
+    # 문제 생성 (build_problem_prompt)
+    m = re.search(r"(\d+)개 (객관식|서술형) 문제", prompt)
+    if m:
+        topic = re.search(r'"topic": "(\w+)"', prompt)
+        level = re.search(r'"level": "(\w+)"', prompt)
+        items = fake_problem_items(
+            topic.group(1) if topic else "macro",
+            level.group(1) if level else "basic",
+            int(m.group(1)),
+            "free" if m.group(2) == "서술형" else "mcq",
+        )
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    # 재시도 문제 생성 (build_retry_problem_prompt)
+    m = re.search(r"틀린 문제들을 바탕으로 (\d+)개 문제", prompt)
+    if m:
+        return json.dumps({"items": fake_problem_items("macro", "basic", int(m.group(1)), "mcq")}, ensure_ascii=False)
+
+    # 자료 추천
+    m = re.search(r"리소스를 (\d+)개 추천", prompt)
+    if m:
+        items = [
+            {
+                "title": f"모의 추천 자료 {i + 1}",
+                "summary": "부하 테스트용 가짜 추천 자료입니다. 실제 자료가 아닙니다.",
+                "url": f"https://example.com/resource/{i + 1}",
+                "tags": ["무료", "데이터"],
+            }
+            for i in range(int(m.group(1)))
+        ]
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    # 다이제스트 핵심 용어/목차
+    if "핵심 용어:" in prompt and "목차:" in prompt:
+        return "핵심 용어: 국내총생산, 인플레이션, 기준금리\n목차:\n- 개요\n- 주요 지표\n- 정책 시사점"
+
+    # Q&A / 요약
+    sentence = "이 답변은 부하 테스트용 가짜 응답입니다. 실제 경제 정보를 담고 있지 않습니다. "
+    body = (sentence * (config.answer_chars // len(sentence) + 1))[:config.answer_chars]
+    return f"## 모의 답변\n\n{body}"
+
+
+# ============================================
+# 엔드포인트
+# ============================================
+
+def _completion_id() -> str:
+    return f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: dict):
+    stats["requests"] += 1
+    stats["in_flight"] += 1
+    try:
+        await asyncio.sleep(sample_latency())
+        error = injected_error()
+        if error is not None:
+            return error
+
+        model = body.get("model", "gpt-fake")
+        messages = body.get("messages", [])
+        content = build_content(messages)
+        finish_reason = "stop"
+        max_tokens = body.get("max_tokens")
+        if max_tokens and count_tokens(content) > max_tokens:
+            content = content[:int(max_tokens * config.chars_per_token)]
+            finish_reason = "length"
+        prompt_tokens = sum(count_tokens(str(m.get("content") or "")) for m in messages)
+        completion_tokens = count_tokens(content)
+
+        if body.get("stream"):
+            stats["streams"] += 1
+            return StreamingResponse(
+                stream_chunks(_completion_id(), model, content, finish_reason),
+                media_type="text/event-stream",
+            )
+
+        return {
+            "id": _completion_id(),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+    finally:
+        stats["in_flight"] -= 1
+
+
+async def stream_chunks(completion_id: str, model: str, content: str, finish_reason: str):
+    """토큰 크기 조각을 token_ms 간격으로 전송 (OpenAI SSE 형식)"""
+    def chunk(delta: dict, reason: Optional[str] = None) -> str:
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": reason}],
+        }
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    step = max(1, int(config.chars_per_token))
+    for start in range(0, len(content), step):
+        await asyncio.sleep(config.token_ms / 1000)
+        yield chunk({"content": content[start:start + step]})
+    yield chunk({}, finish_reason)
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/embeddings")
+async def embeddings(body: dict):
+    """입력 텍스트 해시로 만든 결정적 벡터 (같은 입력이면 같은 벡터)"""
+    stats["embeddings"] += 1
+    await asyncio.sleep(sample_latency() / 4)
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dimensions = body.get("dimensions") or 1536
+    data = []
+    for i, text in enumerate(inputs):
+        seeded = random.Random(hashlib.sha256(str(text).encode("utf-8")).hexdigest())
+        data.append({"object": "embedding", "index": i,
+                     "embedding": [seeded.uniform(-1, 1) for _ in range(dimensions)]})
+    tokens = sum(count_tokens(str(text)) for text in inputs)
+    return {"object": "list", "data": data, "model": body.get("model", "text-embedding-fake"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+
+@app.get("/_fake/config")
+async def get_config():
+    return config.dict()
+
+
+@app.post("/_fake/config")
+async def update_config(update: FakeConfigUpdate):
+    global config
+    config = config.copy(update={k: v for k, v in update.dict().items() if v is not None})
+    return config.dict()
+
+
+@app.get("/_fake/stats")
+async def get_stats():
+    return stats
+
+
+def main():
+    global config
+    parser = argparse.ArgumentParser(description="OpenAI 호환 가짜 서버 (부하/지연 테스트용)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default=config.latency,
+                        choices=["fixed", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--latency-jitter", type=float, default=config.latency_jitter)
+    parser.add_argument("--token-ms", type=float, default=config.token_ms)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate)
+    parser.add_argument("--answer-chars", type=int, default=config.answer_chars)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_jitter=args.latency_jitter,
+        token_ms=args.token_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        answer_chars=args.answer_chars,
+        seed=args.seed,
+    )
+    if args.seed is not None:
+        rng.seed(args.seed)
+
+    import uvicorn
+    print(f"🧪 Fake OpenAI 서버: http://{args.host}:{args.port}/v1 ({config.latency} {config.latency_ms}ms)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
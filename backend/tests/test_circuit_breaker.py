@@ -0,0 +1,127 @@
+"""LLM 서킷 브레이커 상태 전환 테스트"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import circuit_breaker as circuit_breaker_module
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(settings, "CIRCUIT_ENABLED", True)
+    monkeypatch.setattr(settings, "CIRCUIT_WINDOW_SEC", 60)
+    monkeypatch.setattr(settings, "CIRCUIT_MIN_CALLS", 4)
+    monkeypatch.setattr(settings, "CIRCUIT_ERROR_RATE", 0.5)
+    monkeypatch.setattr(settings, "CIRCUIT_SLOW_CALL_SEC", 10)
+    monkeypatch.setattr(settings, "CIRCUIT_SLOW_RATE", 0.5)
+    monkeypatch.setattr(settings, "CIRCUIT_OPEN_SEC", 30)
+    return fake
+
+
+def _succeed(breaker, latency=0.1):
+    with breaker.guard() as outcome:
+        outcome.latency = latency
+
+
+def _fail(breaker):
+    with pytest.raises(asyncio.TimeoutError):
+        with breaker.guard():
+            raise asyncio.TimeoutError()
+
+
+def test_closed_open_half_open_closed(clock):
+    """오류율 초과로 열리고, 대기 후 탐색 호출이 성공하면 다시 닫힘"""
+    breaker = CircuitBreaker()
+
+    _fail(breaker)
+    _fail(breaker)
+    _fail(breaker)
+    assert breaker.state == CLOSED  # 최소 호출 수 전에는 판단하지 않음
+    clock.now += 61  # 집계 구간 밖으로
+
+    _fail(breaker)
+    for _ in range(3):
+        _succeed(breaker)
+    _fail(breaker)
+    assert breaker.state == CLOSED  # 5건 중 2건 실패 (40%)
+    _fail(breaker)
+    assert breaker.state == OPEN  # 6건 중 3건 실패 (50%)
+    assert breaker.trips == 1
+
+    # 열린 동안은 호출하지 않고 즉시 거절
+    with pytest.raises(CircuitOpenError):
+        _succeed(breaker)
+    assert not breaker.allows_calls()
+
+    # 대기 시간이 지나면 탐색 호출 1건만 허용
+    clock.now += 30
+    assert breaker.allows_calls()
+    with breaker.guard() as outcome:
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            _succeed(breaker)
+        outcome.latency = 0.1
+    assert breaker.state == CLOSED
+    assert breaker.short_circuited == 2
+
+
+def test_failed_probe_reopens(clock):
+    """탐색 호출이 실패하거나 느리면 다시 열림"""
+    breaker = CircuitBreaker()
+    for _ in range(4):
+        _fail(breaker)
+    assert breaker.state == OPEN
+
+    clock.now += 30
+    _fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+    clock.now += 30
+    _succeed(breaker, latency=20)
+    assert breaker.state == OPEN
+    assert breaker.trips == 3
+
+
+def test_slow_calls_trip_circuit(clock):
+    """오류가 없어도 느린 호출 비율이 기준을 넘으면 열림"""
+    breaker = CircuitBreaker()
+    for latency in (0.1, 20, 0.1, 20):
+        _succeed(breaker, latency=latency)
+    assert breaker.state == OPEN
+
+
+def test_old_failures_leave_window(clock):
+    """집계 구간이 지난 실패는 판단에서 제외"""
+    breaker = CircuitBreaker()
+    _fail(breaker)
+    _fail(breaker)
+    _fail(breaker)
+    clock.now += 61
+    _succeed(breaker)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 1
+
+
+def test_request_errors_are_not_counted(clock):
+    """제공자 장애가 아닌 예외(잘못된 요청 등)는 집계하지 않음"""
+    breaker = CircuitBreaker()
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            with breaker.guard():
+                raise ValueError("bad request")
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
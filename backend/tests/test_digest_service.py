@@ -0,0 +1,50 @@
+"""문서 다이제스트 생성 테스트 (LLM 호출 없이 가짜 응답 사용)"""
+import asyncio
+
+import pytest
+
+from app.services import digest_service as digest_module
+from app.services.digest_service import build_document_digest
+
+
+def _no_database():
+    raise RuntimeError("MongoDB 미연결")
+
+
+@pytest.fixture
+def llm_calls(tmp_path, monkeypatch):
+    """summarize_text / generate_chat_response 대체 (호출 기록)"""
+    calls = []
+
+    async def summarize_text(question, text):
+        calls.append("summary")
+        return {"answer_md": f"요약 {len(calls)}", "citations": []}
+
+    async def generate_chat_response(question, context, *args, **kwargs):
+        calls.append("outline")
+        return "핵심 용어: 금리, 환율\n목차:\n- 금리\n- 환율"
+
+    monkeypatch.setattr(digest_module, "DIGEST_DIR", str(tmp_path))
+    monkeypatch.setattr(digest_module, "get_database", _no_database)
+    monkeypatch.setattr(digest_module, "summarize_text", summarize_text)
+    monkeypatch.setattr(digest_module, "generate_chat_response", generate_chat_response)
+    return calls
+
+
+def test_digest_reused_for_same_content(llm_calls):
+    """같은 내용이 다시 올라오면 LLM 호출 없이 저장된 다이제스트 반환"""
+    first = asyncio.run(build_document_digest("doc-a", "금리와 환율의 관계", "hash-1"))
+    again = asyncio.run(build_document_digest("doc-a", "금리와 환율의 관계", "hash-1"))
+
+    assert llm_calls == ["summary", "outline"]
+    assert again == first
+    assert first["key_terms"] == ["금리", "환율"]
+
+
+def test_digest_regenerated_when_content_changes(llm_calls):
+    asyncio.run(build_document_digest("doc-a", "금리와 환율의 관계", "hash-1"))
+    digest = asyncio.run(build_document_digest("doc-a", "무역수지와 경상수지", "hash-2"))
+
+    assert llm_calls == ["summary", "outline", "summary", "outline"]
+    assert digest["content_hash"] == "hash-2"
+    assert digest["summary_md"] == "요약 3"
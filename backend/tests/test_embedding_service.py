@@ -0,0 +1,47 @@
+"""임베딩 모델 로드 테스트"""
+import asyncio
+
+import pytest
+
+from app.services import embedding_service
+
+
+def test_load_failure_is_remembered(monkeypatch):
+    """모델 로드가 실패하면 재시도 대기 시간 동안 다시 로드하지 않고 즉시 실패"""
+    attempts = []
+
+    class BrokenService:
+        def __init__(self):
+            attempts.append(1)
+            raise OSError("model files not found")
+
+    monkeypatch.setattr(embedding_service, "EmbeddingService", BrokenService)
+    monkeypatch.setattr(embedding_service, "_embedding_service", None)
+    monkeypatch.setattr(embedding_service, "_load_error", None)
+
+    with pytest.raises(embedding_service.EmbeddingModelUnavailable):
+        embedding_service.get_embedding_service()
+    with pytest.raises(embedding_service.EmbeddingModelUnavailable):
+        asyncio.run(embedding_service.aget_embedding_service())
+    assert embedding_service.warm_up() is False
+    assert len(attempts) == 1
+
+
+def test_async_getter_loads_in_thread(monkeypatch):
+    """비동기 조회는 모델을 한 번만 로드해 공유"""
+    class FakeService:
+        pass
+
+    monkeypatch.setattr(embedding_service, "EmbeddingService", FakeService)
+    monkeypatch.setattr(embedding_service, "_embedding_service", None)
+    monkeypatch.setattr(embedding_service, "_load_error", None)
+
+    async def load_twice():
+        return await asyncio.gather(
+            embedding_service.aget_embedding_service(),
+            embedding_service.aget_embedding_service(),
+        )
+
+    first, second = asyncio.run(load_twice())
+    assert isinstance(first, FakeService)
+    assert first is second
@@ -0,0 +1,32 @@
+"""전문 검색 인덱스 테스트"""
+from app.services.fulltext_index import FullTextIndex, tokenize
+
+
+def test_tokenize_korean_bigrams_with_positions():
+    """한글은 bigram으로, 위치는 원문 오프셋으로 토큰화"""
+    assert tokenize("기준금리 GDP") == [("기준", 0), ("준금", 1), ("금리", 2), ("gdp", 5)]
+
+
+def test_search_ranks_phrase_match_first(tmp_path):
+    """구문이 그대로 포함된 문서가 먼저 검색되어야 함"""
+    index = FullTextIndex(index_dir=str(tmp_path))
+    index.add_document("rate", "한국은행은 기준금리를 3.5%로 동결했다. 기준금리 결정은 물가를 고려한다.")
+    index.add_document("mixed", "금리 기준 변경과 관련된 일반적인 설명")
+    index.add_document("trade", "수출입 동향과 무역수지 분석")
+
+    results = index.search("기준금리")
+
+    assert [r["storage_id"] for r in results][:2] == ["rate", "mixed"]
+    assert results[0]["match_count"] == 2
+    assert results[0]["match_position"] == 6
+
+
+def test_index_persists_and_removes(tmp_path):
+    """디스크에 저장된 인덱스를 다시 로드하고, 삭제하면 검색되지 않아야 함"""
+    FullTextIndex(index_dir=str(tmp_path)).add_document("doc", "인플레이션 압력이 커졌다")
+
+    reloaded = FullTextIndex(index_dir=str(tmp_path))
+    assert [r["storage_id"] for r in reloaded.search("인플레이션")] == ["doc"]
+
+    reloaded.remove_document("doc")
+    assert reloaded.search("인플레이션") == []
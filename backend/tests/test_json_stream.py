@@ -0,0 +1,56 @@
+"""스트리밍 JSON 항목 파서 테스트"""
+import json
+
+from app.services.json_stream import ItemsStreamParser, salvage_items
+
+
+def _payload():
+    items = [
+        {"question": "기준금리 {인상}의 효과는?", "options": ["a", "b]", "c", "d"], "answer": "a"},
+        {"question": "따옴표 \"포함\" 문항", "options": None, "answer": "b"},
+    ]
+    return items, "```json\n" + json.dumps({"items": items}, ensure_ascii=False) + "\n```"
+
+
+def test_items_parser_one_char_at_a_time():
+    """한 글자씩 들어와도 문자열 안의 괄호/따옴표에 속지 않고 항목을 순서대로 추출"""
+    items, text = _payload()
+    parser = ItemsStreamParser()
+
+    parsed = []
+    for ch in text:
+        parsed.extend(parser.feed(ch))
+
+    assert parsed == items
+    assert parser.done
+
+
+def test_items_parser_emits_items_before_stream_ends():
+    """첫 항목이 닫히는 시점에 바로 반환되고, 미완성 항목은 보류"""
+    items, text = _payload()
+    first_end = text.index('"answer": "a"}') + len('"answer": "a"}')
+    parser = ItemsStreamParser()
+
+    assert parser.feed(text[:first_end]) == [items[0]]
+    assert parser.feed(text[first_end:first_end + 10]) == []
+    assert parser.feed(text[first_end + 10:]) == [items[1]]
+
+
+def test_salvage_items_from_truncated_response():
+    """max_tokens로 잘린 응답에서 완성된 항목만 복구"""
+    items, text = _payload()
+    text = text.replace("```", "")
+    cut = text.index('"따옴표') + 5
+
+    salvaged, closed = salvage_items(text[:cut])
+    assert salvaged == items[:1]
+    assert not closed
+
+
+def test_salvage_items_repairs_minor_errors():
+    """문자열 안 줄바꿈, trailing comma는 보정하고 배열만 온 응답도 처리"""
+    text = '[{"question": "첫 줄\n둘째 줄", "answer": "a",}, {"question": "b", "answer": "b"},]'
+
+    salvaged, closed = salvage_items(text)
+    assert salvaged == [{"question": "첫 줄\n둘째 줄", "answer": "a"}, {"question": "b", "answer": "b"}]
+    assert closed
@@ -0,0 +1,117 @@
+"""LLM 게이트웨이 동시 실행 제한 테스트"""
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services import llm_gateway as llm_gateway_module
+from app.services.llm_gateway import LLMGateway, parse_model_limits
+from app.services.rate_limiter import UpstreamBudget
+
+
+class FakeCompletions:
+    """동시에 실행 중인 호출 수를 모델별/전체로 기록하는 Chat Completions 대체"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.in_flight = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.total = 0
+        self.peak_total = 0
+
+    async def create(self, model, messages, **kwargs):
+        self.in_flight[model] += 1
+        self.total += 1
+        self.peak[model] = max(self.peak[model], self.in_flight[model])
+        self.peak_total = max(self.peak_total, self.total)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[model] -= 1
+            self.total -= 1
+        message = SimpleNamespace(content=f"{model}: {messages[-1]['content']}")
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class FakeUsageMeter:
+    def record(self, *args, **kwargs):
+        pass
+
+
+def _gateway(monkeypatch, max_concurrency, model_limits):
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(LLMGateway, "client", property(lambda self: client))
+    monkeypatch.setattr(llm_gateway_module, "upstream_budget", UpstreamBudget(rpm=10000, tpm=10_000_000))
+    monkeypatch.setattr(llm_gateway_module, "usage_meter", FakeUsageMeter())
+    monkeypatch.setattr(settings, "LLM_ALLOWED_MODELS", "fast,m")
+    return LLMGateway(max_concurrency=max_concurrency, model_limits=model_limits), completions
+
+
+def _run_calls(gateway, models):
+    async def main():
+        return await asyncio.gather(*(
+            gateway.chat([{"role": "user", "content": str(i)}], model=model, coalesce=False)
+            for i, model in enumerate(models)
+        ))
+
+    return asyncio.run(main())
+
+
+def test_parse_model_limits():
+    assert parse_model_limits("gpt-4o=2, gpt-3.5-turbo = 8,bad,x=oops") == {"gpt-4o": 2, "gpt-3.5-turbo": 8}
+
+
+def test_model_limit_caps_concurrent_calls(monkeypatch):
+    """모델별 한도가 전역 한도보다 작으면 그 모델의 동시 호출은 모델 한도까지"""
+    gateway, completions = _gateway(monkeypatch, max_concurrency=8, model_limits={"slow": 2})
+
+    results = _run_calls(gateway, ["slow"] * 6 + ["fast"] * 6)
+
+    assert len(results) == 12
+    assert completions.peak["slow"] == 2
+    assert completions.peak["fast"] == 6
+
+    stats = gateway.stats()["models"]
+    assert stats["slow"]["limit"] == 2
+    assert stats["slow"]["calls"] == 6
+    assert stats["slow"]["in_flight"] == 0 and stats["slow"]["waiting"] == 0
+
+
+def test_global_limit_caps_calls_across_models(monkeypatch):
+    """모델이 달라도 전체 동시 호출 수는 전역 한도를 넘지 않음"""
+    gateway, completions = _gateway(monkeypatch, max_concurrency=3, model_limits={"a": 3, "b": 3})
+
+    _run_calls(gateway, ["a", "b"] * 5)
+
+    assert completions.peak_total == 3
+    assert gateway.stats()["models"]["a"]["max_wait_ms"] > 0
+
+
+def test_identical_requests_share_one_call(monkeypatch):
+    """같은 요청이 동시에 들어오면 한 번만 호출"""
+    monkeypatch.setattr(settings, "LLM_COALESCE", True)
+    gateway, completions = _gateway(monkeypatch, max_concurrency=4, model_limits={})
+
+    async def main():
+        messages = [{"role": "user", "content": "same"}]
+        return await asyncio.gather(*(gateway.chat(messages, model="m", endpoint="test") for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert results == ["m: same"] * 4
+    assert gateway.stats()["models"]["m"]["calls"] == 1
+
+
+def test_unknown_models_use_default_model(monkeypatch):
+    """허용 목록에 없는 모델 이름은 기본 모델로 호출하여 세마포어/통계가 늘어나지 않음"""
+    monkeypatch.setattr(settings, "OPENAI_MODEL", "default-model")
+    gateway, completions = _gateway(monkeypatch, max_concurrency=4, model_limits={"slow": 1})
+
+    results = _run_calls(gateway, ["slow", "fast", None] + [f"made-up-{i}" for i in range(5)])
+
+    assert results[0] == "slow: 0" and results[1] == "fast: 1"
+    assert all(result.startswith("default-model:") for result in results[2:])
+    assert set(gateway.stats()["models"]) == {"slow", "fast", "default-model"}
+    assert set(gateway._model_semaphores) == {"slow", "fast", "default-model"}
+    assert gateway.resolve_model("gpt-4o-mini") == "gpt-4o-mini"
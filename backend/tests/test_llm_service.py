@@ -0,0 +1,209 @@
+"""문제 생성 서비스 테스트 (LLM 호출 없이 가짜 응답 사용)"""
+import asyncio
+import json
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_service
+
+
+def _item(n, options=True):
+    return {
+        "question": f"기준금리 인상이 물가에 미치는 영향은? ({n})",
+        "options": ["물가 하락", "물가 상승", "실업 감소", "환율 상승"] if options else None,
+        "answer": "물가 하락",
+        "explanation": "금리 인상은 총수요를 줄여 물가 상승 압력을 낮춥니다.",
+        "topic": "macro",
+        "level": "basic",
+    }
+
+
+class FakeLLM:
+    """
+    _chat_complete 대체
+    - 프롬프트의 COUNT=n만큼 번호가 이어지는 문항을 반환
+    - script[호출 순번]에 문항 번호 목록(또는 예외)을 주면 그대로 사용
+    """
+
+    def __init__(self, delay=0.01, script=None):
+        self.delay = delay
+        self.script = script or {}
+        self.prompts = []
+        self.next_id = 0
+
+    async def __call__(self, prompt, model=None, endpoint="problems", coalesce=True):
+        self.prompts.append(prompt)
+        call_no = len(self.prompts)
+        await asyncio.sleep(self.delay)
+
+        planned = self.script.get(call_no)
+        if isinstance(planned, Exception):
+            raise planned
+        if planned is None:
+            count = int(re.search(r"COUNT=(\d+)", prompt).group(1))
+            planned = list(range(self.next_id, self.next_id + count))
+            self.next_id += count
+        items = [_item(n) if isinstance(n, int) else n for n in planned]
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    def counts(self):
+        return [int(re.search(r"COUNT=(\d+)", prompt).group(1)) for prompt in self.prompts]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    monkeypatch.setattr(settings, "DEMO", False)
+    monkeypatch.setattr(settings, "LLM_COALESCE", True)
+    monkeypatch.setattr(settings, "PROBLEM_FANOUT_CHUNK_SIZE", 5)
+    monkeypatch.setattr(llm_service, "build_problem_prompt", lambda topic, level, count, style: f"COUNT={count}")
+    llm = FakeLLM()
+    monkeypatch.setattr(llm_service, "_chat_complete", llm)
+    return llm
+
+
+def _generate(count, coalesce=True):
+    return llm_service.generate_econ_problems_payload("macro", "basic", count, "mcq", coalesce=coalesce)
+
+
+def test_identical_split_requests_are_coalesced(fake_llm):
+    """분할되는 큰 요청도 같은 조건이 동시에 들어오면 하위 요청을 한 번만 실행"""
+    async def main():
+        return await asyncio.gather(*(_generate(10) for _ in range(4)))
+
+    results = asyncio.run(main())
+
+    assert fake_llm.counts() == [5, 5]
+    assert all(len(result["items"]) == 10 for result in results)
+    assert results[0]["items"] is not results[1]["items"]
+
+
+def test_coalesce_opt_out_runs_each_request(fake_llm):
+    async def main():
+        return await asyncio.gather(*(_generate(10, coalesce=False) for _ in range(2)))
+
+    asyncio.run(main())
+    assert fake_llm.counts() == [5, 5, 5, 5]
+
+
+def test_endpoint_opt_out_disables_coalescing(fake_llm, monkeypatch):
+    monkeypatch.setattr(llm_service.llm_gateway, "coalesce_opt_out", {"problems"})
+
+    async def main():
+        return await asyncio.gather(*(_generate(3) for _ in range(2)))
+
+    asyncio.run(main())
+    assert fake_llm.counts() == [3, 3]
+
+
+def test_split_sizes(fake_llm):
+    """PROBLEM_FANOUT_CHUNK_SIZE 단위로 나누고 마지막 하위 요청은 나머지 개수"""
+    result = asyncio.run(_generate(12))
+
+    assert fake_llm.counts() == [5, 5, 2]
+    assert len(result["items"]) == 12
+    assert len({item["question"] for item in result["items"]}) == 12
+
+
+def test_small_request_is_not_split(fake_llm):
+    result = asyncio.run(_generate(5))
+    assert fake_llm.counts() == [5]
+    assert len(result["items"]) == 5
+
+
+def test_duplicates_across_chunks_are_removed_and_topped_up(fake_llm):
+    """하위 요청끼리 겹친 질문은 하나만 남기고, 모자란 개수만 이미 나온 질문을 제외하도록 보충"""
+    fake_llm.script = {1: [0, 1, 2, 3, 4], 2: [3, 4, 5, 6, 7]}
+    fake_llm.next_id = 100
+
+    result = asyncio.run(_generate(10))
+
+    questions = [item["question"] for item in result["items"]]
+    assert len(questions) == 10 and len(set(questions)) == 10
+    assert fake_llm.counts() == [5, 5, 2]
+    # 보충 요청에는 이미 출제된 질문 목록이 들어감
+    assert "(7)" in fake_llm.prompts[2] and "겹치지 않는" in fake_llm.prompts[2]
+
+
+def test_invalid_items_are_topped_up(fake_llm):
+    """검증에 실패한 문항(mcq 보기 누락)은 버리고 부족분만 보충"""
+    fake_llm.script = {1: [0, 1, _item(2, options=False), 3, 4]}
+    fake_llm.next_id = 100
+
+    result = asyncio.run(_generate(5))
+
+    assert fake_llm.counts() == [5, 1]
+    assert len(result["items"]) == 5
+    assert all(item["options"] for item in result["items"])
+
+
+def test_failed_sub_request_is_covered_by_top_up(fake_llm):
+    """하위 요청 하나가 실패해도 나머지 결과를 쓰고 실패한 만큼 보충"""
+    fake_llm.script = {2: RuntimeError("upstream error")}
+
+    result = asyncio.run(_generate(10))
+
+    assert fake_llm.counts() == [5, 5, 5]
+    assert len(result["items"]) == 10
+
+
+def test_all_sub_requests_failing_raises(fake_llm):
+    fake_llm.script = {n: RuntimeError("upstream error") for n in range(1, 4)}
+
+    with pytest.raises(RuntimeError, match="upstream error"):
+        asyncio.run(_generate(10))
+
+
+def _fake_stream_chat(monkeypatch, items, closed=True):
+    """llm_gateway.stream_chat 대체 (items 배열 JSON을 작은 조각으로 나눠 전달, closed=False면 잘린 응답)"""
+    text = json.dumps({"items": items}, ensure_ascii=False)
+    if not closed:
+        text = text[:text.rindex("{")]
+
+    async def stream_chat(messages, **kwargs):
+        for i in range(0, len(text), 7):
+            yield text[i:i + 7]
+
+    monkeypatch.setattr(llm_service.llm_gateway, "stream_chat", stream_chat)
+
+
+def _stream(count):
+    async def main():
+        return [item async for item in llm_service.stream_econ_problems("macro", "basic", count, "mcq")]
+    return asyncio.run(main())
+
+
+def test_stream_without_shortfall_is_not_topped_up(fake_llm, monkeypatch):
+    _fake_stream_chat(monkeypatch, [_item(n) for n in range(3)])
+    assert len(_stream(3)) == 3
+    assert fake_llm.prompts == []
+
+
+def test_stream_rejected_items_are_topped_up(fake_llm, monkeypatch):
+    """배열이 정상적으로 닫혀도 검증에 실패한 문항 수만큼 보충"""
+    _fake_stream_chat(monkeypatch, [_item(0), _item(1, options=False), _item(2)])
+    fake_llm.next_id = 100
+
+    items = _stream(3)
+
+    assert fake_llm.counts() == [1]
+    assert len(items) == 4 and items[-1]["options"]
+    assert "(2)" in fake_llm.prompts[0] and "(1)" not in fake_llm.prompts[0]
+
+
+def test_stream_closed_short_is_topped_up(fake_llm, monkeypatch):
+    """요청보다 적은 문항으로 배열이 닫혀도 부족분 보충"""
+    _fake_stream_chat(monkeypatch, [_item(0), _item(1)])
+    fake_llm.next_id = 100
+    items = _stream(5)
+    assert fake_llm.counts() == [3]
+    assert len(items) == 5
+
+
+def test_truncated_stream_is_topped_up(fake_llm, monkeypatch):
+    _fake_stream_chat(monkeypatch, [_item(0), _item(1), _item(2)], closed=False)
+    fake_llm.next_id = 100
+    items = _stream(3)
+    assert fake_llm.counts() == [1]
+    assert len(items) == 3
@@ -0,0 +1,158 @@
+"""사전 생성 문제 은행 테스트"""
+import asyncio
+import json
+import re
+
+from app.core.config import settings
+from app.services import llm_service
+from app.services.problem_bank import ProblemBank
+
+KEY = ("macro", "basic", "mcq")
+
+
+def _item(n, topic="macro", level="basic", options=True):
+    return {
+        "question": f"기준금리 인상의 효과는 무엇인가요? ({n})",
+        "options": ["물가 하락", "물가 상승", "실업 감소", "환율 상승"] if options else None,
+        "answer": "물가 하락",
+        "explanation": "금리 인상은 총수요를 줄여 물가 상승 압력을 낮춥니다.",
+        "topic": topic,
+        "level": level,
+    }
+
+
+class FakeGateway:
+    """
+    llm_gateway.chat 대체 (실제 생성 경로의 분할/보충 호출을 그대로 거침)
+    - 프롬프트의 COUNT=n만큼 번호가 이어지는 문항을 반환
+    - invalid_first면 첫 호출의 첫 문항을 보기 없이 반환 (보충 호출 발생)
+    """
+
+    def __init__(self, invalid_first=False):
+        self.prompts = []
+        self.next_id = 0
+        self.invalid_first = invalid_first
+
+    async def chat(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        topic, level, count = re.search(r"TOPIC=(\w+) LEVEL=(\w+) COUNT=(\d+)", prompt).groups()
+        items = []
+        for _ in range(int(count)):
+            broken = self.invalid_first and len(self.prompts) == 1 and not items
+            items.append(_item(self.next_id, topic, level, options=not broken))
+            self.next_id += 1
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    def counts(self):
+        return [int(re.search(r"COUNT=(\d+)", prompt).group(1)) for prompt in self.prompts]
+
+    def topics(self):
+        return [re.search(r"TOPIC=(\w+) LEVEL=(\w+)", prompt).groups() for prompt in self.prompts]
+
+
+def _fake_gateway(monkeypatch, **kwargs):
+    gateway = FakeGateway(**kwargs)
+    monkeypatch.setattr(settings, "DEMO", False)
+    monkeypatch.setattr(settings, "PROBLEM_FANOUT_CHUNK_SIZE", 5)
+    monkeypatch.setattr(
+        llm_service, "build_problem_prompt",
+        lambda topic, level, count, style: f"TOPIC={topic} LEVEL={level} COUNT={count}",
+    )
+    monkeypatch.setattr(llm_service.llm_gateway, "chat", gateway.chat)
+    return gateway
+
+
+def _bank(tmp_path, monkeypatch, target=10, low_water=4, batch=5):
+    monkeypatch.setattr(settings, "PROBLEM_BANK_TARGET", target)
+    monkeypatch.setattr(settings, "PROBLEM_BANK_LOW_WATER", low_water)
+    monkeypatch.setattr(settings, "PROBLEM_BANK_LOW_WATER_OVERRIDES", "")
+    monkeypatch.setattr(settings, "PROBLEM_BANK_REFILL_BATCH", batch)
+    return ProblemBank(bank_dir=str(tmp_path))
+
+
+def test_add_rejects_invalid_and_duplicate_items(tmp_path, monkeypatch):
+    """버킷과 맞지 않거나 규칙 위반/중복인 문항은 재고에 넣지 않음"""
+    bank = _bank(tmp_path, monkeypatch)
+    raw = [
+        _item(1),
+        _item(1),                      # 중복 질문
+        _item(2, topic="finance"),     # 다른 주제
+        _item(3, options=False),       # 객관식인데 보기 없음
+        {"question": "짧음"},           # 스키마 오류
+    ]
+    assert bank.add(KEY, raw) == 1
+    stats = bank.stats()["buckets"]["macro/basic/mcq"]
+    assert stats["inventory"] == 1
+    assert stats["rejected"] == 3
+
+
+def test_take_samples_without_replacement(tmp_path, monkeypatch):
+    """재고가 충분하면 비복원 추출, 부족하면 None"""
+    bank = _bank(tmp_path, monkeypatch)
+    bank.add(KEY, [_item(i) for i in range(6)])
+
+    first = bank.take(*KEY, 4)
+    assert len(first) == 4
+    assert bank.take(*KEY, 4) is None
+
+    rest = bank.take(*KEY, 2)
+    questions = {item["question"] for item in first + rest}
+    assert len(questions) == 6
+
+    stats = bank.stats()["buckets"]["macro/basic/mcq"]
+    assert (stats["hits"], stats["misses"], stats["served"]) == (2, 1, 6)
+
+
+def test_buckets_persist_across_instances(tmp_path, monkeypatch):
+    """추가/제공 결과가 파일에 저장되어 새 인스턴스에서도 유지"""
+    bank = _bank(tmp_path, monkeypatch)
+    bank.add(KEY, [_item(i) for i in range(5)])
+    bank.take(*KEY, 2)
+
+    reloaded = _bank(tmp_path, monkeypatch)
+    assert reloaded.stats()["buckets"]["macro/basic/mcq"]["inventory"] == 3
+    assert reloaded.stats()["total_inventory"] == 3
+
+
+def test_refill_bucket_fills_to_target(tmp_path, monkeypatch):
+    """target까지 배치 단위로 보충"""
+    bank = _bank(tmp_path, monkeypatch, target=12, batch=5)
+    gateway = _fake_gateway(monkeypatch)
+
+    bank._ensure_loaded()
+    added, calls = asyncio.run(bank.refill_bucket(KEY))
+
+    assert (added, calls) == (12, 3)
+    assert gateway.counts() == [5, 5, 2]
+    assert bank.stats()["buckets"]["macro/basic/mcq"]["inventory"] == 12
+
+
+def test_refill_bucket_counts_top_up_calls(tmp_path, monkeypatch):
+    """생성 안에서 일어난 부족분 보충 호출도 LLM 호출 수에 포함하여 한도를 지킴"""
+    bank = _bank(tmp_path, monkeypatch, target=10, batch=5)
+    gateway = _fake_gateway(monkeypatch, invalid_first=True)
+
+    bank._ensure_loaded()
+    added, calls = asyncio.run(bank.refill_bucket(KEY, max_calls=2))
+
+    assert gateway.counts() == [5, 1]
+    assert (added, calls) == (5, 2)
+
+
+def test_refill_depleted_caps_calls_per_cycle(tmp_path, monkeypatch):
+    """빈 재고에서 시작해도 한 주기의 LLM 호출 수는 상한을 넘지 않고, 요청이 있었던 버킷부터 보충"""
+    bank = _bank(tmp_path, monkeypatch, target=10, batch=5)
+    monkeypatch.setattr(settings, "PROBLEM_BANK_MAX_CALLS_PER_CYCLE", 3)
+    gateway = _fake_gateway(monkeypatch)
+
+    demanded = ("trade", "advanced", "mcq")
+    assert bank.take(*demanded, 3) is None
+
+    asyncio.run(bank.refill_depleted())
+
+    assert len(gateway.prompts) == 3
+    assert gateway.topics()[0] == demanded[:2]
+    buckets = bank.stats()["buckets"]
+    assert buckets["trade/advanced/mcq"]["inventory"] == 10
+    assert sum(b["inventory"] for b in buckets.values()) == 15
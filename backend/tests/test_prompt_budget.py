@@ -0,0 +1,50 @@
+"""토큰 기준 프롬프트 예산 테스트"""
+from app.services import prompt_budget as prompt_budget_module
+from app.services.prompt_budget import count_tokens, fit_context, truncate_tokens
+
+
+class ByteEncoding:
+    """UTF-8 바이트 하나를 토큰 하나로 보는 인코딩 (한글 한 글자가 여러 토큰으로 나뉨)"""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+
+def test_truncate_tokens_fits_budget():
+    """잘라낸 결과는 예산 안에 들어오고 원문의 접두어"""
+    text = "경제 지표와 금리 " * 200
+    truncated = truncate_tokens(text, 50)
+    assert count_tokens(truncated) <= 50
+    assert text.startswith(truncated)
+    assert truncate_tokens("짧은 문장", 50) == "짧은 문장"
+
+
+def test_truncate_tokens_cuts_at_character_boundary(monkeypatch):
+    """토큰 경계가 한글 글자 중간이어도 깨진 문자 없이 원문의 접두어만 남김"""
+    monkeypatch.setattr(prompt_budget_module, "_encoding_for", lambda model: ByteEncoding())
+    assert truncate_tokens("경제 지표", 4) == "경"
+    assert truncate_tokens("경제 지표", 2) == ""
+
+    text = "환율과금리" * 200  # 문장 구분 없이 토큰 예산을 넘는 덩어리
+    segments = prompt_budget_module._segments(text, None)
+    assert len(segments) > 1
+    assert "".join(segments) == text
+    assert all("\ufffd" not in segment for segment in segments)
+
+
+def test_fit_context_keeps_relevant_paragraphs():
+    """예산을 넘으면 질문과 관련된 문단을 남기고 원문 순서 유지"""
+    filler = ["날씨와 여행에 관한 이야기입니다. " * 20 for _ in range(6)]
+    relevant = "기준금리가 인상되면 대출 이자 부담이 커집니다."
+    context = "\n\n".join(filler[:3] + [relevant] + filler[3:])
+
+    fitted = fit_context(context, "기준금리 인상이 대출 이자에 미치는 영향은?", 200)
+    assert count_tokens(fitted) <= 200
+    assert relevant in fitted
+    assert fit_context(relevant, "아무 질문", 200) == relevant
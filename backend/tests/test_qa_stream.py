@@ -0,0 +1,186 @@
+"""Q&A 스트리밍 엔드포인트 테스트 (LLM 호출 없이 가짜 delta 스트림 사용)"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.routers import qa as qa_module
+from app.services.circuit_breaker import CircuitOpenError
+
+client = TestClient(app)
+
+
+class FakeStream:
+    """
+    stream_chat_response 대체
+    - deltas를 순서대로 yield하고, fail_at 번째에서 error를 발생
+    - closed: 소비 측이 스트림을 닫았는지 (업스트림 연결 종료 여부)
+    """
+
+    def __init__(self, deltas, fail_at=None, error=None):
+        self.deltas = deltas
+        self.fail_at = fail_at
+        self.error = error or RuntimeError("upstream error")
+        self.calls = []
+        self.closed = False
+
+    def __call__(self, question, context=None, *args, **kwargs):
+        self.calls.append((question, context, kwargs.get("endpoint", "qa_chat")))
+        return self._generate()
+
+    async def _generate(self):
+        try:
+            for i, delta in enumerate(self.deltas):
+                if i == self.fail_at:
+                    raise self.error
+                yield delta
+            if self.fail_at == len(self.deltas):
+                raise self.error
+        finally:
+            self.closed = True
+
+
+class HistoryRecorder:
+    """save_qa_message 대체 (저장 대신 호출 인자 기록)"""
+
+    def __init__(self):
+        self.records = []
+
+    async def __call__(self, kind, question, answer_md, citations=None, context_ref=None, completed=True):
+        self.records.append({"kind": kind, "question": question, "answer_md": answer_md, "completed": completed})
+        return {}
+
+
+@pytest.fixture
+def history(monkeypatch):
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 0)
+    recorder = HistoryRecorder()
+    monkeypatch.setattr(qa_module, "save_qa_message", recorder)
+    return recorder
+
+
+def _fake_stream(monkeypatch, *args, **kwargs):
+    stream = FakeStream(*args, **kwargs)
+    monkeypatch.setattr(qa_module, "stream_chat_response", stream)
+    return stream
+
+
+def _sse_events(body):
+    """SSE 본문을 (event, data) 목록으로"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_stream_sse_framing(history, monkeypatch):
+    """delta 이벤트를 순서대로 보낸 뒤 전체 답변이 담긴 done 이벤트로 끝남"""
+    _fake_stream(monkeypatch, ["기준금리", "가 오르면 ", "대출 이자가 늘어납니다."])
+
+    response = client.post("/api/qa/chat/stream", json={"question": "금리 인상의 영향은?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    events = _sse_events(response.text)
+    assert [event for event, _ in events] == ["delta", "delta", "delta", "done"]
+    assert [data["text"] for _, data in events[:3]] == ["기준금리", "가 오르면 ", "대출 이자가 늘어납니다."]
+    done = events[-1][1]
+    assert done["answer_md"] == "기준금리가 오르면 대출 이자가 늘어납니다."
+    assert done["cached"] is False
+    assert history.records == [{
+        "kind": "chat", "question": "금리 인상의 영향은?",
+        "answer_md": "기준금리가 오르면 대출 이자가 늘어납니다.", "completed": True,
+    }]
+
+
+def test_summary_stream_ndjson_framing(history, monkeypatch):
+    stream = _fake_stream(monkeypatch, ["요약: ", "물가가 안정되었습니다."])
+
+    response = client.post(
+        "/api/qa/summary/stream?format=ndjson",
+        json={"question": "요약해 주세요", "context": "소비자물가 상승률이 둔화되었습니다."},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["type"] for event in events] == ["delta", "delta", "done"]
+    assert events[-1]["answer_md"] == "요약: 물가가 안정되었습니다."
+    assert stream.calls[0][2] == "qa_summary"
+    assert history.records[0]["kind"] == "summary"
+
+
+@pytest.mark.parametrize("error, status", [
+    (RuntimeError("upstream error"), 500),
+    (CircuitOpenError(12.0), 503),
+    (ValueError("안전하지 않은 입력이 감지되었습니다."), 400),
+])
+def test_failure_before_first_token_returns_status(history, monkeypatch, error, status):
+    """첫 delta 전에 실패하면 스트림을 시작하지 않고 HTTP 상태 코드로 응답"""
+    stream = _fake_stream(monkeypatch, ["답변"], fail_at=0, error=error)
+
+    response = client.post("/api/qa/chat/stream", json={"question": "금리 인상의 영향은?"})
+
+    assert response.status_code == status
+    assert stream.closed
+    assert history.records == []
+
+
+def test_failure_after_first_token_sends_error_event(history, monkeypatch):
+    """스트림 도중 실패하면 error 이벤트로 끝나고, 그때까지의 부분 답변을 미완료로 기록"""
+    stream = _fake_stream(monkeypatch, ["기준금리가 ", "오르면"], fail_at=1)
+
+    response = client.post("/api/qa/chat/stream", json={"question": "금리 인상의 영향은?"})
+
+    assert response.status_code == 200
+    events = _sse_events(response.text)
+    assert [event for event, _ in events] == ["delta", "error"]
+    assert "upstream error" in events[-1][1]["detail"]
+    assert stream.closed
+    assert history.records == [{
+        "kind": "chat", "question": "금리 인상의 영향은?", "answer_md": "기준금리가 ", "completed": False,
+    }]
+
+
+def test_cancelled_stream_records_partial_history(history):
+    """클라이언트 연결 종료로 응답 태스크가 취소되면 업스트림을 닫고 부분 답변을 미완료로 기록"""
+    upstream_closed = []
+
+    async def slow_deltas():
+        try:
+            yield "두 번째 "
+            await asyncio.sleep(60)
+            yield "도달하지 않음"
+        finally:
+            upstream_closed.append(True)
+
+    async def main():
+        received = []
+        body = qa_module._relay_stream(slow_deltas(), "첫 번째 ", "sse", "chat", "질문", None, citations=[])
+
+        async def consume():
+            async for event in body:
+                received.append(event)
+
+        task = asyncio.create_task(consume())
+        while len(received) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.gather(*list(qa_module._history_tasks))
+        return received
+
+    received = asyncio.run(main())
+
+    assert [event.split("\n")[0] for event in received] == ["event: delta", "event: delta"]
+    assert upstream_closed == [True]
+    assert history.records == [{
+        "kind": "chat", "question": "질문", "answer_md": "첫 번째 두 번째 ", "completed": False,
+    }]
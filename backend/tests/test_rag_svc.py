@@ -0,0 +1,220 @@
+"""통합 벡터 인덱스(RAGService) 테스트 (모델 없이 가짜 임베딩 사용)"""
+import asyncio
+import json
+import os
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+from app.services import rag_svc as rag_module
+from app.services.embedders import register_embedder
+from app.services.rag_svc import RAGService
+
+DIMENSION = 16
+
+
+class FakeEmbeddings(Embeddings):
+    """글자 빈도 벡터 (같은 글자를 많이 공유할수록 가까움)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _vector(self, text):
+        vector = [0.0] * DIMENSION
+        for ch in text:
+            vector[ord(ch) % DIMENSION] += 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch):
+    """임시 디렉토리를 쓰는 RAGService 생성 함수 (같은 디렉토리로 여러 번 만들면 재시작과 같음)"""
+    store_dir = tmp_path / "vector_stores"
+    store_dir.mkdir()
+    monkeypatch.setattr(rag_module, "UNIFIED_STORE_PATH", str(store_dir / "unified.faiss"))
+    monkeypatch.setattr(rag_module, "TOMBSTONE_PATH", str(store_dir / "unified.tombstones.json"))
+    monkeypatch.setattr(rag_module, "META_PATH", str(store_dir / "unified.meta.json"))
+    monkeypatch.setattr(rag_module, "SEGMENT_DIR", str(store_dir / "unified.segments"))
+    monkeypatch.setattr(settings, "RAG_SEGMENT_MERGE_COUNT", 20)
+    monkeypatch.setattr(settings, "RAG_COMPACT_RATIO", 0.9)
+    monkeypatch.setattr(settings, "VECTOR_STORE_CACHE_MB", 256)
+    register_embedder("fake", FakeEmbeddings, "fake:v1")
+
+    def factory(embedder="fake"):
+        return RAGService(embedder=embedder)
+
+    return factory
+
+
+def _ids(docs):
+    return [doc.metadata["storage_id"] for doc in docs]
+
+
+def test_resident_index_counts_hits_and_misses(make_service):
+    """디스크에서 로드하면 미스, 메모리에 있으면 적중"""
+    make_service().index_document("doc-a", ["환율과 금리의 관계"], filename="a.pdf")
+
+    service = make_service()
+    assert _ids(service.search("환율", k=1)) == ["doc-a"]
+    assert _ids(service.search("금리", k=1)) == ["doc-a"]
+
+    stats = service.get_store_stats()
+    assert (stats["misses"], stats["hits"], stats["evictions"]) == (1, 1, 0)
+    assert stats["loaded"] is True
+
+
+def test_index_over_memory_limit_is_unloaded(make_service, monkeypatch):
+    """메모리 한도를 넘으면 작업 후 내려놓고, 다음 검색에서 다시 로드"""
+    monkeypatch.setattr(settings, "VECTOR_STORE_CACHE_MB", 0)
+    service = make_service()
+    service.index_document("doc-a", ["환율과 금리의 관계"])
+    service.index_document("doc-b", ["무역수지와 경상수지"])
+
+    stats = service.get_store_stats()
+    assert stats["loaded"] is False
+    assert stats["evictions"] == 2
+
+    assert _ids(service.search("경상수지", k=1)) == ["doc-b"]
+    stats = service.get_store_stats()
+    assert stats["loaded"] is False
+    assert (stats["misses"], stats["evictions"]) == (1, 3)
+
+
+def test_invalidate_reloads_from_disk(make_service):
+    service = make_service()
+    service.index_document("doc-a", ["환율과 금리의 관계"])
+
+    # 다른 인스턴스(다른 프로세스와 같음)가 디스크의 인덱스를 바꾼 경우
+    make_service().index_document("doc-b", ["무역수지와 경상수지"])
+    assert _ids(service.search("경상수지", k=2)) == ["doc-a"]
+
+    service.invalidate()
+    assert set(_ids(service.search("경상수지", k=2))) == {"doc-a", "doc-b"}
+
+
+def test_segments_replayed_on_reload(make_service):
+    """체크포인트 이후 추가된 문서는 세그먼트로만 저장되고, 재시작 시 다시 반영"""
+    service = make_service()
+    service.index_document("doc-a", ["환율과 금리의 관계"])
+    service.index_document("doc-b", ["무역수지와 경상수지"])
+    service.index_document("doc-c", ["국내총생산과 경제성장률"])
+
+    stats = service.get_store_stats()
+    assert stats["checkpoints"] == 1  # 첫 색인 때만 전체 저장
+    assert stats["pending_segments"] == 2
+
+    reloaded = make_service()
+    assert _ids(reloaded.search("경상수지", k=1)) == ["doc-b"]
+    assert reloaded.get_store_stats()["vectors"] == 3
+    assert reloaded.get_store_stats()["pending_segments"] == 2
+
+
+def test_segments_merged_into_checkpoint(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "RAG_SEGMENT_MERGE_COUNT", 2)
+    service = make_service()
+    for i, text in enumerate(["환율과 금리", "무역수지", "경제성장률"]):
+        service.index_document(f"doc-{i}", [text])
+
+    stats = service.get_store_stats()
+    assert (stats["checkpoints"], stats["pending_segments"]) == (2, 0)
+    assert os.listdir(rag_module.SEGMENT_DIR) == []
+    assert make_service().get_store_stats()["vectors"] == 0  # 아직 로드 전
+    assert len(make_service().search("무역수지", k=3)) == 3
+
+
+def test_deleted_and_reindexed_documents_filtered_from_search(make_service):
+    """툼스톤 처리된 청크(삭제 문서, 재색인 전 청크)는 검색에서 제외"""
+    service = make_service()
+    service.index_document("doc-a", ["환율과 금리의 관계"])
+    service.index_document("doc-b", ["무역수지와 경상수지"])
+
+    assert service.delete_document("doc-b") == 1
+    assert _ids(service.search("경상수지", k=5)) == ["doc-a"]
+
+    service.index_document("doc-a", ["국내총생산"])
+    docs = service.search("국내총생산", k=5)
+    assert [doc.page_content for doc in docs] == ["국내총생산"]
+
+    # 재시작 후에도 툼스톤 유지
+    assert [doc.page_content for doc in make_service().search("금리", k=5)] == ["국내총생산"]
+
+
+def test_search_filters_by_storage_id(make_service):
+    service = make_service()
+    service.index_document("doc-a", ["환율과 금리의 관계"])
+    service.index_document("doc-b", ["환율과 무역수지"])
+
+    assert _ids(service.search("환율", k=5, storage_ids=["doc-b"])) == ["doc-b"]
+    assert service.search_similar_documents("doc-a", "환율", k=5) == ["환율과 금리의 관계"]
+
+
+def test_compaction_removes_tombstoned_chunks(make_service):
+    service = make_service()
+    for i, text in enumerate(["환율과 금리", "무역수지", "경제성장률", "물가와 통화량"]):
+        service.index_document(f"doc-{i}", [text])
+
+    service.delete_document("doc-1")
+    assert service.get_store_stats()["tombstones"] == 1
+    assert service.compact() == 1
+
+    stats = service.get_store_stats()
+    assert (stats["vectors"], stats["tombstones"], stats["pending_segments"]) == (3, 0, 0)
+    reloaded = make_service()
+    assert set(_ids(reloaded.search("무역수지", k=5))) == {"doc-0", "doc-2", "doc-3"}
+
+
+def test_compaction_triggered_by_tombstone_ratio(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "RAG_COMPACT_RATIO", 0.5)
+    service = make_service()
+    service.index_document("doc-a", ["환율과 금리"])
+    service.index_document("doc-b", ["무역수지"])
+
+    service.delete_document("doc-a")
+    stats = service.get_store_stats()
+    assert (stats["vectors"], stats["tombstones"]) == (1, 0)
+
+
+def test_index_from_other_embedder_is_not_used(make_service):
+    """다른 임베딩으로 만든 인덱스는 검색에 쓰지 않고, 다음 색인 때 현재 임베딩으로 새로 생성"""
+    make_service().index_document("doc-a", ["환율과 금리의 관계"])
+
+    register_embedder("fake-v2", FakeEmbeddings, "fake:v2")
+    service = make_service(embedder="fake-v2")
+    assert service.search("환율", k=1) == []
+    with pytest.raises(ValueError):
+        service.generate_answer("환율이란?")
+
+    service.index_document("doc-b", ["무역수지와 경상수지"])
+    assert _ids(service.search("환율", k=5)) == ["doc-b"]
+    with open(rag_module.META_PATH, encoding="utf-8") as f:
+        assert json.load(f)["embedder"] == "fake:v2"
+
+    # 원래 임베딩으로 돌아가면 이번에는 그쪽이 불일치
+    assert make_service().search("환율", k=1) == []
+
+
+def test_async_wrappers(make_service):
+    service = make_service()
+
+    async def main():
+        assert await service.aindex_document("doc-a", ["환율과 금리의 관계", "무역수지"], pages=[3, 4]) == 2
+        await service.aindex_document("doc-b", ["경제성장률"])
+        docs = await service.asearch("무역수지", k=1)
+        similar = await service.asearch_similar_documents("doc-b", "무역수지", k=5)
+        deleted = await service.adelete_document("doc-a")
+        remaining = await service.asearch("무역수지", k=5)
+        return docs, similar, deleted, remaining
+
+    docs, similar, deleted, remaining = asyncio.run(main())
+    assert docs[0].metadata["storage_id"] == "doc-a" and docs[0].metadata["page"] == 4
+    assert similar == ["경제성장률"]
+    assert deleted == 2
+    assert _ids(remaining) == ["doc-b"]
@@ -0,0 +1,44 @@
+"""토큰 버킷 요청 제한 테스트"""
+import time
+
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.services.rate_limiter import ClientRateLimiter, TokenBucket, client_identifier
+
+
+def test_token_bucket_wait_time():
+    """버킷이 비면 필요한 토큰이 다시 찰 때까지의 시간을 반환"""
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.wait_time(1) == 0
+    bucket.consume(2)
+    assert 0.05 < bucket.wait_time(1) <= 0.1
+    time.sleep(0.11)
+    assert bucket.wait_time(1) == 0
+
+
+def test_client_rate_limiter_is_per_client_and_endpoint():
+    """버스트를 넘으면 거절하되 다른 클라이언트/엔드포인트에는 영향 없음"""
+    limiter = ClientRateLimiter()
+    results = [limiter.check("1.1.1.1", "qa_chat") for _ in range(12)]
+    assert results[:10] == [0.0] * 10
+    assert results[10] > 0
+    assert limiter.check("2.2.2.2", "qa_chat") == 0
+    assert limiter.check("1.1.1.1", "problems") == 0
+
+
+def test_client_identifier_ignores_untrusted_forwarded_for(monkeypatch):
+    """X-Forwarded-For는 신뢰하는 프록시를 거친 요청에서만 사용"""
+    def request(host, forwarded):
+        return Request({
+            "type": "http",
+            "client": (host, 1234),
+            "headers": [(b"x-forwarded-for", forwarded.encode())],
+        })
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "")
+    assert client_identifier(request("9.9.9.9", "1.2.3.4")) == "9.9.9.9"
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.1")
+    assert client_identifier(request("9.9.9.9", "1.2.3.4")) == "9.9.9.9"
+    assert client_identifier(request("10.0.0.1", "6.6.6.6, 1.2.3.4")) == "1.2.3.4"
@@ -0,0 +1,146 @@
+"""자료 추천 결과 캐시 테스트 (MongoDB 없이 로컬 파일 폴백)"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import recommend_cache as recommend_cache_module
+from app.services.recommend_cache import RecommendCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class Generator:
+    """호출될 때마다 번호가 늘어나는 추천 결과 생성"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return [{"title": f"자료 {self.calls}"}]
+
+
+def _no_database():
+    raise RuntimeError("MongoDB 미연결")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(recommend_cache_module, "time", SimpleNamespace(time=fake.time))
+    monkeypatch.setattr(recommend_cache_module, "get_database", _no_database)
+    monkeypatch.setattr(settings, "RECOMMEND_CACHE_FRESH_SEC", 100)
+    monkeypatch.setattr(settings, "RECOMMEND_CACHE_STALE_SEC", 1000)
+    return fake
+
+
+def _cache(tmp_path):
+    return RecommendCache(local_path=str(tmp_path / "recommend.json"))
+
+
+def test_cache_key_normalizes_inputs():
+    assert make_cache_key("  Macro  Economy ", "Basic", "Exam") == make_cache_key("macro economy", "basic", "exam")
+
+
+def test_fresh_entry_served_from_file(tmp_path, clock):
+    """MongoDB가 없으면 로컬 파일에 저장하고, 새 인스턴스에서도 그대로 재사용"""
+    generate = Generator()
+
+    first = asyncio.run(_cache(tmp_path).get_or_generate("macro", "basic", "exam", generate))
+    clock.now += 50
+    cache = _cache(tmp_path)
+    second = asyncio.run(cache.get_or_generate("Macro", "basic", "exam", generate))
+
+    assert first == second == [{"title": "자료 1"}]
+    assert generate.calls == 1
+    assert cache.stats()["fresh_hits"] == 1
+
+
+def test_stale_entry_returned_then_refreshed(tmp_path, clock):
+    """fresh 구간이 지나면 이전 결과를 즉시 반환하고 백그라운드에서 한 번만 갱신"""
+    cache = _cache(tmp_path)
+    generate = Generator()
+
+    async def main():
+        await cache.get_or_generate("macro", "basic", "exam", generate)
+        clock.now += 150
+        stale = await asyncio.gather(*(
+            cache.get_or_generate("macro", "basic", "exam", generate) for _ in range(3)
+        ))
+        await asyncio.gather(*list(cache._refreshing.values()))
+        fresh = await cache.get_or_generate("macro", "basic", "exam", generate)
+        return stale, fresh
+
+    stale, fresh = asyncio.run(main())
+
+    assert stale == [[{"title": "자료 1"}]] * 3
+    assert fresh == [{"title": "자료 2"}]
+    assert generate.calls == 2
+    stats = cache.stats()
+    assert (stats["stale_hits"], stats["fresh_hits"], stats["refreshes"]) == (3, 1, 1)
+
+
+def test_expired_entry_regenerated(tmp_path, clock):
+    """fresh + stale 구간이 모두 지나면 만료되어 다시 생성"""
+    cache = _cache(tmp_path)
+    generate = Generator()
+
+    asyncio.run(cache.get_or_generate("macro", "basic", "exam", generate))
+    clock.now += 1101
+    items = asyncio.run(cache.get_or_generate("macro", "basic", "exam", generate))
+
+    assert items == [{"title": "자료 2"}]
+    assert cache.stats()["misses"] == 2
+
+
+def test_invalidate_removes_local_entries(tmp_path, clock):
+    cache = _cache(tmp_path)
+    generate = Generator()
+    asyncio.run(cache.get_or_generate("macro", "basic", "exam", generate))
+    asyncio.run(cache.get_or_generate("trade", "basic", "exam", generate))
+
+    assert asyncio.run(cache.invalidate("macro", "basic", "exam")) == 1
+    assert asyncio.run(cache.invalidate()) == 1
+    asyncio.run(cache.get_or_generate("trade", "basic", "exam", generate))
+    assert generate.calls == 3
+
+
+class SlowCollection:
+    """응답하지 않는 MongoDB 컬렉션 (서버 선택 대기와 같음)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _hang(self, *args, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(60)
+
+    create_index = find_one = update_one = delete_many = _hang
+
+
+def test_unreachable_mongo_is_skipped_until_retry(tmp_path, clock, monkeypatch):
+    """MongoDB가 응답하지 않으면 짧게 기다린 뒤 로컬 파일로 처리하고, 재시도 시간까지는 MongoDB를 건너뜀"""
+    collection = SlowCollection()
+    monkeypatch.setattr(recommend_cache_module, "get_database", lambda: {"recommend_cache": collection})
+    monkeypatch.setattr(recommend_cache_module, "MONGO_TIMEOUT_SECONDS", 0.05)
+    cache = _cache(tmp_path)
+    generate = Generator()
+
+    asyncio.run(cache.get_or_generate("macro", "basic", "exam", generate))
+    assert collection.calls == 1
+    assert cache.stats()["mongo_available"] is False
+
+    items = asyncio.run(cache.get_or_generate("macro", "basic", "exam", generate))
+    assert items == [{"title": "자료 1"}]
+    assert collection.calls == 1
+
+    clock.now += recommend_cache_module.MONGO_RETRY_SECONDS
+    assert cache.stats()["mongo_available"] is True
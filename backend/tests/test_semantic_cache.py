@@ -0,0 +1,91 @@
+"""의미 기반 응답 캐시 테스트"""
+import asyncio
+
+import numpy as np
+
+from app.services import semantic_cache as semantic_cache_module
+from app.services.semantic_cache import SemanticCache, context_cache_key
+
+
+class FakeEmbedder:
+    """질문별로 지정한 벡터를 반환 (모델 로드 없이 유사도 제어)"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    async def create_embedding(self, text):
+        return self.vectors[text]
+
+
+EMBEDDER = FakeEmbedder({
+    "금리가 오르면?": [1.0, 0.0, 0.0],
+    "금리 인상 효과는?": [0.95, 0.31, 0.0],
+    "환율이란?": [0.0, 0.0, 1.0],
+})
+
+
+def _lookup(cache, question, key):
+    return asyncio.run(cache.lookup(question, key))
+
+
+def _ask(cache, question, key, answer):
+    hit, vector = _lookup(cache, question, key)
+    if hit is None:
+        cache.store(question, key, answer, vector)
+    return hit
+
+
+def test_similar_question_hits_above_threshold():
+    """유사도가 threshold 이상이면 이전 답변 재사용, 미만이면 미스"""
+    cache = SemanticCache(max_entries=10, ttl_seconds=60, threshold=0.9, embedder=EMBEDDER)
+    key = context_cache_key(None)
+
+    assert _ask(cache, "금리가 오르면?", key, "답변 A") is None
+    hit = _ask(cache, "금리 인상 효과는?", key, "답변 B")
+    assert hit["answer_md"] == "답변 A"
+    assert hit["similarity"] >= 0.9
+    assert _ask(cache, "환율이란?", key, "답변 C") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_context_keys_are_isolated():
+    """같은 질문이라도 컨텍스트(문서)가 다르면 적중하지 않음"""
+    cache = SemanticCache(max_entries=10, ttl_seconds=60, threshold=0.9, embedder=EMBEDDER)
+    doc_a = context_cache_key("a.json", "hash-a")
+    doc_b = context_cache_key("b.json", "hash-b")
+
+    _ask(cache, "금리가 오르면?", doc_a, "문서 A 답변")
+    assert _lookup(cache, "금리가 오르면?", doc_b)[0] is None
+    assert _lookup(cache, "금리가 오르면?", doc_a)[0]["answer_md"] == "문서 A 답변"
+    assert context_cache_key("same") == context_cache_key("same") != context_cache_key("other")
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    """TTL이 지난 항목은 조회 시 제거"""
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache_module.time, "time", lambda: now[0])
+    cache = SemanticCache(max_entries=10, ttl_seconds=60, threshold=0.9, embedder=EMBEDDER)
+    key = context_cache_key(None)
+
+    _ask(cache, "금리가 오르면?", key, "답변 A")
+    now[0] += 61
+    assert _lookup(cache, "금리가 오르면?", key)[0] is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    """최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 제거"""
+    cache = SemanticCache(max_entries=2, ttl_seconds=60, threshold=0.9, embedder=EMBEDDER)
+    key = context_cache_key(None)
+
+    _ask(cache, "금리가 오르면?", key, "답변 A")
+    _ask(cache, "환율이란?", key, "답변 C")
+    _lookup(cache, "금리가 오르면?", key)  # A를 최근 사용으로 갱신
+    vector = np.zeros(3, dtype=np.float32)
+    vector[1] = 1.0
+    cache.store("국채란?", key, "답변 D", vector)
+
+    assert cache.stats()["evictions"] == 1
+    assert _lookup(cache, "금리가 오르면?", key)[0]["answer_md"] == "답변 A"
+    assert _lookup(cache, "환율이란?", key)[0] is None
@@ -0,0 +1,100 @@
+"""동일 요청 단일 실행 (single-flight) 테스트"""
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight, canonical_key
+
+
+def test_canonical_key_ignores_field_order():
+    assert canonical_key({"a": 1, "b": "x"}) == canonical_key({"b": "x", "a": 1})
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
+
+
+def test_concurrent_calls_share_one_execution():
+    """같은 키의 동시 호출은 한 번만 실행하고 결과를 공유, 완료 후에는 다시 실행"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        again = await flight.do("k", work)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert results == [1] * 5
+    assert again == 2
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4, "coalesce_rate": 0.667}
+
+
+def test_exception_is_shared_with_followers():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """leader 요청이 취소돼도 실행은 계속되어 follower가 결과를 받음"""
+    flight = SingleFlight()
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def work():
+            await gate.wait()
+            return "done"
+
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_execution_cancelled_when_all_waiters_cancel():
+    """기다리는 호출이 모두 취소되면 실행 태스크도 취소"""
+    flight = SingleFlight()
+    state = {}
+
+    async def main():
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        waiters = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert state.get("cancelled") is True
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,184 @@
+"""저장소 용량 관리 (LRU 정리) 테스트"""
+import asyncio
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import storage_manager as storage_module
+from app.services.document_index import DocumentIndex
+from app.services.fulltext_index import FullTextIndex
+from app.services.storage_manager import MIN_IDLE_SECONDS, StorageManager
+from app.services.upload_manifest import UploadManifest
+
+KB = 1024
+
+
+class Layout:
+    """임시 디렉토리에 업로드/파생 데이터 파일을 만드는 도우미"""
+
+    def __init__(self, root, monkeypatch):
+        self.dirs = {}
+        for name, attr in (
+            ("uploads", "UPLOAD_DIR"), ("json", "JSON_DIR"), ("texts", "TEXT_STORE_DIR"),
+            ("digests", "DIGEST_DIR"), ("fulltext", "FULLTEXT_DIR"), ("chunks", "CHUNK_INDEX_DIR"),
+            ("summaries", "SUMMARY_CACHE_DIR"), ("vector_stores", "VECTOR_STORE_DIR"),
+        ):
+            path = root / name
+            path.mkdir()
+            self.dirs[name] = path
+            monkeypatch.setattr(storage_module, attr, str(path))
+
+        self.manifest = UploadManifest(path=str(root / "manifest.json"), json_dir=str(self.dirs["json"]))
+        monkeypatch.setattr(storage_module, "upload_manifest", self.manifest)
+        monkeypatch.setattr(storage_module, "document_index", DocumentIndex(index_dir=str(self.dirs["chunks"])))
+        monkeypatch.setattr(storage_module, "fulltext_index", FullTextIndex(index_dir=str(self.dirs["fulltext"])))
+        monkeypatch.setattr(storage_module, "get_database", self._no_database)
+
+    @staticmethod
+    def _no_database():
+        raise RuntimeError("MongoDB 미연결")
+
+    @staticmethod
+    def write(path, size):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+
+    def add_document(self, storage_id, original_kb=4, derived_kb=2, originals=None):
+        originals = originals or [f"{storage_id}.pdf"]
+        for name in originals:
+            if not (self.dirs["uploads"] / name).exists():
+                self.write(self.dirs["uploads"] / name, original_kb * KB)
+        self.write(self.dirs["json"] / f"{storage_id}.json", 100)
+        self.write(self.dirs["texts"] / storage_id / "text.bin", 100)
+        if derived_kb:
+            self.write(self.dirs["chunks"] / f"{storage_id}.npy", derived_kb * KB)
+        self.manifest.upsert({"storage_id": storage_id, "timestamp": storage_id, "original_filenames": originals})
+
+    def exists(self, name, relative):
+        return (self.dirs[name] / relative).exists()
+
+
+@pytest.fixture
+def layout(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_TARGET_RATIO", 0.8)
+    return Layout(tmp_path, monkeypatch)
+
+
+def _manager(tmp_path, accessed):
+    """storage_id별 마지막 접근 시각을 지정한 StorageManager"""
+    manager = StorageManager(usage_path=str(tmp_path / "usage.json"))
+    with manager._lock:
+        manager._ensure_loaded()
+        manager._last_access.update(accessed)
+    return manager
+
+
+def _quota(monkeypatch, kb):
+    monkeypatch.setattr(settings, "STORAGE_QUOTA_MB", kb / 1024)
+
+
+def test_no_eviction_under_quota(tmp_path, layout, monkeypatch):
+    layout.add_document("a")
+    _quota(monkeypatch, 100)
+    result = asyncio.run(_manager(tmp_path, {"a": 0.0}).sweep())
+    assert result["freed_bytes"] == 0
+    assert layout.exists("uploads", "a.pdf")
+
+
+def test_derived_data_evicted_before_originals(tmp_path, layout, monkeypatch):
+    """파생 데이터 정리로 목표에 도달하면 원본은 남김"""
+    layout.add_document("a", original_kb=4, derived_kb=4)
+    layout.add_document("b", original_kb=4, derived_kb=4)
+    summary = layout.dirs["summaries"] / "cached.json"
+    layout.write(summary, 2 * KB)
+    os.utime(summary, (0, 0))
+
+    # 전체 약 18KB, 한도 16KB → 목표 12.8KB
+    _quota(monkeypatch, 16)
+    manager = _manager(tmp_path, {"a": 1.0, "b": 2.0})
+    result = asyncio.run(manager.sweep())
+
+    # 요약 캐시(가장 오래됨) → a 순으로 정리하고 목표에 도달하면 중단
+    assert result["evicted_original"] == []
+    assert result["evicted_derived"] == ["a"]
+    assert not summary.exists()
+    assert not layout.exists("chunks", "a.npy") and layout.exists("chunks", "b.npy")
+    assert layout.exists("uploads", "a.pdf") and layout.exists("uploads", "b.pdf")
+    assert result["freed_bytes"] == 6 * KB
+
+
+def test_originals_evicted_in_lru_order_skipping_recent(tmp_path, layout, monkeypatch):
+    """원본은 오래 사용되지 않은 문서부터, 최근 MIN_IDLE_SECONDS 안에 사용된 문서는 제외"""
+    for storage_id in ("a", "b", "c"):
+        layout.add_document(storage_id, original_kb=8, derived_kb=0)
+
+    _quota(monkeypatch, 1)
+    now = storage_module.time.time()
+    manager = _manager(tmp_path, {"a": now - 60, "b": now - MIN_IDLE_SECONDS * 3, "c": now - MIN_IDLE_SECONDS * 2})
+    result = asyncio.run(manager.sweep())
+
+    assert result["evicted_original"] == ["b", "c"]
+    assert layout.exists("uploads", "a.pdf")
+    assert not layout.exists("uploads", "b.pdf") and not layout.exists("json", "b.json")
+    assert not layout.exists("texts", "b")
+    assert layout.manifest.get("b") is None and layout.manifest.get("a") is not None
+
+
+def test_shared_original_kept_until_last_reference(tmp_path, layout, monkeypatch):
+    """같은 원본 파일을 참조하는 문서가 남아 있으면 파일을 지우지 않음"""
+    layout.add_document("a", original_kb=8, derived_kb=0, originals=["shared.pdf"])
+    layout.add_document("b", original_kb=8, derived_kb=0, originals=["shared.pdf"])
+    layout.add_document("c", original_kb=8, derived_kb=0)
+
+    # 공유 파일은 한 번만 집계: 전체 약 16.6KB, 한도 12KB → 목표 9.6KB
+    _quota(monkeypatch, 12)
+    manager = _manager(tmp_path, {"a": 1.0, "c": 2.0, "b": 3.0})
+    result = asyncio.run(manager.sweep())
+
+    # a를 정리해도 공유 파일은 남아 확보량은 메타데이터뿐이므로 c까지 정리
+    assert result["evicted_original"] == ["a", "c"]
+    assert layout.exists("uploads", "shared.pdf")
+    assert result["freed_bytes"] == 8 * KB + 400
+
+    # 마지막으로 참조하던 문서까지 정리되면 삭제
+    _quota(monkeypatch, 1)
+    result = asyncio.run(manager.sweep())
+    assert result["evicted_original"] == ["b"]
+    assert not layout.exists("uploads", "shared.pdf")
+
+
+def test_freed_bytes_match_disk_usage(tmp_path, layout, monkeypatch):
+    """확보했다고 보고한 용량이 실제 줄어든 사용량과 같음"""
+    layout.add_document("a", original_kb=6, derived_kb=3)
+    layout.add_document("b", original_kb=5, derived_kb=2)
+    layout.add_document("c", original_kb=4, derived_kb=1)
+
+    _quota(monkeypatch, 16)
+    manager = _manager(tmp_path, {"a": 1.0, "b": 2.0, "c": 3.0})
+    before = manager.usage()["total_bytes"]
+    result = asyncio.run(manager.sweep())
+    after = manager.usage()["total_bytes"]
+
+    assert result["evicted_original"]
+    assert result["freed_bytes"] == before - after
+
+
+def test_eviction_hooks_called_for_originals(tmp_path, layout, monkeypatch):
+    layout.add_document("a", original_kb=8, derived_kb=0)
+    _quota(monkeypatch, 4)
+    manager = _manager(tmp_path, {"a": 1.0})
+    evicted = []
+
+    async def hook(storage_id):
+        evicted.append(storage_id)
+
+    async def failing_hook(storage_id):
+        raise RuntimeError("boom")
+
+    manager.add_eviction_hook(failing_hook)
+    manager.add_eviction_hook(hook)
+    result = asyncio.run(manager.sweep())
+
+    assert result["evicted_original"] == ["a"]
+    assert evicted == ["a"]
@@ -0,0 +1,38 @@
+"""압축 텍스트 저장소 테스트"""
+from app.services.text_store import TextStore
+
+
+def test_text_store_roundtrip(tmp_path):
+    """저장한 텍스트를 그대로 읽을 수 있어야 함"""
+    store = TextStore(root_dir=str(tmp_path), chunk_chars=10)
+    text = "기준금리 인상과 물가 안정 " * 20
+
+    meta = store.put("doc", text)
+
+    assert meta["text_length"] == len(text)
+    assert meta["chunk_count"] == (len(text) + 9) // 10
+    assert store.read("doc") == text
+
+
+def test_text_store_range_read(tmp_path):
+    """청크 경계를 넘는 범위도 정확히 읽어야 함"""
+    store = TextStore(root_dir=str(tmp_path), chunk_chars=7)
+    text = "".join(str(i % 10) for i in range(100))
+    store.put("doc", text)
+
+    assert store.read("doc", 5, 23) == text[5:23]
+    assert store.read("doc", 95, 200) == text[95:]
+    assert store.read("doc", 50, 50) == ""
+    assert store.read("missing") is None
+
+
+def test_text_store_replace_and_delete(tmp_path):
+    """같은 storage_id로 다시 저장하면 교체되고, 삭제 후에는 없어야 함"""
+    store = TextStore(root_dir=str(tmp_path))
+    store.put("doc", "old text")
+    store.put("doc", "new text")
+
+    assert store.read("doc") == "new text"
+
+    store.delete("doc")
+    assert not store.exists("doc")
@@ -0,0 +1,45 @@
+"""업로드 매니페스트 페이지 조회 테스트"""
+from app.services.upload_manifest import UploadManifest
+
+
+def _manifest(tmp_path, entries):
+    manifest = UploadManifest(path=str(tmp_path / "manifest.json"), json_dir=str(tmp_path / "json"))
+    for storage_id, timestamp in entries:
+        manifest.upsert({"storage_id": storage_id, "timestamp": timestamp})
+    return manifest
+
+
+def _collect(manifest, limit):
+    ids, cursor = [], None
+    while True:
+        items, cursor = manifest.list_page(limit=limit, cursor=cursor)
+        ids.extend(item["storage_id"] for item in items)
+        if cursor is None:
+            return ids
+
+
+def test_pages_do_not_skip_equal_timestamps(tmp_path):
+    """같은 타임스탬프 항목이 페이지 경계에 걸려도 누락/중복 없이 최신순으로 모두 조회"""
+    manifest = _manifest(tmp_path, [
+        ("a", "2024-01-01T00:00:00"),
+        ("b", "2024-01-02T00:00:00"),
+        ("c", "2024-01-02T00:00:00"),
+        ("d", "2024-01-02T00:00:00"),
+        ("e", "2024-01-03T00:00:00"),
+    ])
+
+    for limit in (1, 2, 3):
+        assert _collect(manifest, limit) == ["e", "d", "c", "b", "a"]
+
+
+def test_timestamp_only_cursor_still_accepted(tmp_path):
+    """storage_id 없는 이전 형식 커서는 그 시각보다 이전 항목만 반환"""
+    manifest = _manifest(tmp_path, [
+        ("a", "2024-01-01T00:00:00"),
+        ("b", "2024-01-02T00:00:00"),
+        ("c", "2024-01-02T00:00:00"),
+    ])
+
+    items, next_cursor = manifest.list_page(limit=10, cursor="2024-01-02T00:00:00")
+    assert [item["storage_id"] for item in items] == ["a"]
+    assert next_cursor is None